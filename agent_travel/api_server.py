@@ -0,0 +1,320 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs
+
+from orchestrator import Orchestrator
+
+DEFAULT_WORKERS = 8
+DEFAULT_MAX_PENDING = 64
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_MAX_SESSIONS = 1000
+MAX_BODY_BYTES = 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+        self.headers = headers or {}
+
+
+class Session:
+    """A planning session; the lock serializes requests that touch the same state."""
+
+    def __init__(self, state):
+        self.state = state
+        self.lock = threading.Lock()
+
+
+def json_response(data, status: int = 200) -> Tuple[int, bytes, str]:
+    return status, json.dumps(data, default=str).encode("utf-8"), "application/json"
+
+
+class PlannerAPI:
+    """
+    ASGI app serving the orchestrator over HTTP/JSON. Orchestrator calls block on
+    the LLM, geocoding and SQLite, so they run on a pool of worker threads. At most
+    max_pending calls may be running or queued for the pool; further requests are
+    turned away with 503 and Retry-After rather than queueing without bound. A call
+    that takes longer than timeout seconds gets a 504.
+
+    Sessions live in this process, at most max_sessions of them, least recently
+    used dropped first; save a trip to keep it beyond that.
+    """
+
+    def __init__(self, orchestrator=None, workers: int = DEFAULT_WORKERS, max_pending: int = DEFAULT_MAX_PENDING,
+                 timeout: float = DEFAULT_TIMEOUT_SECONDS, max_sessions: int = DEFAULT_MAX_SESSIONS):
+        self.orchestrator = orchestrator if orchestrator is not None else Orchestrator()
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.max_sessions = max_sessions
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="planner")
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+        self._sessions = OrderedDict()
+        self._sessions_lock = threading.Lock()
+        # (method, path segments, handler); None matches any one segment and is passed to the handler
+        self.routes = [
+            ("GET", ("health",), self.health),
+            ("GET", ("trips",), self.search_trips),
+            ("POST", ("validate",), self.validate_csv),
+            ("POST", ("sessions",), self.create_session),
+            ("GET", ("sessions", None), self.get_session),
+            ("POST", ("sessions", None, "messages"), self.post_message),
+            ("POST", ("sessions", None, "save"), self.save_trip),
+            ("POST", ("sessions", None, "load"), self.load_trip),
+            ("GET", ("sessions", None, "csv"), self.get_csv),
+            ("POST", ("sessions", None, "validate"), self.validate_session),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        headers = {}
+        try:
+            body = await self._read_body(receive)
+            handler, args = self._route(scope["method"], scope["path"])
+            query = {key: values[-1] for key, values in parse_qs(scope.get("query_string", b"").decode()).items()}
+            status, payload, content_type = await handler(*args, query=query, body=body)
+        except HTTPError as e:
+            headers = e.headers
+            status, payload, content_type = json_response({"error": e.message}, e.status)
+        except Exception as e:
+            print(f"Error handling {scope['method']} {scope['path']}: {e}")
+            status, payload, content_type = json_response({"error": "Internal server error"}, 500)
+
+        response_headers = [(b"content-type", content_type.encode()), (b"content-length", str(len(payload)).encode())]
+        response_headers += [(name.encode(), value.encode()) for name, value in headers.items()]
+        await send({"type": "http.response.start", "status": status, "headers": response_headers})
+        await send({"type": "http.response.body", "body": payload})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _read_body(self, receive) -> bytes:
+        chunks = []
+        size = 0
+        while True:
+            message = await receive()
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if size > MAX_BODY_BYTES:
+                raise HTTPError(413, "Request body too large")
+            chunks.append(chunk)
+            if not message.get("more_body"):
+                return b"".join(chunks)
+
+    def _route(self, method: str, path: str):
+        segments = tuple(segment for segment in path.split("/") if segment)
+        path_matched = False
+        for route_method, pattern, handler in self.routes:
+            if len(pattern) != len(segments) or any(p is not None and p != s for p, s in zip(pattern, segments)):
+                continue
+            path_matched = True
+            if route_method == method:
+                return handler, [s for p, s in zip(pattern, segments) if p is None]
+        if path_matched:
+            raise HTTPError(405, f"Method {method} not allowed")
+        raise HTTPError(404, f"No route for {path}")
+
+    async def run_blocking(self, func, *args):
+        """Runs func on the worker pool, applying backpressure and the request timeout."""
+        with self._pending_lock:
+            if self._pending >= self.max_pending:
+                raise HTTPError(503, "Server busy, retry later", {"retry-after": "1"})
+            self._pending += 1
+        future = self.executor.submit(func, *args)
+        # The slot is freed when the work actually finishes, not when a timed-out request gives up on it
+        future.add_done_callback(self._release)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(504, f"Request timed out after {self.timeout:g}s") from None
+
+    def _release(self, _future):
+        with self._pending_lock:
+            self._pending -= 1
+
+    def _session(self, session_id: str) -> Session:
+        with self._sessions_lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                raise HTTPError(404, f"No session {session_id}")
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def _add_session(self, state) -> str:
+        session_id = uuid.uuid4().hex
+        with self._sessions_lock:
+            self._sessions[session_id] = Session(state)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        return session_id
+
+    @staticmethod
+    def _json_body(body: bytes) -> dict:
+        if not body:
+            return {}
+        try:
+            data = json.loads(body)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HTTPError(400, "Request body is not valid JSON") from None
+        if not isinstance(data, dict):
+            raise HTTPError(400, "Request body must be a JSON object")
+        return data
+
+    @staticmethod
+    def _session_summary(session_id: str, state) -> dict:
+        return {"session_id": session_id, "phase": state["current_phase"], "plan": state["plan"]}
+
+    # --- Handlers ---
+
+    async def health(self, query, body):
+        with self._pending_lock:
+            pending = self._pending
+        return json_response({
+            "status": "ok", "workers": self.workers, "pending": pending,
+            "max_pending": self.max_pending, "sessions": len(self._sessions),
+            "plan_extraction": self.orchestrator.travel_planner_agent.extraction_stats(),
+        })
+
+    async def search_trips(self, query, body):
+        try:
+            limit = int(query.get("limit", 20))
+            offset = int(query.get("offset", 0))
+        except ValueError:
+            raise HTTPError(400, "limit and offset must be integers") from None
+        titles = await self.run_blocking(self.orchestrator.search_trips, query.get("q", ""), limit, offset)
+        return json_response({"titles": titles})
+
+    async def validate_csv(self, query, body):
+        if not body.strip():
+            raise HTTPError(400, "Request body must be the itinerary CSV")
+        csv_data = body.decode("utf-8", errors="replace")
+        return json_response(await self.run_blocking(self.orchestrator.validate_csv_itinerary, csv_data))
+
+    async def create_session(self, query, body):
+        state = self.orchestrator.get_default_state()
+        session_id = self._add_session(state)
+        return json_response(self._session_summary(session_id, state), 201)
+
+    async def get_session(self, session_id, query, body):
+        session = self._session(session_id)
+        state = await self.run_blocking(self._locked, session, lambda state: state.to_dict())
+        return json_response({"session_id": session_id, "state": state})
+
+    async def post_message(self, session_id, query, body):
+        message = self._json_body(body).get("message")
+        if not isinstance(message, str) or not message.strip():
+            raise HTTPError(400, "Expected a JSON body with a non-empty 'message'")
+        session = self._session(session_id)
+        replies = await self.run_blocking(self._process_message, session, message)
+        return json_response(dict(self._session_summary(session_id, session.state), replies=replies))
+
+    def _process_message(self, session: Session, message: str):
+        with session.lock:
+            previous_state = session.state
+            start = len(previous_state["conversation_history"])
+            session.state = self.orchestrator.process_user_input(message, previous_state)
+            if session.state is not previous_state:
+                start = 0  # 'new plan' starts over with a fresh state
+            return [entry["content"] for entry in session.state["conversation_history"][start:]
+                    if entry["role"] == "assistant"]
+
+    async def save_trip(self, session_id, query, body):
+        title = self._json_body(body).get("title") or ""
+        session = self._session(session_id)
+        title = await self.run_blocking(self._save_trip, session, title)
+        return json_response({"session_id": session_id, "title": title})
+
+    def _save_trip(self, session: Session, title: str):
+        with session.lock:
+            title = title or self.orchestrator.suggest_trip_title(session.state)
+            self.orchestrator.save_current_trip(title, session.state)
+            return title
+
+    async def load_trip(self, session_id, query, body):
+        title = self._json_body(body).get("title")
+        if not title:
+            raise HTTPError(400, "Expected a JSON body with a 'title'")
+        session = self._session(session_id)
+        loaded_state = await self.run_blocking(self._load_trip, session, title)
+        if loaded_state is None:
+            raise HTTPError(404, f"No trip found with title: {title}")
+        return json_response(dict(self._session_summary(session_id, loaded_state), title=title))
+
+    def _load_trip(self, session: Session, title: str):
+        loaded_state = self.orchestrator.load_trip_data(title)
+        if loaded_state is not None:
+            with session.lock:
+                session.state = loaded_state
+        return loaded_state
+
+    async def get_csv(self, session_id, query, body):
+        session = self._session(session_id)
+        csv_data = await self.run_blocking(self._locked, session, self.orchestrator.generate_csv_itinerary)
+        return 200, csv_data.encode("utf-8"), "text/csv; charset=utf-8"
+
+    async def validate_session(self, session_id, query, body):
+        session = self._session(session_id)
+        return json_response(await self.run_blocking(self._locked, session, self.orchestrator.validate_itinerary))
+
+    @staticmethod
+    def _locked(session: Session, func):
+        with session.lock:
+            return func(session.state)
+
+
+def create_app(trip_store_path: Optional[str] = None, stub_llm: bool = False, stub_latency: float = 0.0,
+               **options) -> PlannerAPI:
+    """Builds the app; with stub_llm every LLM call is answered offline by llm_client.StubModel."""
+    from llm_client import LLMClient, StubModel, set_client
+    from trip_store import open_trip_store
+
+    if stub_llm:
+        set_client(LLMClient(model=StubModel(latency=stub_latency)))
+    trip_store = open_trip_store(trip_store_path) if trip_store_path else None
+    return PlannerAPI(Orchestrator(trip_store=trip_store), **options)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP/JSON API for the travel planner.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Worker threads for orchestrator calls.")
+    parser.add_argument("--max-pending", type=int, default=DEFAULT_MAX_PENDING,
+                        help="Calls running or queued before requests get 503.")
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT_SECONDS, help="Per-request timeout in seconds.")
+    parser.add_argument("--trip-store", default=os.getenv("TRIP_STORE_PATH"), help="Trip store path (.json or SQLite).")
+    parser.add_argument("--stub-llm", action="store_true", help="Answer LLM calls offline with a stub model.")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub model takes per call.")
+    args = parser.parse_args()
+
+    try:
+        import uvicorn
+    except ImportError:
+        print("Error: uvicorn is required to serve the API: pip install uvicorn")
+        raise SystemExit(1)
+    app = create_app(args.trip_store, stub_llm=args.stub_llm, stub_latency=args.stub_latency,
+                     workers=args.workers, max_pending=args.max_pending, timeout=args.timeout)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,75 @@
+import hashlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+def content_key(text: str) -> str:
+    """SHA-256 of the content a cached value is generated from."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class Cache(ABC):
+    """
+    Cache for values the orchestrator derives (downloads, trip listings), grouped
+    in namespaces. Framework-neutral so the orchestrator runs the same in the
+    Streamlit app, a worker process or an HTTP service.
+    """
+
+    @abstractmethod
+    def get_or_create(self, namespace: str, key: Hashable, build: Callable[[], Any]) -> Any:
+        """The cached value for (namespace, key), calling build() to create it on a miss."""
+
+    @abstractmethod
+    def invalidate(self, namespace: Optional[str] = None):
+        """Drops every value in namespace, or every value at all."""
+
+
+class InProcessCache(Cache):
+    """
+    Bounded, thread-safe LRU living in this process. Entries older than
+    ttl_seconds are rebuilt, which bounds how stale a value can get when other
+    processes change what it was derived from.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get_or_create(self, namespace, key, build):
+        cache_key = (namespace, key)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None and (self.ttl_seconds is None or now - entry[0] < self.ttl_seconds):
+                self._entries.move_to_end(cache_key)
+                self._stats["hits"] += 1
+                return entry[1]
+            self._stats["misses"] += 1
+
+        # Built outside the lock; two concurrent misses for the same key both build, last one wins
+        value = build()
+        with self._lock:
+            self._entries[cache_key] = (now, value)
+            self._entries.move_to_end(cache_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+        return value
+
+    def invalidate(self, namespace=None):
+        with self._lock:
+            if namespace is None:
+                self._entries.clear()
+            else:
+                for cache_key in [cache_key for cache_key in self._entries if cache_key[0] == namespace]:
+                    del self._entries[cache_key]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self._stats, entries=len(self._entries))
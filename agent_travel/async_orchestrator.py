@@ -0,0 +1,140 @@
+import asyncio
+import weakref
+from orchestrator import Orchestrator, acall_gemini
+
+DEFAULT_MAX_CONCURRENCY = 8
+
+
+def _run_sync(coro):
+    """Runs a coroutine to completion from synchronous code (not from inside a running event loop)."""
+    return asyncio.run(coro)
+
+
+class AsyncOrchestrator(Orchestrator):
+    """
+    asyncio-native Orchestrator. Independent work (itinerary and trip-title
+    generation, per-day details, location verification and budget summary) is
+    fanned out concurrently, with at most max_concurrency LLM calls or blocking
+    jobs in flight per event loop. The sync entry points are thin wrappers.
+    """
+
+    def __init__(self, trip_store=None, max_concurrency=DEFAULT_MAX_CONCURRENCY, cache=None):
+        super().__init__(trip_store=trip_store, cache=cache)
+        self.max_concurrency = max_concurrency
+        self._semaphores = weakref.WeakKeyDictionary()
+
+    def _limit(self):
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._semaphores[loop] = semaphore
+        return semaphore
+
+    async def _call_llm(self, prompt):
+        async with self._limit():
+            return await acall_gemini(prompt)
+
+    async def _run_blocking(self, func, *args):
+        async with self._limit():
+            return await asyncio.to_thread(func, *args)
+
+    async def agenerate_trip_title_with_llm(self, plan, initial_query=None):
+        title = await self._call_llm(self._trip_title_prompt(plan, initial_query=initial_query))
+        return self._clean_trip_title(title)
+
+    async def aprocess_user_input(self, user_input, current_state):
+        state = current_state
+        state["conversation_history"].append({"role": "user", "content": user_input})
+
+        prompt = None
+        ai_response = ""
+        if state["current_phase"] == "INITIAL":
+            state["plan"]["initial_query"] = user_input # Store the initial query
+            async with self._limit():
+                await self.travel_planner_agent.aparse_with_llm(user_input, state["plan"])
+            prompt, ai_response = self._plan_parameters_response(state)
+            if prompt:
+                # The title only depends on the plan, so generate it alongside the itinerary
+                ai_response, state["suggested_title"] = await asyncio.gather(
+                    self._call_llm(prompt),
+                    self.agenerate_trip_title_with_llm(state["plan"], initial_query=user_input)
+                )
+                prompt = None
+        elif state["current_phase"] == "ITINERARY":
+            prompt, ai_response = self._itinerary_command_response(user_input, state)
+        elif state["current_phase"] == "BUDGET":
+            state, ai_response = self._budget_command_response(user_input, state)
+
+        if prompt:
+            ai_response = await self._call_llm(prompt)
+        if ai_response:
+            state["conversation_history"].append({"role": "assistant", "content": ai_response})
+            self._record_itinerary(state)
+        return state
+
+    async def afetch_day_details(self, state, days=None):
+        """Requests 'details Day N' for every day of the plan concurrently. Returns {"Day N": details}."""
+        if days is None:
+            days = range(1, int(state["plan"]["duration"]) + 1)
+        queries = [f"Day {day}" for day in days]
+        details = await asyncio.gather(*(self._call_llm(self._details_prompt(query, state["plan"])) for query in queries))
+        return dict(zip(queries, details))
+
+    async def aplan_trip(self, query, plan=None):
+        """
+        Non-interactive planning for batch jobs: extracts the plan from query, applies
+        any fields given in plan on top, and generates the itinerary if nothing is
+        missing. Returns the new state, in the ITINERARY phase once an itinerary was requested.
+        """
+        state = self.get_default_state()
+        if query:
+            state["plan"]["initial_query"] = query
+            state.add_message("user", query)
+            async with self._limit():
+                await self.travel_planner_agent.aparse_with_llm(query, state["plan"])
+        state["plan"].update(plan or {})
+        if self.travel_planner_agent.check_missing_info(state["plan"]):
+            return state
+
+        state["current_phase"] = "ITINERARY"
+        state.add_message("assistant", await self._call_llm(self._itinerary_prompt(state["plan"])))
+        self._record_itinerary(state)
+        return state
+
+    async def asave_current_trip(self, trip_title, current_state):
+        if not trip_title and not current_state.get("suggested_title"):
+            current_state["suggested_title"] = await self.agenerate_trip_title_with_llm(
+                current_state["plan"], initial_query=current_state["plan"].get("initial_query")
+            )
+        return await self._run_blocking(super().save_current_trip, trip_title, current_state)
+
+    async def avalidate_csv_itinerary(self, csv_data):
+        from itinerary_io import read_itinerary
+        from location_rag_tool import process_itinerary
+
+        itinerary_df = read_itinerary(csv_data)
+        # The budget summary does not depend on the verified locations, so both run at once
+        _, summary = await asyncio.gather(
+            self._run_blocking(process_itinerary, itinerary_df),
+            self._run_blocking(self._budget_summary, itinerary_df)
+        )
+        return summary
+
+    async def avalidate_itinerary(self, state):
+        return await self._run_blocking(self.validate_itinerary, state)
+
+    async def agenerate_csv_itinerary(self, state):
+        return await self._run_blocking(self.generate_csv_itinerary, state)
+
+    def process_user_input(self, user_input, current_state):
+        return _run_sync(self.aprocess_user_input(user_input, current_state))
+
+    def fetch_day_details(self, state, days=None):
+        return _run_sync(self.afetch_day_details(state, days=days))
+
+    def save_current_trip(self, trip_title, current_state):
+        return _run_sync(self.asave_current_trip(trip_title, current_state))
+
+    def validate_csv_itinerary(self, csv_data):
+        return _run_sync(self.avalidate_csv_itinerary(csv_data))
@@ -0,0 +1,118 @@
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import pandas as pd
+
+from generate_csv_itinerary import find_itinerary_content, iter_itinerary_rows
+from trip_store import TripStore, open_trip_store
+
+ROW_COLUMNS = ["trip", "destination", "plan_month", "day", "date", "activity", "cost"]
+DEFAULT_CHUNK_SIZE = 200
+
+
+def _trip_sources(store: TripStore) -> Iterator[Tuple[str, str, str, str]]:
+    """(title, destination, plan month, itinerary text) for every saved trip that has an itinerary."""
+    for trip_title, state in store.items():
+        itinerary_content = find_itinerary_content(state)
+        if itinerary_content:
+            plan = state.get("plan") or {}
+            yield trip_title, plan.get("destination") or "Unknown", plan.get("month") or "", itinerary_content
+
+
+def _parse_trips(trips: List[Tuple[str, str, str, str]]) -> List[tuple]:
+    """Flattens a chunk of trips into activity rows; runs in a worker process when a pool is used."""
+    rows = []
+    for trip_title, destination, plan_month, itinerary_content in trips:
+        for row in iter_itinerary_rows([itinerary_content]):
+            rows.append((trip_title, destination, plan_month, row.day, row.date, row.activity, row.cost))
+    return rows
+
+
+def _chunks(iterable: Iterable, size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def load_activity_frame(store: TripStore, workers: Optional[int] = None,
+                        chunk_size: int = DEFAULT_CHUNK_SIZE) -> pd.DataFrame:
+    """
+    One row per itinerary activity across every saved trip. Parsing is fanned out
+    over a process pool of the given size; workers=None or 1 parses in-process.
+    """
+    chunks = _chunks(_trip_sources(store), chunk_size)
+    if workers and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            parsed = list(executor.map(_parse_trips, chunks))
+    else:
+        parsed = [_parse_trips(chunk) for chunk in chunks]
+    return pd.DataFrame([row for rows in parsed for row in rows], columns=ROW_COLUMNS)
+
+
+def cost_statistics(activities: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+    """
+    Per-trip, per-destination and per-month cost statistics computed with
+    groupby over the activity rows of every trip at once. A trip's month is the
+    month of its first itinerary date, falling back to the month in its plan.
+    """
+    day_totals = activities.groupby(["trip", "day"], sort=False)["cost"].sum()
+    trips = activities.groupby("trip").agg(
+        destination=("destination", "first"),
+        plan_month=("plan_month", "first"),
+        first_date=("date", "first"),
+        activities=("activity", "size"),
+        priced_activities=("cost", "count"),
+        days=("day", "nunique"),
+        total_cost=("cost", "sum"),
+    )
+    # Each trip is filed under the month it starts in
+    start_dates = pd.to_datetime(trips.pop("first_date"), format="%B %d, %Y", errors="coerce")
+    trips.insert(1, "month", start_dates.dt.strftime("%Y-%m").fillna(trips.pop("plan_month").replace("", "Unknown")))
+    trips["cost_per_day"] = trips["total_cost"] / trips["days"]
+    trips["max_day_cost"] = day_totals.groupby(level="trip").max()
+
+    def by(column):
+        return trips.groupby(column).agg(
+            trips=("total_cost", "size"),
+            total_cost=("total_cost", "sum"),
+            mean_trip_cost=("total_cost", "mean"),
+            median_trip_cost=("total_cost", "median"),
+            max_trip_cost=("total_cost", "max"),
+            mean_cost_per_day=("cost_per_day", "mean"),
+        )
+
+    return {"trips": trips, "destinations": by("destination"), "months": by("month")}
+
+
+def build_cost_report(store: TripStore, workers: Optional[int] = None) -> Dict[str, pd.DataFrame]:
+    """Loads and parses every saved trip, then returns cost_statistics() over all of them."""
+    return cost_statistics(load_activity_frame(store, workers=workers))
+
+
+def report_to_json(report: Dict[str, pd.DataFrame]) -> dict:
+    return {name: json.loads(frame.reset_index().to_json(orient="records")) for name, frame in report.items()}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cost report over every saved trip.")
+    parser.add_argument("--store", default=os.getenv("TRIP_STORE_PATH", "user_trips.db"),
+                        help="Trip store path (.json or SQLite).")
+    parser.add_argument("--workers", type=int, default=None, help="Parse itineraries on this many processes.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.store):
+        print(f"Error: File not found: {args.store}", file=sys.stderr)
+        sys.exit(1)
+    report = report_to_json(build_cost_report(open_trip_store(args.store), workers=args.workers))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Wrote cost report for {len(report['trips'])} trips to {args.output}")
+    else:
+        print(json.dumps(report, indent=2))
@@ -0,0 +1,184 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Optional, Set
+
+from async_orchestrator import AsyncOrchestrator
+
+DEFAULT_CONCURRENCY = 16
+QUERY_KEYS = ("query", "request", "prompt", "body")
+ID_KEYS = ("id", "request_id")
+# Trips with these statuses are not generated again on restart; errors are retried
+FINISHED_STATUSES = {"ok", "incomplete"}
+
+
+def read_trip_requests(path: str) -> Iterator[dict]:
+    """
+    Trip requests from a JSONL file, one object per line: an id (defaults to the
+    line number), the free-text request and optional "plan" fields that override
+    what is extracted from it. Unreadable lines come back with an "error" key.
+    """
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"id": f"line-{line_number}", "error": f"Invalid JSON: {e}"}
+                continue
+            if not isinstance(request, dict):
+                yield {"id": f"line-{line_number}", "error": "Expected a JSON object"}
+                continue
+            request_id = next((request[key] for key in ID_KEYS if request.get(key) is not None), f"line-{line_number}")
+            request["id"] = str(request_id)
+            yield request
+
+
+def finished_ids(output_path: str) -> Set[str]:
+    """
+    Ids already finished in an existing output file. A line cut short by an
+    interrupted run is truncated so the file stays valid JSONL.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        if end < len(data):
+            f.truncate(end)
+    done = set()
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        if isinstance(record, dict) and record.get("status") in FINISHED_STATUSES:
+            done.add(str(record.get("id")))
+    return done
+
+
+class BatchGenerator:
+    """
+    Generates itineraries for a stream of trip requests with at most concurrency
+    trips in flight. Each result (plan, itinerary text, CSV and validation summary)
+    is appended to the output JSONL as soon as it is ready, so a restarted run
+    picks up where the last one stopped.
+    """
+
+    def __init__(self, orchestrator: Optional[AsyncOrchestrator] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 validate: bool = True, save: bool = False):
+        self.orchestrator = orchestrator or AsyncOrchestrator(max_concurrency=concurrency)
+        self.concurrency = concurrency
+        self.validate = validate
+        self.save = save
+        self.counts = Counter()
+
+    async def generate(self, request: dict) -> dict:
+        """The output record for one trip request; failures are recorded, not raised."""
+        start = time.perf_counter()
+        record = {"id": request["id"]}
+        try:
+            record.update(await self._generate(request))
+        except Exception as e:
+            record.update(status="error", error=f"{type(e).__name__}: {e}")
+        record["seconds"] = round(time.perf_counter() - start, 3)
+        return record
+
+    async def _generate(self, request: dict) -> dict:
+        if "error" in request:
+            return {"status": "error", "error": request["error"]}
+        query = next((request[key] for key in QUERY_KEYS if request.get(key)), None)
+        plan = request.get("plan") or {}
+        if not query and not plan:
+            return {"status": "error", "error": f"No trip request; expected one of: {', '.join(QUERY_KEYS)}"}
+
+        orchestrator = self.orchestrator
+        state = await orchestrator.aplan_trip(query, plan)
+        missing = orchestrator.travel_planner_agent.check_missing_info(state["plan"])
+        if missing:
+            return {"status": "incomplete", "plan": state["plan"], "missing": missing}
+        itinerary = state.current_itinerary()
+        if not itinerary:
+            return {"status": "error", "plan": state["plan"],
+                    "error": f"No itinerary in response: {state['conversation_history'][-1]['content'][:200]}"}
+
+        record = {"status": "ok", "plan": state["plan"], "itinerary": itinerary,
+                  "csv": await orchestrator.agenerate_csv_itinerary(state)}
+        if self.validate:
+            record["validation"] = await orchestrator.avalidate_itinerary(state)
+        if self.save:
+            await orchestrator.asave_current_trip(request.get("title"), state)
+            record["title"] = request.get("title") or state["suggested_title"]
+        return record
+
+    async def run(self, input_path: str, output_path: str) -> Counter:
+        """Generates every request of input_path not already finished in output_path. Returns status counts."""
+        done = finished_ids(output_path)
+        # Blocking model calls and validation run on the loop's default executor; size it to match
+        asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(max_workers=self.concurrency))
+        queue = asyncio.Queue(maxsize=self.concurrency * 2)
+
+        with open(output_path, "a") as output:
+            async def worker():
+                while (request := await queue.get()) is not None:
+                    record = await self.generate(request)
+                    output.write(json.dumps(record) + "\n")
+                    output.flush()
+                    self.counts[record["status"]] += 1
+
+            workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+            for request in read_trip_requests(input_path):
+                if request["id"] in done:
+                    self.counts["skipped"] += 1
+                    continue
+                await queue.put(request)
+            for _ in workers:
+                await queue.put(None)
+            await asyncio.gather(*workers)
+        return self.counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate itineraries for a JSONL file of trip requests.")
+    parser.add_argument("input", help="JSONL of trip requests.")
+    parser.add_argument("output", help="JSONL of results; appended to, and finished trips are skipped on restart.")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Trips and LLM calls in flight.")
+    parser.add_argument("--no-validate", action="store_true", help="Skip location and budget validation.")
+    parser.add_argument("--save", action="store_true", help="Also save every generated trip to the trip store.")
+    parser.add_argument("--store", default=os.getenv("TRIP_STORE_PATH", "user_trips.db"),
+                        help="Trip store path (.json or SQLite) for --save.")
+    parser.add_argument("--stub-llm", action="store_true", help="Answer LLM calls offline with a stub model.")
+    parser.add_argument("--stub-latency", type=float, default=0.0, help="Seconds the stub model takes per call.")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        print(f"Error: File not found: {args.input}", file=sys.stderr)
+        sys.exit(1)
+    if args.stub_llm:
+        from llm_client import LLMClient, StubModel, set_client
+        set_client(LLMClient(model=StubModel(latency=args.stub_latency)))
+    trip_store = None
+    if args.save:
+        from trip_store import open_trip_store
+        trip_store = open_trip_store(args.store)
+
+    orchestrator = AsyncOrchestrator(trip_store=trip_store, max_concurrency=args.concurrency)
+    generator = BatchGenerator(orchestrator, concurrency=args.concurrency, validate=not args.no_validate, save=args.save)
+    start = time.perf_counter()
+    counts = asyncio.run(generator.run(args.input, args.output))
+    elapsed = time.perf_counter() - start
+    processed = sum(count for status, count in counts.items() if status != "skipped")
+    print(f"{counts['ok']} generated, {counts['incomplete']} incomplete, {counts['error']} failed, "
+          f"{counts['skipped']} already done in {elapsed:.1f}s ({processed / elapsed * 3600:,.0f} trips/hour)",
+          file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,49 @@
+import argparse
+import io
+import time
+from contextlib import redirect_stderr
+from generate_csv_itinerary import parse_itinerary_content
+
+ACTIVITY_TEMPLATES = [
+    "* Colosseum Tour (Includes underground and arena floor access) @ Colosseum $75.00 (2.5)",
+    "* Roman Forum & Palatine Hill (Explore the ancient ruins) @ Roman Forum $30.00",
+    "* Lunch at a Trattoria (Authentic Roman pasta, with wine) @ Trattoria Monti $1,250.00 per person (15 min travel time)",
+    "* Evening Stroll @ Trastevere",
+    "* Gelato Break $6",
+    "* Free Time (Relax at the hotel)",
+]
+
+
+def synthetic_itinerary(num_lines: int, activities_per_day: int = 5) -> str:
+    """An itinerary of num_lines lines, one day header followed by activities_per_day activities."""
+    lines = []
+    day = 0
+    while len(lines) < num_lines:
+        if len(lines) % (activities_per_day + 1) == 0:
+            day += 1
+            lines.append(f"**Day {day}: July {day % 28 + 1}, 2025:**")
+        else:
+            lines.append(ACTIVITY_TEMPLATES[len(lines) % len(ACTIVITY_TEMPLATES)])
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parse_itinerary_content on a synthetic itinerary.")
+    parser.add_argument("--lines", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    content = synthetic_itinerary(args.lines)
+    best = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        with redirect_stderr(io.StringIO()):
+            entries = parse_itinerary_content(content)
+        best = min(best, time.perf_counter() - start)
+
+    print(f"Parsed {args.lines} lines ({len(entries)} entries) in {best:.3f}s (best of {args.repeat})")
+    print(f"{args.lines / best:,.0f} lines/sec")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+import argparse
+import csv
+import io
+import re
+import time
+import unittest.mock
+from contextlib import redirect_stderr, redirect_stdout
+
+with redirect_stdout(io.StringIO()):
+    import evaluate_csv
+from bench_parse_itinerary import synthetic_itinerary
+from generate_csv_itinerary import (
+    DAY_PATTERN, ItineraryEntry, iter_itinerary_rows, parse_activity_line, rows_to_entries
+)
+
+
+def per_row_pydantic_parse(content):
+    """The previous hot path: one validated ItineraryEntry per activity line."""
+    entries = []
+    day = date = None
+    for line in content.split("\n"):
+        line = line.strip()
+        day_match = DAY_PATTERN.match(line)
+        if day_match:
+            day, date = f"Day {day_match.group(1)}", day_match.group(2)
+        elif line.startswith("*"):
+            entries.append(ItineraryEntry(day=day, date=date, **parse_activity_line(line)))
+    return entries
+
+
+def per_row_pydantic_evaluate(csv_data):
+    """evaluate_csv with the pre-check disabled, so every row is validated by the model as before."""
+    with unittest.mock.patch.object(evaluate_csv, "PLAIN_COST_PATTERN", re.compile(r"(?!)")):
+        return evaluate_csv.evaluate_csv_itinerary(csv_data)
+
+
+def synthetic_csv(num_rows):
+    output = io.StringIO()
+    writer = csv.writer(output, lineterminator="\n")
+    writer.writerow(["Day", "Date", "Activity", "Description", "Location", "Cost", "Travel Distance to Next Location"])
+    for i in range(num_rows):
+        day = i // 5 + 1
+        writer.writerow([f"Day {day}", "July 20, 2025", f"Activity {i}", "Description", "Rome", f"{i % 90}.50", ""])
+    return output.getvalue()
+
+
+def best_time(func, arg, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        with redirect_stderr(io.StringIO()):
+            func(arg)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def report(name, num_rows, baseline, fast):
+    print(f"{name}: per-row pydantic {num_rows / baseline:,.0f} rows/sec, "
+          f"fast path {num_rows / fast:,.0f} rows/sec ({baseline / fast:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare per-row pydantic validation with the fast row path.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    # Six lines per day header, five of them activities
+    content = synthetic_itinerary(args.rows * 6 // 5)
+    num_activities = len(per_row_pydantic_parse(content))
+    baseline = best_time(per_row_pydantic_parse, content, args.repeat)
+    report("parse (rows)", num_activities, baseline,
+           best_time(lambda text: list(iter_itinerary_rows([text])), content, args.repeat))
+    report("parse (bulk-validated entries)", num_activities, baseline,
+           best_time(lambda text: rows_to_entries(iter_itinerary_rows([text])), content, args.repeat))
+
+    csv_data = synthetic_csv(args.rows)
+    report("evaluate_csv", args.rows, best_time(per_row_pydantic_evaluate, csv_data, args.repeat),
+           best_time(evaluate_csv.evaluate_csv_itinerary, csv_data, args.repeat))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import json
+import time
+from bench_parse_itinerary import synthetic_itinerary
+from generate_csv_itinerary import find_itinerary_content
+from session_state import SessionState
+
+
+def long_session(num_messages: int, itinerary_lines: int) -> SessionState:
+    """A session whose itinerary comes early, followed by num_messages of follow-up conversation."""
+    state = SessionState(current_phase="ITINERARY", plan={"destination": "Rome", "duration": 7})
+    state.add_message("user", "Plan a 7-day trip to Rome in July")
+    state.add_message("assistant", synthetic_itinerary(itinerary_lines))
+    for i in range(num_messages):
+        state.add_message("user", f"details Day {i % 7 + 1}")
+        state.add_message("assistant", "Practical details for the day. " * 40)
+    return state
+
+
+def per_call(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Itinerary lookup on long sessions: JSON round-trip vs SessionState.")
+    parser.add_argument("--messages", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--itinerary-lines", type=int, default=60)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    for num_messages in args.messages:
+        state = long_session(num_messages, args.itinerary_lines)
+        state_dict = state.to_dict()
+        del state_dict["itinerary"]
+
+        # Previous path: the app serialized the state, the orchestrator parsed it back and scanned the history
+        round_trip = per_call(lambda: find_itinerary_content(json.loads(json.dumps(state_dict))), args.repeat)
+        rescan = per_call(lambda: find_itinerary_content(state_dict), args.repeat)
+        state.current_itinerary()
+        state.add_message("user", "thanks!")
+        cached = per_call(state.current_itinerary, args.repeat)
+        print(f"{len(state.conversation_history):>6} messages: JSON round-trip {round_trip * 1e6:,.1f} us, "
+              f"dict scan {rescan * 1e6:,.1f} us, SessionState {cached * 1e6:,.2f} us "
+              f"({round_trip / cached:,.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
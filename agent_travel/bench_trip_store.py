@@ -0,0 +1,47 @@
+import argparse
+import os
+import tempfile
+import time
+from trip_store import SQLiteTripStore
+
+
+def conversation(num_messages):
+    return {
+        "current_phase": "ITINERARY",
+        "plan": {"destination": "Rome", "duration": 7, "interests": ["history", "food"]},
+        "conversation_history": [
+            {"role": "user" if i % 2 == 0 else "assistant", "content": f"Turn {i}. " + "Some travel chat. " * 30}
+            for i in range(num_messages)
+        ],
+    }
+
+
+def save_latency(store, state, turns):
+    """Mean time to save after each of turns new messages, as an autosave after every turn would."""
+    store.put("Trip", state)
+    start = time.perf_counter()
+    for i in range(turns):
+        state["conversation_history"].append({"role": "user", "content": f"follow-up {i}"})
+        store.put("Trip", state)
+    return (time.perf_counter() - start) / turns
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-turn save latency: full snapshot rewrites vs the append-only log.")
+    parser.add_argument("--messages", type=int, nargs="+", default=[10, 100, 1000, 5000])
+    parser.add_argument("--turns", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for num_messages in args.messages:
+            # snapshot_interval=1 writes a snapshot on every save, like the store did before the log
+            full = SQLiteTripStore(os.path.join(temp_dir, f"full-{num_messages}.db"), snapshot_interval=1)
+            logged = SQLiteTripStore(os.path.join(temp_dir, f"log-{num_messages}.db"))
+            full_latency = save_latency(full, conversation(num_messages), args.turns)
+            logged_latency = save_latency(logged, conversation(num_messages), args.turns)
+            print(f"{num_messages:>6} messages: full rewrite {full_latency * 1e3:.2f} ms/save, "
+                  f"append-only log {logged_latency * 1e3:.2f} ms/save ({full_latency / logged_latency:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,8 @@ from pydantic import BaseModel, Field, validator
 from typing import Optional, List
 from datetime import datetime
 import numpy as np
+import re
+from itinerary_io import read_itinerary
 
 class Trip(BaseModel):
     """A Pydantic model to represent a trip record from a CSV file."""
@@ -26,87 +28,120 @@ class Trip(BaseModel):
         except (ValueError, TypeError):
             raise ValueError("Invalid cost format")
 
+# Date formats accepted in the Date column; generate_csv_itinerary writes the last one.
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y", "%B %d, %Y")
+
+DAY_NUMBER_PATTERN = r"(?i)^\s*(?:day\s*)?(\d+)"
+
+def infer_date_format(dates: pd.Series) -> Optional[str]:
+    """
+    The first of DATE_FORMATS that parses every date, else the one that parses
+    the most. Only the distinct values are tried, so this is cheap even for
+    long itineraries where each day's date repeats on every activity.
+    """
+    unique_dates = pd.Series(dates.unique())
+    best_format, best_count = None, 0
+    for date_format in DATE_FORMATS:
+        count = pd.to_datetime(unique_dates, format=date_format, errors='coerce').notna().sum()
+        if count == len(unique_dates):
+            return date_format
+        if count > best_count:
+            best_format, best_count = date_format, count
+    return best_format
+
+def _out_of_order(values: pd.Series) -> pd.Index:
+    """Index labels of values smaller than some value before them."""
+    return values.index[values < values.cummax().shift()]
+
 class BudgetAgent:
-    def __init__(self, csv_path):
-        self.csv_path = csv_path
+    def __init__(self, source):
+        # A CSV path or text, a file-like object, a DataFrame or a list of ItineraryEntry
+        self.source = source
         self.trips: List[Trip] = []
         self.errors = []
 
     def load_data(self):
         try:
-            df = pd.read_csv(self.csv_path, dtype={'Cost': str, 'Description': str, 'Travel Distance to Next Location': str})
-
-            if 'Day' not in df.columns or df['Day'].isnull().all():
-                # Programmatically add Day and Date
-                num_activities = len(df)
-                activities_per_day = 4 
-                num_days = (num_activities + activities_per_day - 1) // activities_per_day
-                
-                days = []
-                for i in range(num_days):
-                    days.extend([i + 1] * activities_per_day)
-                df['Day'] = days[:num_activities]
-
-                start_date = datetime(2025, 7, 20)
-                dates = []
-                for i in range(num_days):
-                    date = start_date + pd.Timedelta(days=i)
-                    dates.extend([date.strftime('%Y-%m-%d')] * activities_per_day)
-                df['Date'] = dates[:num_activities]
-
-
-            df['Travel Distance to Next Location'] = df['Travel Distance to Next Location'].replace({np.nan: None})
-            df['Description'] = df['Description'].replace({np.nan: None})
-            df['Day'] = pd.to_numeric(df['Day'], errors='coerce').astype(pd.Int64Dtype())
-
-            # Forward fill Day and Date
-            df['Day'] = df['Day'].ffill()
-            df['Date'] = df['Date'].ffill()
-            
-            # Drop rows where essential information is missing
-            df.dropna(subset=['Activity', 'Cost'], inplace=True)
-
+            df = self._prepare_frame(read_itinerary(self.source))
             for index, row in df.iterrows():
                 try:
                     self.trips.append(Trip(**row.to_dict()))
                 except ValueError as e:
                     self.errors.append(f"Row {index + 2}: {e}")
         except FileNotFoundError:
-            self.errors.append(f"File not found: {self.csv_path}")
+            self.errors.append(f"File not found: {self.source}")
         except Exception as e:
             self.errors.append(f"An error occurred: {e}")
 
+    def _prepare_frame(self, df):
+        """Fills in missing columns, Day and Date, and drops rows without an activity or cost."""
+        for column in ('Description', 'Location', 'Travel Distance to Next Location'):
+            if column not in df.columns:
+                df[column] = None
+
+        if 'Day' not in df.columns or df['Day'].isnull().all():
+            # Programmatically add Day and Date
+            num_activities = len(df)
+            activities_per_day = 4 
+            num_days = (num_activities + activities_per_day - 1) // activities_per_day
+            
+            days = []
+            for i in range(num_days):
+                days.extend([i + 1] * activities_per_day)
+            df['Day'] = days[:num_activities]
+
+            start_date = datetime(2025, 7, 20)
+            dates = []
+            for i in range(num_days):
+                date = start_date + pd.Timedelta(days=i)
+                dates.extend([date.strftime('%Y-%m-%d')] * activities_per_day)
+            df['Date'] = dates[:num_activities]
+
+
+        for column in ('Description', 'Location', 'Travel Distance to Next Location'):
+            df[column] = df[column].astype(object).replace({np.nan: None})
+        if not pd.api.types.is_numeric_dtype(df['Day']):
+            # generate_csv_itinerary writes days as "Day 1", "Day 2", ...
+            df['Day'] = df['Day'].astype(str).str.extract(DAY_NUMBER_PATTERN, expand=False)
+        df['Day'] = pd.to_numeric(df['Day'], errors='coerce').astype(pd.Int64Dtype())
+
+        # Forward fill Day and Date
+        df['Day'] = df['Day'].ffill()
+        df['Date'] = df['Date'].ffill()
+        
+        # Drop rows where essential information is missing
+        return df.dropna(subset=['Activity', 'Cost'])
+
     def validate_data(self):
         if not self.trips:
             return
+        self._validate_sequences(*self._days_and_dates())
 
+    def _validate_sequences(self, days, dates):
         # Validate day and date sequences
-        days = [trip.day for trip in self.trips if trip.day is not None]
-        dates = [trip.date for trip in self.trips if trip.date is not None]
-
-        if sorted(days) != days:
+        days = pd.Series(days, dtype=float).reset_index(drop=True)
+        if not days.is_monotonic_increasing:
             self.errors.append("Day sequence is not in ascending order.")
-        
-        # Date validation
-        date_objects = []
-        for i, date_str in enumerate(dates):
-            try:
-                # Attempt to parse multiple date formats
-                dt = None
-                for fmt in ("%Y-%m-%d", "%m/%d/%Y", "%d/%m/%Y"):
-                    try:
-                        dt = datetime.strptime(date_str, fmt)
-                        break
-                    except ValueError:
-                        continue
-                if dt is None:
-                    raise ValueError
-                date_objects.append(dt)
-            except (ValueError, TypeError):
-                self.errors.append(f"Invalid date format at index {i}: {date_str}")
-
-        if sorted(date_objects) != date_objects:
+            for i in _out_of_order(days):
+                self.errors.append(f"Day out of order at index {i}: {int(days[i])}")
+
+        # Date validation: one format for the whole file, parsed column-wise
+        dates = pd.Series(dates, dtype=object).reset_index(drop=True).astype(str)
+        date_format = infer_date_format(dates)
+        parsed = pd.to_datetime(dates, format=date_format, errors='coerce') if date_format else pd.Series(pd.NaT, index=dates.index)
+        for i in parsed.index[parsed.isna()]:
+            self.errors.append(f"Invalid date format at index {i}: {dates[i]}")
+
+        parsed = parsed.dropna()
+        if not parsed.is_monotonic_increasing:
             self.errors.append("Date sequence is not in chronological order.")
+            for i in _out_of_order(parsed):
+                self.errors.append(f"Date out of chronological order at index {i}: {dates[i]}")
+
+    def _days_and_dates(self):
+        days = [trip.day for trip in self.trips if trip.day is not None]
+        dates = [trip.date for trip in self.trips if trip.date is not None]
+        return days, dates
 
     def get_summary(self):
         if self.errors:
@@ -122,6 +157,116 @@ class BudgetAgent:
         
         return summary
 
+# Activity keywords per spending category; the first matching category wins.
+CATEGORY_KEYWORDS = {
+    "Transport": ["airport", "arrival", "departure", "train", "taxi", "bus", "flight", "metro", "transfer"],
+    "Lodging": ["hotel", "check-in", "check in", "hostel", "airbnb", "accommodation"],
+    "Food": ["breakfast", "lunch", "dinner", "restaurant", "trattoria", "cafe", "café", "food",
+             "gelato", "pizza", "wine", "tasting", "market"],
+    "Sightseeing": ["tour", "museum", "colosseum", "forum", "basilica", "church", "gallery", "fountain",
+                    "pantheon", "vatican", "walk"],
+}
+
+class ColumnarBudgetAgent(BudgetAgent):
+    """
+    BudgetAgent that validates and aggregates whole columns with pandas instead
+    of building a Trip model per row. Takes the same sources and returns the same
+    summary; also offers per-category and running totals.
+    """
+    def __init__(self, source):
+        super().__init__(source)
+        self.df = None
+
+    def load_data(self):
+        try:
+            df = self._prepare_frame(read_itinerary(self.source))
+        except FileNotFoundError:
+            self.errors.append(f"File not found: {self.source}")
+            return
+        except Exception as e:
+            self.errors.append(f"An error occurred: {e}")
+            return
+
+        cost_text = df['Cost'].astype(str).str.replace('$', '', regex=False).str.replace(',', '', regex=False)
+        cost = pd.to_numeric(cost_text, errors='coerce')
+        travel = df['Travel Distance to Next Location']
+        travel_value = pd.to_numeric(travel, errors='coerce')
+
+        bad_cost = cost.isna()
+        bad_travel = travel_value.isna() & travel.notna()
+        for index in df.index[bad_cost | bad_travel]:
+            problems = []
+            if bad_cost[index]:
+                problems.append(f"Cost: Invalid cost format (got {df.at[index, 'Cost']!r})")
+            if bad_travel[index]:
+                problems.append(f"Travel Distance to Next Location: Input should be a valid number (got {travel[index]!r})")
+            self.errors.append(f"Row {index + 2}: {'; '.join(problems)}")
+
+        valid = ~(bad_cost | bad_travel)
+        df = df[valid].copy()
+        df['Cost'] = cost[valid].astype(float)
+        df['Travel Distance to Next Location'] = travel_value[valid]
+        self.df = df
+
+    def validate_data(self):
+        if self.df is None or self.df.empty:
+            return
+        self._validate_sequences(*self._days_and_dates())
+
+    def _days_and_dates(self):
+        return self.df['Day'].dropna().tolist(), self.df['Date'].dropna().tolist()
+
+    def _day_rows(self):
+        return self.df[self.df['Day'].notna()]
+
+    def get_summary(self):
+        if self.errors:
+            return {"errors": self.errors}
+        if self.df is None:
+            return {}
+
+        df = self._day_rows()
+        labels = df['Activity'].astype(str) + ': $' + df['Cost'].map(str)
+        grouped = df.groupby('Day', sort=False)
+        dates = grouped['Date'].first()
+        totals = grouped['Cost'].sum()
+        activities = labels.groupby(df['Day'], sort=False).agg(list)
+        return {
+            int(day): {"date": dates[day], "activities": activities[day], "total_cost": float(totals[day])}
+            for day in totals.index
+        }
+
+    def get_category_totals(self):
+        """Total cost per spending category, inferred from the activity names."""
+        if self.df is None or self.df.empty:
+            return {}
+        activity = self.df['Activity'].astype(str).str.lower()
+        conditions = [
+            activity.str.contains("|".join(map(re.escape, keywords)), regex=True)
+            for keywords in CATEGORY_KEYWORDS.values()
+        ]
+        categories = np.select(conditions, list(CATEGORY_KEYWORDS), default="Other")
+        totals = self.df['Cost'].groupby(categories).sum()
+        return {category: float(total) for category, total in totals.items()}
+
+    def get_running_totals(self):
+        """Cumulative trip cost at the end of each day, in itinerary order."""
+        if self.df is None or self.df.empty:
+            return {}
+        totals = self._day_rows().groupby('Day', sort=False)['Cost'].sum().cumsum()
+        return {int(day): float(total) for day, total in totals.items()}
+
+    def get_report(self):
+        """The summary together with per-category and running totals."""
+        summary = self.get_summary()
+        if "errors" in summary:
+            return summary
+        return {
+            "days": summary,
+            "category_totals": self.get_category_totals(),
+            "running_totals": self.get_running_totals(),
+        }
+
 if __name__ == '__main__':
     agent = BudgetAgent('Rome.csv')
     agent.load_data()
@@ -3,8 +3,18 @@ import io
 import re
 import json
 from pydantic import ValidationError
-from orchestrator import ItineraryEntry # Assuming ItineraryEntry is accessible
+from itinerary_models import ItineraryEntry
 from datetime import datetime
+from functools import lru_cache
+
+DAY_NUMBER_PATTERN = re.compile(r"Day (\d+)")
+# Costs the model's float field is certain to accept; anything else is validated by pydantic
+PLAIN_COST_PATTERN = re.compile(r"-?[0-9]+(?:\.[0-9]+)?")
+
+@lru_cache(maxsize=1024)
+def _parse_date(date_str: str) -> datetime:
+    # Every activity of a day repeats the same date string, so most lookups are cache hits
+    return datetime.strptime(date_str, '%B %d, %Y')
 
 def evaluate_csv_itinerary(csv_data: str):
     """
@@ -31,53 +41,58 @@ def evaluate_csv_itinerary(csv_data: str):
             invalid_rows += 1
             continue
 
-        row_dict = {
-            "day": row[0],
-            "date": row[1],
-            "activity": row[2],
-            "description": row[3] if len(row) > 3 else None,
-            "location": row[4] if len(row) > 4 else None,
-            "cost": row[5] if len(row) > 5 else None,
-            "travel_distance_to_next_location": row[6] if len(row) > 6 else None,
-        }
-        
-        try:
-            entry = ItineraryEntry(**row_dict)
-            valid_rows += 1
+        day, date = row[0], row[1]
+        travel_distance = None
+        if not PLAIN_COST_PATTERN.fullmatch(row[5]):
+            # Only rows that fail the cheap pre-check pay for full pydantic validation
+            row_dict = {
+                "day": row[0],
+                "date": row[1],
+                "activity": row[2],
+                "description": row[3] if len(row) > 3 else None,
+                "location": row[4] if len(row) > 4 else None,
+                "cost": row[5] if len(row) > 5 else None,
+                "travel_distance_to_next_location": row[6] if len(row) > 6 else None,
+            }
+            try:
+                entry = ItineraryEntry(**row_dict)
+            except ValidationError as e:
+                invalid_rows += 1
+                errors.append(f"Row {row_num} invalid: {e.errors()}")
+                continue
+            day, date, travel_distance = entry.day, entry.date, entry.travel_distance_to_next_location
 
-            # --- Guardrail Checks ---
-            current_day_num = 0
-            day_num_match = re.match(r"Day (\d+)", entry.day)
-            if day_num_match:
-                try:
-                    current_day_num = int(day_num_match.group(1))
-                except ValueError:
-                    errors.append(f"Row {row_num}: Invalid Day number format: {entry.day}. Expected 'Day X' where X is a number.")
-            else:
-                errors.append(f"Row {row_num}: Invalid Day format: {entry.day}. Expected 'Day X'.")
-            if i > 0: # Only check sequence from the second row onwards
-                if current_day_num != previous_day_num and current_day_num != previous_day_num + 1:
-                    errors.append(f"Row {row_num}: Day sequence error. Expected Day {previous_day_num + 1} or {previous_day_num}, got {entry.day}.")
+        valid_rows += 1
 
+        # --- Guardrail Checks ---
+        current_day_num = 0
+        day_num_match = DAY_NUMBER_PATTERN.match(day)
+        if day_num_match:
             try:
-                current_date = datetime.strptime(entry.date, '%B %d, %Y')
-                if previous_date and current_day_num == previous_day_num + 1 and (current_date - previous_date).days != 1:
-                    errors.append(f"Row {row_num}: Date chronology error. Expected date to be one day after {previous_date.strftime('%B %d, %Y')}, got {entry.date}.")
-                elif previous_date and current_day_num == previous_day_num and current_date != previous_date:
-                    errors.append(f"Row {row_num}: Date mismatch for same day. Expected {previous_date.strftime('%B %d, %Y')}, got {entry.date}.")
-                previous_date = current_date
+                current_day_num = int(day_num_match.group(1))
             except ValueError:
-                errors.append(f"Row {row_num}: Invalid date format: {entry.date}. Expected 'Month Day, Year'.")
-            
-            previous_day_num = current_day_num
+                errors.append(f"Row {row_num}: Invalid Day number format: {day}. Expected 'Day X' where X is a number.")
+        else:
+            errors.append(f"Row {row_num}: Invalid Day format: {day}. Expected 'Day X'.")
+        if i > 0: # Only check sequence from the second row onwards
+            if current_day_num != previous_day_num and current_day_num != previous_day_num + 1:
+                errors.append(f"Row {row_num}: Day sequence error. Expected Day {previous_day_num + 1} or {previous_day_num}, got {day}.")
 
-            # Travel Distance to Next Location check for last activity of trip
-            if i == len(rows_for_evaluation) - 1 and entry.travel_distance_to_next_location:
-                errors.append(f"Row {row_num}: Travel Distance to Next Location should be empty for the last activity of the trip.")
+        try:
+            current_date = _parse_date(date)
+            if previous_date and current_day_num == previous_day_num + 1 and (current_date - previous_date).days != 1:
+                errors.append(f"Row {row_num}: Date chronology error. Expected date to be one day after {previous_date.strftime('%B %d, %Y')}, got {date}.")
+            elif previous_date and current_day_num == previous_day_num and current_date != previous_date:
+                errors.append(f"Row {row_num}: Date mismatch for same day. Expected {previous_date.strftime('%B %d, %Y')}, got {date}.")
+            previous_date = current_date
+        except ValueError:
+            errors.append(f"Row {row_num}: Invalid date format: {date}. Expected 'Month Day, Year'.")
+        
+        previous_day_num = current_day_num
 
-        except ValidationError as e:
-            invalid_rows += 1
-            errors.append(f"Row {row_num} invalid: {e.errors()}")
+        # Travel Distance to Next Location check for last activity of trip
+        if i == len(rows_for_evaluation) - 1 and travel_distance:
+            errors.append(f"Row {row_num}: Travel Distance to Next Location should be empty for the last activity of the trip.")
 
     return {
         "total_rows": valid_rows + invalid_rows,
@@ -0,0 +1,160 @@
+import csv
+import hashlib
+import json
+import os
+import re
+from collections import Counter, deque
+from typing import Dict, Iterable, List, Optional
+
+DEFAULT_GAZETTEER_PATH = os.getenv(
+    "GAZETTEER_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "gazetteer_rome.json")
+)
+
+_APOSTROPHES = str.maketrans({"’": "'", "‘": "'", "`": "'"})
+
+
+def normalize_place_name(text: str) -> str:
+    """Case-folds, unifies apostrophes and collapses whitespace."""
+    return " ".join(text.translate(_APOSTROPHES).casefold().split())
+
+
+def place_tokens(text: str) -> List[str]:
+    return re.findall(r"\w+", normalize_place_name(text))
+
+
+def _content_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+class _AhoCorasick:
+    """Finds every occurrence of a fixed set of patterns in one pass over the text."""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[str]] = [[]]
+        for pattern in patterns:
+            self._add(pattern)
+        self._build_failure_links()
+
+    def _add(self, pattern):
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append([])
+                self._goto[state][char] = next_state
+            state = next_state
+        self._output[state].append(pattern)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state].extend(self._output[self._fail[next_state]])
+
+    def find_all(self, text: str) -> List[str]:
+        matches = []
+        state = 0
+        for char in text:
+            while state and char not in self._goto[state]:
+                state = self._fail[state]
+            state = self._goto[state].get(char, 0)
+            matches.extend(self._output[state])
+        return matches
+
+
+class Gazetteer:
+    """
+    Known places indexed for geocoding lookups. A location string resolves, in order, by:
+      1. exact match on the normalized place name (hash map);
+      2. place names occurring anywhere in the string (Aho-Corasick automaton);
+      3. place names whose tokens all occur in the string in any order (token index).
+    When several places match, the lowest "priority" wins, then the longest name,
+    then the earliest entry in the file, so lookups are deterministic.
+    """
+
+    def __init__(self, places: List[dict], version: Optional[str] = None):
+        # Identifies the place data; geocode results cached from this gazetteer are keyed on it
+        self.version = version or _content_hash(json.dumps(places, sort_keys=True, default=str).encode())
+        self._places: List[dict] = []
+        self._rank: Dict[str, tuple] = {}
+        self._by_name: Dict[str, dict] = {}
+        self._token_index: Dict[str, List[str]] = {}
+        self._name_tokens: Dict[str, frozenset] = {}
+        for order, place in enumerate(places):
+            name = normalize_place_name(place["name"])
+            if not name or name in self._by_name:
+                continue
+            self._places.append(place)
+            self._by_name[name] = place
+            self._rank[name] = (float(place.get("priority") or 0), -len(name), order)
+            self._name_tokens[name] = frozenset(place_tokens(name))
+
+        # A name can only match if all of its tokens are present, so it is enough to
+        # post it under its rarest token; that keeps every posting list short.
+        token_counts = Counter(token for tokens in self._name_tokens.values() for token in tokens)
+        for name, tokens in self._name_tokens.items():
+            if tokens:
+                rarest = min(tokens, key=lambda token: (token_counts[token], token))
+                self._token_index.setdefault(rarest, []).append(name)
+        self._automaton = _AhoCorasick(self._by_name)
+
+    @classmethod
+    def from_file(cls, path: str) -> "Gazetteer":
+        """Loads places from a JSON list of objects or a CSV file with the same columns."""
+        with open(path, "rb") as f:
+            version = _content_hash(f.read())
+        if path.endswith(".csv"):
+            with open(path, newline="") as f:
+                places = list(csv.DictReader(f))
+            for place in places:
+                for column in ("lat", "lng", "confidence"):
+                    place[column] = float(place[column])
+        else:
+            with open(path, "r") as f:
+                places = json.load(f)
+        return cls(places, version=version)
+
+    def __len__(self):
+        return len(self._places)
+
+    def lookup(self, location_string: str) -> Optional[dict]:
+        text = normalize_place_name(location_string)
+        if not text:
+            return None
+
+        place = self._by_name.get(text)
+        if place is not None:
+            return place
+
+        candidates = self._automaton.find_all(text)
+        if not candidates:
+            tokens = set(place_tokens(text))
+            candidates = {
+                name for token in tokens for name in self._token_index.get(token, ())
+                if self._name_tokens[name] <= tokens
+            }
+        if not candidates:
+            return None
+        return self._by_name[min(candidates, key=self._rank.__getitem__)]
+
+
+_default_gazetteer = None
+
+
+def get_default_gazetteer() -> Gazetteer:
+    """The gazetteer at GAZETTEER_PATH, loaded once per process."""
+    global _default_gazetteer
+    if _default_gazetteer is None:
+        _default_gazetteer = Gazetteer.from_file(DEFAULT_GAZETTEER_PATH)
+    return _default_gazetteer
@@ -3,10 +3,44 @@ import sys
 import io
 import csv
 import re
-from pydantic import BaseModel, Field, ValidationError, validator
-from typing import Optional, List
+from dataclasses import dataclass
+from pydantic import BaseModel, ConfigDict, Field, TypeAdapter, ValidationError, validator
+from typing import Iterable, Iterator, Optional, List
+
+# Compiled once at import time; the parser below is the hot loop for long itineraries.
+DAY_PATTERN = re.compile(r"^(?:##|\*\*)\s*Day (\d+):\s*([A-Za-z]+\s+\d{1,2},\s+\d{4}):(.*)$")
+
+# One pass over an activity line of the form
+#   * Activity (Description) @ Location $Cost [per person] (Travel)
+# where every part after the activity name is optional. For a cost range such as
+# $20-30 the lower bound is kept.
+ACTIVITY_LINE_PATTERN = re.compile(r"""
+    ^\*\s*
+    (?P<activity>[^(@$]*)
+    (?:\((?P<description>[^)]*)\)\s*)?
+    (?:@\s*(?P<location>[^$(]*))?
+    (?:\$(?P<cost>[^\s(\-–]*)(?:\s*[-–]\s*\$?[\d,.]+)?(?:\s*per\s+person)?\s*)?
+    (?:\((?P<travel>[^)]*)\)\s*)?
+    $""", re.VERBOSE)
+
+# Field-by-field fallback for activity lines outside that grammar, e.g. with the
+# description after the location
+FIELD_LOCATION_PATTERN = re.compile(r"@\s*([^$(@]*)")
+FIELD_COST_PATTERN = re.compile(r"\$\s*(\d[\d,]*(?:\.\d+)?)")
+FIELD_PARENTHETICAL_PATTERN = re.compile(r"\(([^)]*)\)")
+FIELD_ACTIVITY_END_PATTERN = re.compile(r"[@$]")
+
+# A lone parenthetical that is a bare number or a duration is travel, not a description
+TRAVEL_HINT_PATTERN = re.compile(r"^\s*\d[\d,.]*\s*$|\d\s*(?:min|minute|hour)")
+TRAVEL_MINUTES_PATTERN = re.compile(r"(\d[\d,.]*)\s*(?:min|minutes)")
+TRAVEL_HOURS_PATTERN = re.compile(r"(\d[\d,.]*)\s*hour")
+NUMBER_PATTERN = re.compile(r"(\d[\d,.]*)")
+# Costs and travel values of this shape come out of the validators unchanged apart from float()
+PLAIN_NUMBER_PATTERN = re.compile(r"\d[\d,]*(?:\.\d+)?")
 
 class ItineraryEntry(BaseModel):
+    model_config = ConfigDict(populate_by_name=True)
+
     day: str = Field(..., description="The day number, e.g., 'Day 1'")
     date: str = Field(..., description="The specific date for the day, e.g., 'July 17, 2025'")
     activity: str = Field(..., description="The main activity for this entry")
@@ -25,7 +59,7 @@ class ItineraryEntry(BaseModel):
             # Remove commas before converting to float
             return float(str(v).replace(',', ''))
         except ValueError:
-            raise ValueError("Cost must be a number.")
+            raise ValueError("Invalid cost format")
 
     @validator('travel_distance_to_location', pre=True)
     def parse_travel_distance(cls, v):
@@ -37,153 +71,266 @@ class ItineraryEntry(BaseModel):
         s = str(v).lower()
         
         # Handle "min" or "minutes" travel time
-        match_min = re.search(r'(\d[\d,.]*)\s*(?:min|minutes)', s)
+        match_min = TRAVEL_MINUTES_PATTERN.search(s)
         if match_min:
             return float(match_min.group(1).replace(',', ''))
         
         # Handle "hour travel time"
-        match_hour = re.search(r'(\d[\d,.]*)\s*hour', s)
+        match_hour = TRAVEL_HOURS_PATTERN.search(s)
         if match_hour:
             return float(match_hour.group(1).replace(',', '')) * 60  # Convert hours to minutes
             
         # Fallback for just a number
-        match_num = re.search(r'(\d[\d,.]*)', s)
+        match_num = NUMBER_PATTERN.search(s)
         if match_num:
             return float(match_num.group(1).replace(',', ''))
             
         return None
 
-def parse_itinerary_content(itinerary_content: str) -> List[ItineraryEntry]:
-    itinerary_entries = []
-    lines = itinerary_content.split('\n')
-    current_day = None
-    current_date = None
+@dataclass(slots=True)
+class ItineraryRow:
+    """
+    Compact, already-converted itinerary row used on the parse-to-CSV hot path in
+    place of ItineraryEntry. to_entry() validates it into the pydantic model.
+    """
+    day: str
+    date: str
+    activity: str
+    description: Optional[str] = None
+    location: Optional[str] = None
+    cost: Optional[float] = None
+    travel_distance_to_location: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "day": self.day,
+            "date": self.date,
+            "activity": self.activity,
+            "description": self.description,
+            "location": self.location,
+            "cost": self.cost,
+            "travel_distance_to_location": self.travel_distance_to_location,
+        }
+
+    def to_entry(self) -> ItineraryEntry:
+        return ItineraryEntry(**self.as_dict())
+
+    @classmethod
+    def from_entry(cls, entry: ItineraryEntry) -> "ItineraryRow":
+        return cls(entry.day, entry.date, entry.activity, entry.description, entry.location,
+                   entry.cost, entry.travel_distance_to_location)
+
+ENTRY_LIST_ADAPTER = TypeAdapter(List[ItineraryEntry])
+
+def rows_to_entries(rows: Iterable[ItineraryRow]) -> List[ItineraryEntry]:
+    """Validates many rows into ItineraryEntry models in one TypeAdapter call."""
+    return ENTRY_LIST_ADAPTER.validate_python([row.as_dict() for row in rows])
+
+def parse_activity_line(line: str) -> dict:
+    """
+    Splits a stripped '* ...' activity line into its raw activity, description,
+    location, cost and travel_distance_to_location strings (None when absent).
+    Lines that do not follow the grammar are split field by field instead.
+    """
+    match = ACTIVITY_LINE_PATTERN.match(line)
+    if not match:
+        return _parse_activity_fields(line)
+
+    activity, description, location, cost, travel = match.group("activity", "description", "location", "cost", "travel")
+    if description is not None:
+        description = description.strip()
+        if travel is None and location is None and cost is None and TRAVEL_HINT_PATTERN.search(description):
+            description, travel = None, description
+    if location is not None:
+        location = location.rstrip() or None
+    return {
+        "activity": activity.rstrip(),
+        "description": description,
+        "location": location,
+        "cost": cost,
+        "travel_distance_to_location": travel.strip() if travel is not None else None,
+    }
+
+def _parse_activity_fields(line: str) -> dict:
+    """
+    Fallback for parse_activity_line: finds the location, the first cost and the
+    parentheticals wherever they are, so an unusual field order loses nothing.
+    """
+    print(f"Activity line outside the expected format, parsing fields individually: {line}", file=sys.stderr)
+    text = line.lstrip('*').strip()
+    location_match = FIELD_LOCATION_PATTERN.search(text)
+    cost_match = FIELD_COST_PATTERN.search(text)
+    end_match = FIELD_ACTIVITY_END_PATTERN.search(text)
+    head = text[:end_match.start()] if end_match else text
+
+    description_parts, travel = [], None
+    for part in FIELD_PARENTHETICAL_PATTERN.findall(text):
+        part = part.strip()
+        if travel is None and TRAVEL_HINT_PATTERN.search(part):
+            travel = part
+        elif part:
+            description_parts.append(part)
+    return {
+        "activity": " ".join(FIELD_PARENTHETICAL_PATTERN.sub(" ", head).split()),
+        "description": "; ".join(description_parts) or None,
+        "location": location_match.group(1).strip() or None if location_match else None,
+        "cost": cost_match.group(1) if cost_match else None,
+        "travel_distance_to_location": travel,
+    }
+
+def _error_message(err) -> str:
+    # Prefer the validator's own message over pydantic's "Value error, ..." wrapping
+    error = err.get("ctx", {}).get("error")
+    return str(error) if error is not None else err["msg"]
+
+def _plain_number(text: str) -> Optional[float]:
+    """float(text) for a plain number such as '1,234.50', None for anything the validators must handle."""
+    if PLAIN_NUMBER_PATTERN.fullmatch(text):
+        return float(text.replace(',', ''))
+    return None
+
+def _row_from_line(line: str, day: str, date: str) -> ItineraryRow:
+    data = parse_activity_line(line)
+    raw_cost, raw_travel = data["cost"], data["travel_distance_to_location"]
+    cost = _plain_number(raw_cost) if raw_cost is not None else None
+    travel = _plain_number(raw_travel) if raw_travel is not None else None
+
+    # Cheap pre-check: absent or plain-number cost and travel cannot fail validation,
+    # so only the remaining rows pay for the pydantic model and its regex validators.
+    if (raw_cost is None or cost is not None) and (raw_travel is None or travel is not None):
+        return ItineraryRow(day, date, data["activity"], data["description"], data["location"], cost, travel)
+
+    data["day"] = day
+    data["date"] = date
+    try:
+        return ItineraryRow.from_entry(ItineraryEntry(**data))
+    except ValidationError as e:
+        error_details = "; ".join([f"{err['loc'][0]}: {_error_message(err)}" for err in e.errors()])
+        print(f"Validation Error for row: {line} - {error_details}", file=sys.stderr)
+        return ItineraryRow(day, date, data["activity"], f"VALIDATION_ERROR: {error_details}", data["location"])
+    except Exception as e:
+        print(f"Unexpected error for row: {line} - {e}", file=sys.stderr)
+        return ItineraryRow(day, date, data["activity"], f"VALIDATION_ERROR: Unexpected error: {e}", data["location"])
 
-    day_pattern = re.compile(r"^(?:##|\*\*)\s*Day (\d+):\s*([A-Za-z]+\s+\d{1,2},\s+\d{4}):(.*)$")
-    activity_line_start_pattern = re.compile(r"^\*\s*(.*)$")
+class ItineraryParser:
+    """
+    Incremental itinerary parser. Text is fed in chunks of any size (for example
+    straight from a streaming LLM response); each complete line is parsed as soon
+    as it arrives and only the unfinished last line is buffered.
+    """
+    def __init__(self):
+        self.current_day = None
+        self.current_date = None
+        self._partial_line = ""
 
-    for line in lines:
+    def feed(self, chunk: str) -> List[ItineraryRow]:
+        """Consumes a chunk and returns the rows completed by it."""
+        lines = (self._partial_line + chunk).split('\n')
+        self._partial_line = lines.pop()
+        return [row for row in map(self._parse_line, lines) if row is not None]
+
+    def close(self) -> List[ItineraryRow]:
+        """Parses whatever is left after the final chunk."""
+        line, self._partial_line = self._partial_line, ""
+        row = self._parse_line(line)
+        return [row] if row is not None else []
+
+    def _parse_line(self, line: str) -> Optional[ItineraryRow]:
         line = line.strip()
         if not line:
-            continue
+            return None
 
-        day_match = day_pattern.match(line)
+        day_match = DAY_PATTERN.match(line)
         if day_match:
-            current_day = f"Day {day_match.group(1)}"
-            current_date = day_match.group(2).strip()
-            continue
+            self.current_day = f"Day {day_match.group(1)}"
+            self.current_date = day_match.group(2).strip()
+            return None
+
+        if not (self.current_day and line.startswith('*')):
+            return None
+        return _row_from_line(line, self.current_day, self.current_date)
 
-        if current_day and line.startswith('*'):
-            activity_line_match = activity_line_start_pattern.match(line)
-            if not activity_line_match:
-                continue
+def iter_itinerary_rows(chunks: Iterable[str]) -> Iterator[ItineraryRow]:
+    """Lazily parses an itinerary delivered as an iterable of text chunks."""
+    parser = ItineraryParser()
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
 
-            full_activity_text = activity_line_match.group(1).strip()
-            
-            activity = full_activity_text
-            description = None
-            location = None
-            cost = None
-            travel_distance = None
-
-            # 1. Extract and remove travel distance
-            travel_distance_extract_pattern = re.compile(r"\s*\(([^)]*(?:min|minute|hour)[^)]*)\)\s*$")
-            travel_match = travel_distance_extract_pattern.search(activity)
-            if travel_match:
-                travel_distance = travel_match.group(1).strip()
-                activity = activity.replace(travel_match.group(0), "").strip()
-
-            # 2. Extract and remove location
-            location_extract_pattern = re.compile(r"@\s*(.*?)(?=\s*(?:\$|\(||$))")
-            loc_match = location_extract_pattern.search(activity)
-            if loc_match:
-                location = loc_match.group(1).strip()
-                activity = activity.replace(loc_match.group(0), "").strip()
-
-            # 3. Extract and remove cost
-            cost_extract_pattern = re.compile(r"(\$[\d,.]+(?:\s*per person)?(?:\s*\([^)]*\))?)")
-            cost_match = cost_extract_pattern.search(activity)
-            if cost_match:
-                cost_text = cost_match.group(1).strip()
-                cost_num_match = re.search(r"[\d,.]+", cost_text)
-                if cost_num_match:
-                    cost = cost_num_match.group(0)
-                activity = activity.replace(cost_text, "").strip()
-
-            # 4. Extract and remove description
-            description_extract_pattern = re.compile(r"\s*\(([^)]*)\)\s*$")
-            desc_match = description_extract_pattern.search(activity)
-            if desc_match:
-                description = desc_match.group(1).strip()
-                activity = activity.replace(desc_match.group(0), "").strip()
-
-            # 5. The rest is the activity
-            activity = activity.strip()
-
-            data = {
-                "day": current_day,
-                "date": current_date,
-                "activity": activity,
-                "description": description,
-                "location": location,
-                "cost": cost,
-                "travel_distance_to_location": travel_distance
-            }
-            
-            try:
-                entry = ItineraryEntry(**data)
-                itinerary_entries.append(entry)
-            except ValidationError as e:
-                error_details = "; ".join([f"{err['loc'][0]}: {err['msg']}" for err in e.errors()])
-                print(f"Validation Error for row: {line} - {error_details}", file=sys.stderr)
-                itinerary_entries.append(ItineraryEntry(
-                    day=current_day, date=current_date, activity=activity,
-                    description="VALIDATION_ERROR", location=error_details,
-                    cost=None, travel_distance_to_location=None
-                ))
-            except Exception as e:
-                print(f"Unexpected error for row: {line} - {e}", file=sys.stderr)
-                itinerary_entries.append(ItineraryEntry(
-                    day=current_day, date=current_date, activity=activity,
-                    description="VALIDATION_ERROR", location=f"Unexpected error: {e}",
-                    cost=None, travel_distance_to_location=None
-                ))
-                
-    return itinerary_entries
+def iter_itinerary_entries(chunks: Iterable[str]) -> Iterator[ItineraryEntry]:
+    """Like iter_itinerary_rows, validating each row into an ItineraryEntry as it arrives."""
+    for row in iter_itinerary_rows(chunks):
+        yield row.to_entry()
 
-def generate_csv_from_itinerary_entries(itinerary_entries: List[ItineraryEntry]) -> str:
-    output = io.StringIO()
-    writer = csv.writer(output, lineterminator="\n")
+def parse_itinerary_content(itinerary_content: str) -> List[ItineraryEntry]:
+    return rows_to_entries(iter_itinerary_rows([itinerary_content]))
 
-    header = ["Day", "Date", "Activity", "Description", "Location", "Cost", "Travel Distance to Location"]
-    writer.writerow(header)
+CSV_HEADER = ["Day", "Date", "Activity", "Description", "Location", "Cost", "Travel Distance to Location"]
 
+def entry_to_csv_row(entry) -> list:
+    """CSV cells for an ItineraryEntry or an ItineraryRow."""
+    return [
+        entry.day,
+        entry.date,
+        entry.activity,
+        entry.description if entry.description is not None else "",
+        entry.location if entry.location is not None else "",
+        f"{entry.cost:.2f}" if entry.cost is not None else "",
+        str(entry.travel_distance_to_location) if entry.travel_distance_to_location is not None else ""
+    ]
+
+def iter_csv_rows(itinerary_entries: Iterable) -> Iterator[list]:
+    """Yields the header row, then one row per entry as the entries arrive."""
+    yield CSV_HEADER
     for entry in itinerary_entries:
-        writer.writerow([
-            entry.day,
-            entry.date,
-            entry.activity,
-            entry.description if entry.description is not None else "",
-            entry.location if entry.location is not None else "",
-            f"{entry.cost:.2f}" if entry.cost is not None else "",
-            str(entry.travel_distance_to_location) if entry.travel_distance_to_location is not None else ""
-        ])
-    return output.getvalue()
+        yield entry_to_csv_row(entry)
 
-def get_itinerary_entries_from_state(state: dict) -> List[ItineraryEntry]:
-    conversation_history = state.get("conversation_history", [])
-    itinerary_content = None
+def iter_csv_lines(itinerary_entries: Iterable) -> Iterator[str]:
+    """Yields the CSV text one formatted line at a time."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+    for row in iter_csv_rows(itinerary_entries):
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+
+def write_csv(itinerary_entries: Iterable, file) -> int:
+    """Writes the CSV straight to an open text file handle and returns the number of entries written."""
+    writer = csv.writer(file, lineterminator="\n")
+    count = -1
+    for count, row in enumerate(iter_csv_rows(itinerary_entries)):
+        writer.writerow(row)
+    return count
+
+def generate_csv_from_itinerary_entries(itinerary_entries: List[ItineraryEntry]) -> str:
+    return "".join(iter_csv_lines(itinerary_entries))
 
-    for message in conversation_history:
+def find_itinerary_content(state: dict) -> Optional[str]:
+    # States saved from a SessionState already record their itinerary
+    if state.get("itinerary"):
+        return state["itinerary"]
+    for message in state.get("conversation_history", []):
         if message.get("role") == "assistant" and "Day 1:" in message.get("content", ""):
-            itinerary_content = message["content"]
-            break
-    
+            return message["content"]
+    return None
+
+def get_itinerary_entries_from_state(state: dict) -> List[ItineraryEntry]:
+    if state.get("itinerary_entries") is not None:
+        return ENTRY_LIST_ADAPTER.validate_python(state["itinerary_entries"])
+    itinerary_content = find_itinerary_content(state)
     if itinerary_content:
         return parse_itinerary_content(itinerary_content)
     else:
         return []
 
+def generate_csv_itinerary(state: dict) -> str:
+    return "".join(stream_csv_itinerary([find_itinerary_content(state) or ""]))
+
+def stream_csv_itinerary(chunks: Iterable[str]) -> Iterator[str]:
+    """CSV lines for an itinerary that is still streaming in; each row is ready as soon as its line is."""
+    return iter_csv_lines(iter_itinerary_rows(chunks))
+
 if __name__ == "__main__":
     # This block is for standalone testing/execution of the script
     # It will read from a JSON file and print CSV to stdout, similar to original behavior
@@ -203,6 +350,4 @@ if __name__ == "__main__":
         print(f"Error: Malformed JSON in file: {json_file_path}", file=sys.stderr)
         sys.exit(1)
 
-    itinerary_entries = get_itinerary_entries_from_state(state)
-    csv_output = generate_csv_from_itinerary_entries(itinerary_entries)
-    print(csv_output, end='')
\ No newline at end of file
+    write_csv(iter_itinerary_rows([find_itinerary_content(state) or ""]), sys.stdout)
\ No newline at end of file
@@ -0,0 +1,90 @@
+import json
+import os
+import threading
+from typing import Optional, Tuple
+from gazetteer import normalize_place_name
+from tiered_cache import TieredCache
+
+# Like TRIP_STORE_PATH, a relative path is resolved against the working directory. Point
+# GEOCODE_CACHE_FILE elsewhere to move the cache, or set it to "" to keep it in memory only.
+GEOCODE_CACHE_FILE = os.getenv("GEOCODE_CACHE_FILE", "geocode_cache.sqlite")
+GEOCODE_TTL_SECONDS = 30 * 24 * 3600
+# Unverified results are cached too, but retried sooner in case the gazetteer or API learns them.
+NEGATIVE_TTL_SECONDS = 24 * 3600
+
+
+class GeocodeCache:
+    """
+    Geocoding API responses keyed on the normalized location string. A cached
+    None means the location could not be verified (negative caching). Entries
+    can be tagged with a version of their source, e.g. the gazetteer's, so a
+    changed source never serves results cached from the old one.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, max_memory_entries: int = 4096,
+                 max_disk_entries: int = 100000, ttl_seconds: float = GEOCODE_TTL_SECONDS,
+                 negative_ttl_seconds: float = NEGATIVE_TTL_SECONDS):
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self._cache = TieredCache(db_path=db_path, table="geocodes", max_memory_entries=max_memory_entries,
+                                  max_disk_entries=max_disk_entries, ttl_seconds=ttl_seconds)
+        self._negative_hits = 0
+        # lookup is called from LocationRAG.verify_locations' worker threads
+        self._negative_hits_lock = threading.Lock()
+
+    @staticmethod
+    def key(location_string: str, version: str = "") -> str:
+        normalized = normalize_place_name(location_string)
+        return f"{version}:{normalized}" if version else normalized
+
+    def lookup(self, location_string: str, version: str = "") -> Tuple[bool, Optional[dict]]:
+        """Returns (hit, api_response); api_response is None for a cached negative result."""
+        value = self._cache.get(self.key(location_string, version))
+        if value is None:
+            return False, None
+        api_response = json.loads(value)
+        if api_response is None:
+            with self._negative_hits_lock:
+                self._negative_hits += 1
+        return True, api_response
+
+    def store(self, location_string: str, api_response: Optional[dict], version: str = ""):
+        ttl_seconds = self.negative_ttl_seconds if api_response is None else None
+        self._cache.set(self.key(location_string, version), json.dumps(api_response), ttl_seconds=ttl_seconds)
+
+    def warm_from_file(self, path: str, version: str = "") -> int:
+        """
+        Preloads entries from a JSON object mapping location strings to API responses
+        (null for unverifiable locations) under the given version, e.g. a
+        LocationRAG's cache_version. Returns the number of entries loaded.
+        """
+        with open(path, "r") as f:
+            entries = json.load(f)
+        positives = [(self.key(location, version), json.dumps(response))
+                     for location, response in entries.items() if response is not None]
+        negatives = [(self.key(location, version), "null") for location, response in entries.items() if response is None]
+        self._cache.set_many(positives)
+        self._cache.set_many(negatives, ttl_seconds=self.negative_ttl_seconds)
+        return len(entries)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> dict:
+        stats = self._cache.stats()
+        with self._negative_hits_lock:
+            stats["negative_hits"] = self._negative_hits
+        return stats
+
+
+_geocode_cache = None
+_geocode_cache_lock = threading.Lock()
+
+
+def get_geocode_cache() -> GeocodeCache:
+    """The process-wide geocode cache, persisted to GEOCODE_CACHE_FILE (memory only if that is empty)."""
+    global _geocode_cache
+    if _geocode_cache is None:
+        with _geocode_cache_lock:
+            if _geocode_cache is None:
+                _geocode_cache = GeocodeCache(db_path=GEOCODE_CACHE_FILE or None)
+    return _geocode_cache
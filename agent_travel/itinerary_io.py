@@ -0,0 +1,56 @@
+import io
+import os
+from typing import Optional
+
+import pandas as pd
+
+ITINERARY_COLUMNS = ["Day", "Date", "Activity", "Description", "Location", "Cost", "Travel Distance to Next Location"]
+# Columns kept as text so values such as "$80" or "1.5 miles" survive until their validators see them
+TEXT_COLUMNS = ["Cost", "Description", "Travel Distance to Next Location"]
+# Older itinerary CSVs name the travel column differently
+COLUMN_ALIASES = {"Travel Distance to Location": "Travel Distance to Next Location"}
+FIELD_COLUMNS = {
+    "day": "Day",
+    "date": "Date",
+    "activity": "Activity",
+    "description": "Description",
+    "location": "Location",
+    "cost": "Cost",
+    "travel_distance_to_next_location": "Travel Distance to Next Location",
+}
+
+
+def read_itinerary(source, text_columns: Optional[list] = None) -> pd.DataFrame:
+    """
+    Loads an itinerary into a DataFrame from any of:
+      - a path to a CSV file;
+      - CSV text (any string containing a newline);
+      - a file-like object;
+      - a DataFrame (copied, so the caller's frame is never modified);
+      - a list of ItineraryEntry models or plain dicts.
+    The text_columns (TEXT_COLUMNS by default) hold strings or missing values.
+    Raises FileNotFoundError for a missing path.
+    """
+    text_columns = TEXT_COLUMNS if text_columns is None else text_columns
+
+    if isinstance(source, pd.DataFrame):
+        df = source.copy()
+    elif isinstance(source, (list, tuple)):
+        rows = [entry.model_dump(by_alias=True) if hasattr(entry, "model_dump") else dict(entry) for entry in source]
+        df = pd.DataFrame(rows).rename(columns=FIELD_COLUMNS)
+    else:
+        if isinstance(source, str) and "\n" in source:
+            source = io.StringIO(source)
+        elif isinstance(source, (str, os.PathLike)) and not os.path.exists(source):
+            raise FileNotFoundError(source)
+        return _normalize_columns(pd.read_csv(source, dtype={column: str for column in text_columns}), text_columns)
+
+    return _normalize_columns(df, text_columns)
+
+
+def _normalize_columns(df: pd.DataFrame, text_columns: list) -> pd.DataFrame:
+    df = df.rename(columns={old: new for old, new in COLUMN_ALIASES.items() if new not in df.columns})
+    for column in text_columns:
+        if column in df.columns:
+            df[column] = df[column].map(lambda v: v if isinstance(v, str) or pd.isna(v) else str(v))
+    return df.reset_index(drop=True)
@@ -0,0 +1,13 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field
+
+
+class ItineraryEntry(BaseModel):
+    day: str = Field(..., description="The day number, e.g., 'Day 1'")
+    date: str = Field(..., description="The specific date for the day, e.g., 'July 17, 2025'")
+    activity: str = Field(..., description="The main activity for this entry")
+    description: Optional[str] = Field(None, description="A brief description of the activity")
+    location: Optional[str] = Field(None, description="The location of the activity")
+    cost: Optional[float] = Field(None, description="Estimated cost for the activity")
+    travel_distance_to_next_location: Optional[float] = Field(None, alias="Travel Distance to Next Location", description="Travel time/distance to the next activity. Empty if last activity of day/trip.")
@@ -0,0 +1,191 @@
+import asyncio
+import json
+import os
+import threading
+import time
+from typing import Iterator, Optional
+from dotenv import load_dotenv
+from tiered_cache import TieredCache
+
+DEFAULT_MODEL_NAME = 'gemini-1.5-flash'
+LLM_CACHE_FILE = os.getenv("LLM_CACHE_FILE", "llm_cache.sqlite")
+LLM_CACHE_TTL_SECONDS = 24 * 3600
+
+
+class LLMClient:
+    """
+    Long-lived Gemini client. The model handle is created once and every response
+    is cached under a hash of (model name, prompt), so repeated prompts skip the API.
+    """
+
+    def __init__(self, model=None, model_name: str = DEFAULT_MODEL_NAME, cache: Optional[TieredCache] = None):
+        self.model_name = model_name
+        self._model = model
+        self._model_lock = threading.Lock()
+        self.cache = cache if cache is not None else TieredCache()
+        self._stats_lock = threading.Lock()
+        self._model_calls = 0
+        self._model_seconds = 0.0
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    print(f"Initializing model: {self.model_name}") # Debug print
+                    import google.generativeai as genai # Slow to import; only needed for real API calls
+                    self._model = genai.GenerativeModel(self.model_name)
+        return self._model
+
+    def cache_key(self, prompt: str) -> str:
+        return TieredCache.make_key(self.model_name, prompt)
+
+    def generate(self, prompt: str) -> str:
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        response = self.model.generate_content(prompt)
+        text = response.text
+        self._record_call(time.perf_counter() - start)
+        self.cache.set(key, text)
+        return text
+
+    async def agenerate(self, prompt: str) -> str:
+        """
+        Awaitable generate(). Uses the model's native async API when it has one and
+        otherwise runs the blocking call in a worker thread.
+        """
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+
+        start = time.perf_counter()
+        if hasattr(self.model, "generate_content_async"):
+            response = await self.model.generate_content_async(prompt)
+        else:
+            response = await asyncio.to_thread(self.model.generate_content, prompt)
+        text = response.text
+        self._record_call(time.perf_counter() - start)
+        self.cache.set(key, text)
+        return text
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Yields the response text chunk by chunk as the model produces it. A cached
+        response is yielded as a single chunk; a completed stream is cached in full.
+        """
+        key = self.cache_key(prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            yield cached
+            return
+
+        start = time.perf_counter()
+        chunks = []
+        for chunk in self.model.generate_content(prompt, stream=True):
+            text = chunk.text
+            if text:
+                chunks.append(text)
+                yield text
+        self._record_call(time.perf_counter() - start)
+        self.cache.set(key, "".join(chunks))
+
+    def stats(self) -> dict:
+        stats = self.cache.stats()
+        with self._stats_lock:
+            stats["model_calls"] = self._model_calls
+            stats["model_seconds"] = self._model_seconds
+            avg_latency = self._model_seconds / self._model_calls if self._model_calls else 0.0
+        stats["avg_model_latency_seconds"] = avg_latency
+        # Every cache hit is one API call (and roughly one average latency) avoided.
+        stats["estimated_seconds_saved"] = (stats["memory_hits"] + stats["disk_hits"]) * avg_latency
+        return stats
+
+    def _record_call(self, elapsed):
+        with self._stats_lock:
+            self._model_calls += 1
+            self._model_seconds += elapsed
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+STUB_PLAN = {
+    "destination": "Rome", "duration": 3, "month": "July", "traveler_type": "couple",
+    "interests": ["history", "food"], "budget": 2000,
+}
+STUB_ITINERARY = """## 3-Day Rome Itinerary (History, Food Focus)
+
+**Day 1: July 20, 2025:**
+* Colosseum Tour (Underground and arena floor) @ Colosseum $75.00 (1.2)
+* Lunch at a Trattoria (Roman pasta) @ Trattoria Monti $40.00
+
+**Day 2: July 21, 2025:**
+* Vatican Museums (Sistine Chapel) @ Vatican Museums $30.00 (0.8)
+* Gelato Break @ Piazza Navona $6.00
+
+**Day 3: July 22, 2025:**
+* Pantheon Visit @ Pantheon $0.00 (0.5)
+* Farewell Dinner (Trastevere food tour) @ Trastevere $90.00
+"""
+
+
+class StubModel:
+    """
+    Offline stand-in for the Gemini model, for local runs and load tests: answers
+    plan extraction with a fixed plan, itinerary requests with a fixed itinerary
+    and anything else with a short echo, after latency seconds.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def generate_content(self, prompt, stream=False):
+        if self.latency:
+            time.sleep(self.latency)
+        if "Extract the following travel planning parameters" in prompt:
+            text = json.dumps(STUB_PLAN)
+        elif "-day itinerary" in prompt:
+            text = STUB_ITINERARY
+        else:
+            text = f"Stub response to: {prompt[:80]}"
+        if stream:
+            return [StubResponse(text[i:i + 64]) for i in range(0, len(text), 64)]
+        return StubResponse(text)
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def configure_gemini(api_key: str):
+    import google.generativeai as genai
+    genai.configure(api_key=api_key)
+
+
+def get_client() -> LLMClient:
+    """Returns the process-wide LLMClient, configuring the Gemini API key on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                load_dotenv()
+                gemini_api_key = os.getenv("GEMINI_API_KEY")
+                if gemini_api_key:
+                    configure_gemini(gemini_api_key)
+                cache = TieredCache(db_path=LLM_CACHE_FILE, table="llm_responses", ttl_seconds=LLM_CACHE_TTL_SECONDS)
+                _client = LLMClient(cache=cache)
+    return _client
+
+
+def set_client(client: Optional[LLMClient]):
+    """Replaces the process-wide client, e.g. with one wrapping a stub model."""
+    global _client
+    with _client_lock:
+        _client = client
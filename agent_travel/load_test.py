@@ -0,0 +1,148 @@
+import argparse
+import asyncio
+import io
+import json
+import os
+import socket
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import nullcontext, redirect_stdout
+from urllib.parse import urlsplit
+
+PLAN_MESSAGE = "Plan a 3-day trip to Rome in July for a couple interested in history and food, with a budget of $2000."
+
+
+async def http_request(host, port, method, path, body=b""):
+    """One HTTP/1.1 request on a fresh connection. Returns (status, body)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+        writer.write(head.encode() + body)
+        await writer.drain()
+        response = await reader.read()
+    finally:
+        writer.close()
+    status_line, _, rest = response.partition(b"\r\n")
+    return int(status_line.split()[1]), rest.partition(b"\r\n\r\n")[2]
+
+
+class LoadTest:
+    """
+    Runs `concurrency` virtual users against the API until `requests` requests have
+    been sent. Each user repeats a planning conversation: create a session, send a
+    plan, download the CSV and check the health endpoint.
+    """
+
+    def __init__(self, host, port, requests, concurrency):
+        self.host = host
+        self.port = port
+        self.remaining = requests
+        self.concurrency = concurrency
+        self.latencies = defaultdict(list)
+        self.statuses = Counter()
+
+    async def timed(self, name, method, path, body=b""):
+        if self.remaining <= 0:
+            return None
+        self.remaining -= 1
+        start = time.perf_counter()
+        try:
+            status, payload = await http_request(self.host, self.port, method, path, body)
+        except OSError as e:
+            self.statuses[f"connection error ({type(e).__name__})"] += 1
+            return None
+        self.latencies[name].append(time.perf_counter() - start)
+        self.statuses[status] += 1
+        return payload if status < 400 else None
+
+    async def user(self):
+        while self.remaining > 0:
+            payload = await self.timed("POST /sessions", "POST", "/sessions")
+            if payload is None:
+                continue
+            session_id = json.loads(payload)["session_id"]
+            message = json.dumps({"message": PLAN_MESSAGE}).encode()
+            await self.timed("POST /sessions/{id}/messages", "POST", f"/sessions/{session_id}/messages", message)
+            await self.timed("GET /sessions/{id}/csv", "GET", f"/sessions/{session_id}/csv")
+            await self.timed("GET /health", "GET", "/health")
+
+    async def run(self):
+        start = time.perf_counter()
+        await asyncio.gather(*(self.user() for _ in range(self.concurrency)))
+        return time.perf_counter() - start
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, min(len(sorted_values) - 1, round(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def latency_row(name, latencies):
+    values = sorted(latencies)
+    return (f"{name:<32} {len(values):>7} {percentile(values, 0.50) * 1e3:>9.1f} "
+            f"{percentile(values, 0.95) * 1e3:>9.1f} {percentile(values, 0.99) * 1e3:>9.1f}")
+
+
+def report(test, elapsed):
+    all_latencies = [latency for latencies in test.latencies.values() for latency in latencies]
+    total = sum(test.statuses.values())
+    print(f"{total} requests in {elapsed:.2f}s with {test.concurrency} concurrent users: {total / elapsed:,.1f} requests/sec")
+    print(f"{'endpoint':<32} {'count':>7} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, latencies in sorted(test.latencies.items()):
+        print(latency_row(name, latencies))
+    if all_latencies:
+        print(latency_row("all", all_latencies))
+    print("status codes: " + ", ".join(f"{status}: {count}" for status, count in sorted(test.statuses.items(), key=str)))
+
+
+def serve_in_background(workers, max_pending, stub_latency, trip_store_path):
+    """Starts the API with the stub LLM on a free local port. Returns (host, port, server)."""
+    import uvicorn
+    from api_server import create_app
+
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    app = create_app(trip_store_path, stub_llm=True, stub_latency=stub_latency, workers=workers, max_pending=max_pending)
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", backlog=4096))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return "127.0.0.1", port, server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the planner API and report latency percentiles.")
+    parser.add_argument("--url", default=None, help="API base URL; omit to start a local server with the stub LLM.")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--workers", type=int, default=8, help="Worker threads of the local server.")
+    parser.add_argument("--max-pending", type=int, default=64, help="Backpressure limit of the local server.")
+    parser.add_argument("--stub-latency", type=float, default=0.05,
+                        help="Seconds per stub LLM call on the local server; repeated prompts are served from the LLM cache.")
+    args = parser.parse_args()
+
+    server = None
+    with tempfile.TemporaryDirectory() as temp_dir:
+        if args.url:
+            parts = urlsplit(args.url)
+            host, port = parts.hostname, parts.port or 80
+        else:
+            host, port, server = serve_in_background(args.workers, args.max_pending, args.stub_latency,
+                                                     os.path.join(temp_dir, "trips.db"))
+            print(f"Serving on {host}:{port} with {args.workers} workers and a {args.stub_latency:g}s stub LLM")
+        test = LoadTest(host, port, args.requests, args.concurrency)
+        # The local server shares this process; keep its debug prints out of the report
+        with redirect_stdout(io.StringIO()) if server is not None else nullcontext():
+            elapsed = asyncio.run(test.run())
+        report(test, elapsed)
+        if server is not None:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,15 @@
 import pandas as pd
 from pydantic import BaseModel
-from typing import Tuple, Optional
+from typing import Callable, List, Tuple, Optional
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+import os
+import threading
 import time
-import math
+import numpy as np
+from gazetteer import Gazetteer, get_default_gazetteer
+from geocode_cache import GeocodeCache, get_geocode_cache
+from itinerary_io import read_itinerary
 
 class VerifiedLocation(BaseModel):
     original_input: str
@@ -15,105 +21,145 @@ class VerifiedLocation(BaseModel):
     api_source: str
     verification_timestamp: datetime
 
+EARTH_RADIUS_KM = 6371
+KM_TO_MILES = 0.621371
+
+def haversine_miles(lat1, lon1, lat2, lon2):
+    """
+    Great-circle distance in miles. Accepts scalars or NumPy arrays, which are
+    broadcast against each other.
+    """
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    dlat = lat2 - lat1
+    dlon = lon2 - lon1
+    a = np.sin(dlat / 2)**2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2)**2
+    c = 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    return EARTH_RADIUS_KM * c * KM_TO_MILES
+
+def location_coordinates(verified_locations) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Splits a sequence of VerifiedLocation (or None) into latitude and longitude
+    arrays. Missing and unverified locations (which carry the (0.0, 0.0)
+    placeholder) become NaN, so every distance involving them is NaN too.
+    """
+    lats = np.full(len(verified_locations), np.nan)
+    lons = np.full(len(verified_locations), np.nan)
+    for i, loc in enumerate(verified_locations):
+        if loc is not None and loc.coordinates != (0.0, 0.0):
+            lats[i], lons[i] = loc.coordinates
+    return lats, lons
+
+def consecutive_distances(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """
+    Distance in miles from each location to the next one, computed for all legs at
+    once. NaN where either end is unknown and for the final location.
+    """
+    distances = np.full(len(lats), np.nan)
+    if len(lats) > 1:
+        distances[:-1] = haversine_miles(lats[:-1], lons[:-1], lats[1:], lons[1:])
+    return distances
+
+def distance_matrix(lats: np.ndarray, lons: np.ndarray) -> np.ndarray:
+    """N x N matrix of distances in miles between every pair of locations; NaN rows/columns for unknown ones."""
+    return haversine_miles(lats[:, np.newaxis], lons[:, np.newaxis], lats[np.newaxis, :], lons[np.newaxis, :])
+
+class TokenBucket:
+    """
+    Thread-safe token-bucket rate limiter: a sustained rate of one call per
+    interval seconds, with bursts of up to capacity calls.
+    """
+    def __init__(self, interval: float, capacity: int = 1):
+        self.interval = interval
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                if self.interval <= 0:
+                    return
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) / self.interval)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) * self.interval
+            time.sleep(wait)
+
+# Average spacing between geocoding API calls across the whole process, and how many
+# calls may go out back to back before that spacing applies (one batch of max_workers)
+GEOCODE_RATE_LIMIT_SECONDS = float(os.getenv("GEOCODE_RATE_LIMIT_SECONDS", "0.1"))
+GEOCODE_RATE_LIMIT_BURST = int(os.getenv("GEOCODE_RATE_LIMIT_BURST", "8"))
+_geocode_rate_limiter = TokenBucket(interval=GEOCODE_RATE_LIMIT_SECONDS, capacity=GEOCODE_RATE_LIMIT_BURST)
+
+
+def get_geocode_rate_limiter() -> TokenBucket:
+    """
+    The process-wide geocoding rate limiter. Every LocationRAG uses it unless given
+    its own, so concurrent validations share one call budget instead of each
+    starting with a fresh one.
+    """
+    return _geocode_rate_limiter
+
+
 class LocationRAG:
-    def __init__(self, api_key: str = "dummy_api_key"):
+    def __init__(self, api_key: str = "dummy_api_key", gazetteer: Optional[Gazetteer] = None, cache: Optional[GeocodeCache] = None,
+                 geocoder: Optional[Callable[[str], Optional[dict]]] = None, max_workers: int = 8,
+                 rate_limiter: Optional[TokenBucket] = None):
         self.api_key = api_key
-        self.cache = {} # Simple in-memory cache
-        self.rate_limit_delay = 0.1 # Simulate rate limiting
-
-    def _haversine_distance(self, lat1, lon1, lat2, lon2):
-        R = 6371 # Radius of Earth in kilometers
-        lat1_rad = math.radians(lat1)
-        lon1_rad = math.radians(lon1)
-        lat2_rad = math.radians(lat2)
-        lon2_rad = math.radians(lon2)
+        self.gazetteer = gazetteer if gazetteer is not None else get_default_gazetteer()
+        # Shared by every LocationRAG in the process and persisted to disk unless a cache is given
+        self.cache = cache if cache is not None else get_geocode_cache()
+        # Any callable mapping a location string to an API response dict (or None)
+        self.geocoder = geocoder if geocoder is not None else self._simulated_geocoder
+        # Simulated answers come from the gazetteer, so cached ones are only valid for its current version
+        self.cache_version = self.gazetteer.version if geocoder is None else ""
+        self.simulated_latency = 0.1 # Simulate network delay
+        # Pass TokenBucket(interval, capacity=n) to allow bursts of n calls
+        self.rate_limiter = rate_limiter if rate_limiter is not None else get_geocode_rate_limiter()
+        self.max_workers = max_workers
 
-        dlon = lon2_rad - lon1_rad
-        dlat = lat2_rad - lat1_rad
+    @property
+    def rate_limit_delay(self) -> float:
+        """Minimum average spacing in seconds between geocoding API calls."""
+        return self.rate_limiter.interval
 
-        a = math.sin(dlat / 2)**2 + math.cos(lat1_rad) * math.cos(lat2_rad) * math.sin(dlon / 2)**2
-        c = 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
+    @rate_limit_delay.setter
+    def rate_limit_delay(self, value: float):
+        # Gives this instance its own limiter rather than changing the process-wide one
+        self.rate_limiter = TokenBucket(interval=value)
 
-        distance_km = R * c
-        return distance_km * 0.621371 # Convert to miles
+    def _haversine_distance(self, lat1, lon1, lat2, lon2):
+        return float(haversine_miles(lat1, lon1, lat2, lon2))
 
     def _call_geocoding_api(self, location_string: str) -> Optional[dict]:
+        self.rate_limiter.acquire()
+        return self.geocoder(location_string)
+
+    def _simulated_geocoder(self, location_string: str) -> Optional[dict]:
         """
-        Simulates an API call to a geocoding service.
+        Simulates an API call to a geocoding service, answered from the gazetteer.
         In a real scenario, this would integrate with Google Places, OpenStreetMap, etc.
         """
         # print(f"Simulating API call for: {location_string}") # Removed print statement
-        time.sleep(self.rate_limit_delay) # Simulate network delay and rate limiting
-
-        # Dummy data for demonstration
-        if "Colosseum" in location_string:
-            return {"verified_name": "Colosseum, Rome, Italy", "lat": 41.8902, "lng": 12.4922, "country": "Italy", "region": "Lazio", "confidence": 0.98, "source": "Simulated Google Places"}
-        elif "Vatican City" in location_string:
-            return {"verified_name": "Vatican City", "lat": 41.9029, "lng": 12.4534, "country": "Vatican City", "region": "Vatican City", "confidence": 0.99, "source": "Simulated Google Places"}
-        elif "Palatine Hill" in location_string:
-            return {"verified_name": "Palatine Hill, Rome, Italy", "lat": 41.8890, "lng": 12.4922, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Pantheon" in location_string:
-            return {"verified_name": "Pantheon, Rome, Italy", "lat": 41.8986, "lng": 12.4769, "country": "Italy", "region": "Lazio", "confidence": 0.97, "source": "Simulated OpenStreetMap"}
-        elif "Trevi Fountain" in location_string:
-            return {"verified_name": "Trevi Fountain, Rome, Italy", "lat": 41.9009, "lng": 12.4833, "country": "Italy", "region": "Lazio", "confidence": 0.96, "source": "Simulated MapBox"}
-        elif "Trastevere" in location_string:
-            return {"verified_name": "Trastevere, Rome, Italy", "lat": 41.8890, "lng": 12.4730, "country": "Italy", "region": "Lazio", "confidence": 0.95, "source": "Simulated Google Places"}
-        elif "Ostia Antica" in location_string:
-            return {"verified_name": "Ostia Antica, Rome, Italy", "lat": 41.7550, "lng": 12.2850, "country": "Italy", "region": "Lazio", "confidence": 0.94, "source": "Simulated OpenStreetMap"}
-        elif "Fiumicino Airport" in location_string:
-            return {"verified_name": "Fiumicino Airport (FCO), Rome, Italy", "lat": 41.8003, "lng": 12.2389, "country": "Italy", "region": "Lazio", "confidence": 0.99, "source": "Simulated Google Places"}
-        elif "Hotel" in location_string:
-            return {"verified_name": "Hotel in Rome, Italy", "lat": 41.9028, "lng": 12.4964, "country": "Italy", "region": "Lazio", "confidence": 0.80, "source": "Simulated Generic"}
-        elif "Your Choice" in location_string:
-            return {"verified_name": "User Specified Location, Rome, Italy", "lat": 41.9028, "lng": 12.4964, "country": "Italy", "region": "Lazio", "confidence": 0.70, "source": "Simulated Generic"}
-        elif "Various Shops" in location_string:
-            return {"verified_name": "Shopping Area, Rome, Italy", "lat": 41.8955, "lng": 12.4823, "country": "Italy", "region": "Lazio", "confidence": 0.85, "source": "Simulated Generic"}
-        elif "Food stall" in location_string:
-            return {"verified_name": "Food Stall Area, Rome, Italy", "lat": 41.8902, "lng": 12.4922, "country": "Italy", "region": "Lazio", "confidence": 0.80, "source": "Simulated Generic"}
-        elif "Airbnb Experience" in location_string:
-            return {"verified_name": "Cooking Class Location, Rome, Italy", "lat": 41.8955, "lng": 12.4823, "country": "Italy", "region": "Lazio", "confidence": 0.80, "source": "Simulated Generic"}
-        elif "Campo de' Fiori Market" in location_string:
-            return {"verified_name": "Campo de' Fiori Market, Rome, Italy", "lat": 41.8955, "lng": 12.4723, "country": "Italy", "region": "Lazio", "confidence": 0.95, "source": "Simulated Google Places"}
-        elif "Various Trattorias" in location_string:
-            return {"verified_name": "Trattoria Area, Trastevere, Rome, Italy", "lat": 41.8890, "lng": 12.4730, "country": "Italy", "region": "Lazio", "confidence": 0.85, "source": "Simulated Generic"}
-        elif "Restaurant in Ostia Antica" in location_string:
-            return {"verified_name": "Restaurant, Ostia Antica, Rome, Italy", "lat": 41.7550, "lng": 12.2850, "country": "Italy", "region": "Lazio", "confidence": 0.85, "source": "Simulated Generic"}
-        elif "Trattoria Monti" in location_string:
-            return {"verified_name": "Trattoria Monti, Rome, Italy", "lat": 41.8955, "lng": 12.4923, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Trattoria Da Enzo al 29" in location_string:
-            return {"verified_name": "Trattoria Da Enzo al 29, Rome, Italy", "lat": 41.8890, "lng": 12.4730, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Pizzeria Romana Bio" in location_string:
-            return {"verified_name": "Pizzeria Romana Bio, Rome, Italy", "lat": 41.9029, "lng": 12.4534, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Castel Sant'Angelo" in location_string:
-            return {"verified_name": "Castel Sant'Angelo, Rome, Italy", "lat": 41.9029, "lng": 12.4660, "country": "Italy", "region": "Lazio", "confidence": 0.95, "source": "Simulated Google Places"}
-        elif "Ponte Sisto & Gelateria del Viale" in location_string:
-            return {"verified_name": "Ponte Sisto & Gelateria del Viale, Rome, Italy", "lat": 41.8900, "lng": 12.4680, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Armando al Pantheon" in location_string:
-            return {"verified_name": "Armando al Pantheon, Rome, Italy", "lat": 41.8986, "lng": 12.4769, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Borghese Gallery & Gardens" in location_string:
-            return {"verified_name": "Borghese Gallery & Gardens, Rome, Italy", "lat": 41.9080, "lng": 12.4910, "country": "Italy", "region": "Lazio", "confidence": 0.95, "source": "Simulated Google Places"}
-        elif "La Pergola" in location_string:
-            return {"verified_name": "La Pergola, Rome, Italy", "lat": 41.9080, "lng": 12.4910, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Appian Way" in location_string:
-            return {"verified_name": "Appian Way, Rome, Italy", "lat": 41.8500, "lng": 12.5000, "country": "Italy", "region": "Lazio", "confidence": 0.95, "source": "Simulated Google Places"}
-        elif "Catacombs of Callixtus or Domitilla" in location_string:
-            return {"verified_name": "Catacombs, Rome, Italy", "lat": 41.8500, "lng": 12.5000, "country": "Italy", "region": "Lazio", "confidence": 0.90, "source": "Simulated Google Places"}
-        elif "Wine Bar in Trastevere" in location_string:
-            return {"verified_name": "Wine Bar, Trastevere, Rome, Italy", "lat": 41.8890, "lng": 12.4730, "country": "Italy", "region": "Lazio", "confidence": 0.85, "source": "Simulated Generic"}
-        elif "Trastevere Neighborhood" in location_string:
-            return {"verified_name": "Trastevere Neighborhood, Rome, Italy", "lat": 41.8890, "lng": 12.4730, "country": "Italy", "region": "Lazio", "confidence": 0.95, "source": "Simulated Google Places"}
-        else:
+        time.sleep(self.simulated_latency)
+
+        place = self.gazetteer.lookup(location_string)
+        if place is None:
             return None # Location not found or ambiguous
+        return {key: place[key] for key in ("verified_name", "lat", "lng", "country", "region", "confidence", "source")}
 
     def verify_location(self, location_string: str) -> VerifiedLocation:
         """
         Verifies and enriches a single location string using a simulated RAG approach.
         """
-        if location_string in self.cache:
-            # print(f"Retrieving from cache: {location_string}") # Removed print statement
-            return self.cache[location_string]
-
-        api_response = self._call_geocoding_api(location_string)
+        hit, api_response = self.cache.lookup(location_string, self.cache_version)
+        if not hit:
+            api_response = self._call_geocoding_api(location_string)
+            self.cache.store(location_string, api_response, self.cache_version)
 
         if api_response:
             verified_location = VerifiedLocation(
@@ -126,7 +172,6 @@ class LocationRAG:
                 api_source=api_response["source"],
                 verification_timestamp=datetime.now()
             )
-            self.cache[location_string] = verified_location
             return verified_location
         else:
             # Handle invalid or ambiguous locations
@@ -142,55 +187,79 @@ class LocationRAG:
                 verification_timestamp=datetime.now()
             )
 
-    def process_itinerary_locations(self, df: pd.DataFrame) -> pd.DataFrame:
+    def verify_locations(self, location_strings: List[str]) -> List[VerifiedLocation]:
+        """
+        Verifies many location strings at once. Inputs that normalize to the same
+        cache key are looked up once, the lookups run concurrently on up to
+        max_workers threads (still subject to the rate limiter), and results come
+        back in input order. With the shared limiter a batch of up to
+        GEOCODE_RATE_LIMIT_BURST calls goes out at once; beyond that throughput is
+        capped at one call per GEOCODE_RATE_LIMIT_SECONDS.
+        """
+        representatives = {}
+        for location_string in location_strings:
+            representatives.setdefault(self.cache.key(location_string), location_string)
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            verified = dict(zip(representatives, executor.map(self.verify_location, representatives.values())))
+
+        results = []
+        for location_string in location_strings:
+            verified_location = verified[self.cache.key(location_string)]
+            if verified_location.original_input != location_string:
+                verified_location = verified_location.model_copy(update={"original_input": location_string})
+            results.append(verified_location)
+        return results
+
+    def process_itinerary_locations(self, df: pd.DataFrame, include_matrix: bool = False) -> pd.DataFrame:
         """
         Reads a DataFrame, extracts locations, verifies them, and returns a DataFrame
-        with original and verified location data.
+        with original and verified location data. With include_matrix, the N x N
+        distance matrix between all rows is stored in df.attrs['distance_matrix'].
         """
         if 'Location' not in df.columns:
             # print("Error: 'Location' column not found in the CSV file.") # Removed print statement
             return df
 
-        verified_locations_data = []
-        for index, row in df.iterrows():
-            location_string = row['Location']
-            if pd.isna(location_string) or location_string.strip() == "":
-                verified_locations_data.append(None)
-                continue
-
-            verified_loc = self.verify_location(location_string)
-            verified_locations_data.append(verified_loc)
+        locations = df['Location'].tolist()
+        positions = [i for i, location_string in enumerate(locations)
+                     if not pd.isna(location_string) and location_string.strip() != ""]
+        verified_locations_data = [None] * len(locations)
+        for i, verified_loc in zip(positions, self.verify_locations([locations[i] for i in positions])):
+            verified_locations_data[i] = verified_loc
 
         df['Verified_Location_Data'] = verified_locations_data
 
-        travel_distances = [None] * len(df)
-        for i in range(len(df) - 1):
-            current_loc = df.loc[i, 'Verified_Location_Data']
-            next_loc = df.loc[i+1, 'Verified_Location_Data']
-
-            if current_loc and next_loc and current_loc.coordinates != (0.0, 0.0) and next_loc.coordinates != (0.0, 0.0):
-                dist = self._haversine_distance(
-                    current_loc.coordinates[0], current_loc.coordinates[1],
-                    next_loc.coordinates[0], next_loc.coordinates[1]
-                )
-                travel_distances[i] = round(dist, 2)
-            else:
-                travel_distances[i] = None # Cannot calculate distance if location is unverified or missing
-
-        df['Calculated_Travel_Distance_Miles'] = travel_distances
+        distances = self.compute_distances(verified_locations_data, include_matrix=include_matrix)
+        # Cannot calculate distance if location is unverified or missing, those legs stay NaN
+        df['Calculated_Travel_Distance_Miles'] = np.round(distances["consecutive"], 2)
+        if include_matrix:
+            df.attrs['distance_matrix'] = distances["matrix"]
         return df
 
-def process_itinerary(csv_file_path: str) -> pd.DataFrame:
+    def compute_distances(self, verified_locations, include_matrix: bool = False) -> dict:
+        """
+        Vectorized distances between verified locations. Returns a dict with the
+        per-leg "consecutive" array and, if requested, the full N x N "matrix".
+        """
+        lats, lons = location_coordinates(verified_locations)
+        return {
+            "consecutive": consecutive_distances(lats, lons),
+            "matrix": distance_matrix(lats, lons) if include_matrix else None,
+        }
+
+def process_itinerary(source, include_matrix: bool = False) -> pd.DataFrame:
     """
-    Processes an itinerary CSV, verifies locations, calculates travel distances,
-    and returns the processed DataFrame.
+    Processes an itinerary, verifies locations, calculates travel distances, and
+    returns the processed DataFrame. The source may be a CSV path or text, a
+    file-like object, a DataFrame or a list of ItineraryEntry.
     """
     rag_agent = LocationRAG()
     try:
-        itinerary_df = pd.read_csv(csv_file_path).reset_index(drop=True)
-        itinerary_df['Location'] = itinerary_df['Location'].fillna('')
-        itinerary_df = rag_agent.process_itinerary_locations(itinerary_df)
+        itinerary_df = read_itinerary(source)
     except FileNotFoundError:
-        print(f"Error: File not found at {csv_file_path}")
+        print(f"Error: File not found at {source}")
         return pd.DataFrame()
-    return itinerary_df
+    if 'Location' in itinerary_df.columns:
+        itinerary_df['Location'] = itinerary_df['Location'].fillna('')
+    return rag_agent.process_itinerary_locations(itinerary_df, include_matrix=include_matrix)
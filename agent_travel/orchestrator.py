@@ -1,99 +1,126 @@
+# pandas (budget_agent, location_rag_tool, itinerary_io), reportlab and google.generativeai
+# are imported where they are first used: most processes importing this module never need them.
 from travel_planner_agent import TravelPlannerAgent
 from airbnb_agent import AirbnbAgent
-from budget_agent import BudgetAgent
-from location_rag_tool import process_itinerary
-from generate_csv_itinerary import generate_csv_itinerary
+from generate_csv_itinerary import get_itinerary_entries_from_state, find_itinerary_content, iter_csv_lines
+from session_state import SessionState
+from app_cache import InProcessCache, content_key
+from itinerary_models import ItineraryEntry
+from llm_client import configure_gemini, get_client
+from trip_store import open_trip_store
 import json
 import re
 import os
 import io
 import sys
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
-from reportlab.lib.units import inch
 import csv
-from pydantic import BaseModel, Field, ValidationError
+import threading
 from typing import Optional, List
-import google.generativeai as genai
 from dotenv import load_dotenv
-import tempfile
-import streamlit as st
 
 
 def call_gemini(prompt):
     print(f"\n-----PROMPT-----\n{prompt}\n--------------------\n")
     try:
+        return get_client().generate(prompt)
+    except Exception as e:
+        return f"Error calling Gemini API: {e}"
+
 
-        model_name = 'gemini-1.5-flash'
-        print(f"Attempting to use model: {model_name}") # Debug print
-        model = genai.GenerativeModel(model_name)
-        if model is None:
-            print("Error: Gemini GenerativeModel could not be initialized. Check API key and network.")
-            return "Error: Gemini model not available."
-        response = model.generate_content(prompt)
-        return response.text
+async def acall_gemini(prompt):
+    print(f"\n-----PROMPT-----\n{prompt}\n--------------------\n")
+    try:
+        return await get_client().agenerate(prompt)
     except Exception as e:
         return f"Error calling Gemini API: {e}"
 
 
+def stream_gemini(prompt):
+    print(f"\n-----PROMPT-----\n{prompt}\n--------------------\n")
+    try:
+        yield from get_client().stream(prompt)
+    except Exception as e:
+        yield f"Error calling Gemini API: {e}"
 
-TRIP_DATA_FILE = "user_trips.json"
 
-class ItineraryEntry(BaseModel):
-    day: str = Field(..., description="The day number, e.g., 'Day 1'")
-    date: str = Field(..., description="The specific date for the day, e.g., 'July 17, 2025'")
-    activity: str = Field(..., description="The main activity for this entry")
-    description: Optional[str] = Field(None, description="A brief description of the activity")
-    location: Optional[str] = Field(None, description="The location of the activity")
-    cost: Optional[float] = Field(None, description="Estimated cost for the activity")
-    travel_distance_to_next_location: Optional[float] = Field(None, alias="Travel Distance to Next Location", description="Travel time/distance to the next activity. Empty if last activity of day/trip.")
+
+TRIP_DATA_FILE = "user_trips.json"
+# Migrate an existing TRIP_DATA_FILE with: python trip_store.py migrate user_trips.json user_trips.db
+TRIP_STORE_PATH = os.getenv("TRIP_STORE_PATH", "user_trips.db")
+# Bounds how stale a cached trip listing gets when another process saves a trip
+TRIP_LIST_TTL_SECONDS = 30
 
 
 
 class Orchestrator:
-    def __init__(self):
+    def __init__(self, trip_store=None, cache=None):
         load_dotenv()
         gemini_api_key = os.getenv("GEMINI_API_KEY")
         if gemini_api_key:
-            genai.configure(api_key=gemini_api_key)
+            configure_gemini(gemini_api_key)
             print(f"Gemini API key loaded: {bool(gemini_api_key)}") # Debug print
         else:
             print("Gemini API key not found. Please set the GEMINI_API_KEY environment variable.")
         self.travel_planner_agent = TravelPlannerAgent()
         self.airbnb_agent = AirbnbAgent()
-
-    @st.cache_data
-    def _read_all_trips(_self):
-        if not os.path.exists(TRIP_DATA_FILE) or os.path.getsize(TRIP_DATA_FILE) == 0:
-            return {}
-        with open(TRIP_DATA_FILE, "r") as f:
-            try:
-                return json.load(f)
-            except json.JSONDecodeError:
-                return {}
-
-    def _write_all_trips(_self, all_trips):
-        # Invalidate cache when writing
-        _self._read_all_trips.clear()
-        _self.get_all_trip_titles.clear()
-        with open(TRIP_DATA_FILE, "w") as f:
-            json.dump(all_trips, f, indent=4)
-
-    @st.cache_data
-    def get_all_trip_titles(_self):
-        return list(_self._read_all_trips().keys())
+        self._trip_store = trip_store
+        self._trip_store_lock = threading.Lock()
+        # Downloads, keyed on a hash of the itinerary they were built from, and trip listings;
+        # the Streamlit app passes a StreamlitCache, headless workers get an in-process one
+        self.cache = cache if cache is not None else InProcessCache(ttl_seconds=TRIP_LIST_TTL_SECONDS)
+
+    @property
+    def trip_store(self):
+        # The default store is opened on first use, so a run that never saves or loads creates no file
+        if self._trip_store is None:
+            with self._trip_store_lock:
+                if self._trip_store is None:
+                    self._trip_store = open_trip_store(TRIP_STORE_PATH)
+        return self._trip_store
+
+    @trip_store.setter
+    def trip_store(self, trip_store):
+        self._trip_store = trip_store
+
+    def get_all_trip_titles(self):
+        return self.cache.get_or_create("trip_titles", None, self.trip_store.titles)
+
+    def search_trips(self, query, limit=20, offset=0):
+        return self.cache.get_or_create(
+            "trip_search", (query, limit, offset), lambda: self.trip_store.search(query, limit=limit, offset=offset)
+        )
 
     def save_trip_data(self, trip_title, state_to_save):
-        all_trips = self._read_all_trips()
-        all_trips[trip_title] = state_to_save
-        self._write_all_trips(all_trips)
+        if isinstance(state_to_save, SessionState):
+            state_to_save = state_to_save.to_dict()
+        self.trip_store.put(trip_title, state_to_save)
+        self.cache.invalidate("trip_titles")
+        self.cache.invalidate("trip_search")
 
     def load_trip_data(self, trip_title):
-        all_trips = self._read_all_trips()
-        return all_trips.get(trip_title)
+        loaded_state = self.trip_store.get(trip_title)
+        return SessionState.from_dict(loaded_state) if loaded_state else None
+
+    def _itinerary_text(self, state):
+        # SessionState keeps the itinerary; plain state dicts are scanned
+        if isinstance(state, SessionState):
+            return state.current_itinerary() or ""
+        return find_itinerary_content(state) or ""
+
+    def _itinerary_entries(self, state):
+        if isinstance(state, SessionState):
+            return state.current_entries()
+        return get_itinerary_entries_from_state(state)
 
     def generate_pdf_itinerary(self, state):
-        state = json.loads(state)
+        itinerary_text = self._itinerary_text(state)
+        return self.cache.get_or_create("pdf", content_key(itinerary_text), lambda: self._build_pdf(itinerary_text))
+
+    def _build_pdf(self, itinerary_text):
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.lib.units import inch
+
         buffer = io.BytesIO()
         doc = SimpleDocTemplate(buffer)
         styles = getSampleStyleSheet()
@@ -102,13 +129,6 @@ class Orchestrator:
         story.append(Paragraph("Travel Itinerary", styles['h1']))
         story.append(Spacer(1, 0.2 * inch))
 
-        # Extract itinerary from conversation history
-        itinerary_text = ""
-        for entry in state["conversation_history"]:
-            if entry["role"] == "assistant" and "Day 1:" in entry["content"]: # Simple heuristic to find itinerary
-                itinerary_text = entry["content"]
-                break
-        
         if itinerary_text:
             for line in itinerary_text.split('\n'):
                 story.append(Paragraph(line, styles['Normal']))
@@ -121,55 +141,57 @@ class Orchestrator:
         return buffer.getvalue()
 
     def generate_csv_itinerary(self, state):
-        state = json.loads(state)
-        return generate_csv_itinerary(state)
+        itinerary_text = self._itinerary_text(state)
+        return self.cache.get_or_create(
+            "csv", content_key(itinerary_text), lambda: "".join(iter_csv_lines(self._itinerary_entries(state)))
+        )
 
     def validate_csv_itinerary(self, csv_data):
-        with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as temp_file_input:
-            temp_file_input.write(csv_data)
-            temp_file_path_input = temp_file_input.name
-
-        try:
-            processed_df = process_itinerary(temp_file_path_input)
-            
-            with tempfile.NamedTemporaryFile(mode='w+', delete=False, suffix='.csv') as temp_file_processed:
-                processed_df.to_csv(temp_file_processed.name, index=False)
-                temp_file_path_processed = temp_file_processed.name
-
-            agent = BudgetAgent(temp_file_path_processed)
-            agent.load_data()
-            agent.validate_data()
-            summary = agent.get_summary()
-
-            os.remove(temp_file_path_processed)
-            return summary
-        finally:
-            os.remove(temp_file_path_input)
+        from itinerary_io import read_itinerary
+        from location_rag_tool import process_itinerary
+
+        itinerary_df = read_itinerary(csv_data)
+        processed_df = process_itinerary(itinerary_df)
+        return self._budget_summary(processed_df)
+
+    def validate_itinerary(self, state):
+        """
+        Verifies the locations and validates the budget of the state's itinerary
+        straight from its parsed entries. A SessionState keeps the results, so
+        validating the same itinerary again does no work.
+        """
+        if isinstance(state, SessionState) and state.itinerary_validation is not None:
+            return state.itinerary_validation
+        from location_rag_tool import process_itinerary
+
+        processed_df = process_itinerary(self._itinerary_entries(state))
+        summary = self._budget_summary(processed_df)
+        if isinstance(state, SessionState):
+            verified = processed_df['Verified_Location_Data'] if 'Verified_Location_Data' in processed_df else []
+            state.verified_locations = [location.model_dump() if location is not None else None for location in verified]
+            state.itinerary_validation = summary
+        return summary
+
+    def _budget_summary(self, itinerary):
+        from budget_agent import ColumnarBudgetAgent
+
+        agent = ColumnarBudgetAgent(itinerary)
+        agent.load_data()
+        agent.validate_data()
+        return agent.get_summary()
 
     def get_default_state(self):
-        return {
-            "current_phase": "INITIAL",
-            "plan": {
-                "destination": None,
-                "duration": None,
-                "month": None,
-                "traveler_type": None,
-                "interests": [],
-                "budget": None,
-            },
-            "conversation_history": []
-        }
+        return SessionState()
 
-    def generate_trip_title_with_llm(self, plan, initial_query=None):
+    def _trip_title_prompt(self, plan, initial_query=None):
         if initial_query:
-            prompt = f"""
+            return f"""
             Generate a concise and descriptive title for a trip based on the following user query:
             '{initial_query}'
 
             Return only the title, without any additional text or punctuation.
             """
-        else:
-            prompt = f"""
+        return f"""
             Generate a concise and descriptive title for a trip based on the following details:
             Destination: {plan.get("destination")}
             Duration: {plan.get("duration")} days
@@ -180,15 +202,26 @@ class Orchestrator:
 
             Return only the title, without any additional text or punctuation.
             """
-        title = call_gemini(prompt).strip()
+
+    def _clean_trip_title(self, title):
         # Clean up any potential quotes or extra characters from LLM response
-        title = title.replace('"', '').replace("'", '').strip()
+        title = title.strip().replace('"', '').replace("'", '').strip()
         return title if title else "Untitled Trip"
 
+    def generate_trip_title_with_llm(self, plan, initial_query=None):
+        return self._clean_trip_title(call_gemini(self._trip_title_prompt(plan, initial_query=initial_query)))
+
+    def suggest_trip_title(self, state):
+        # AsyncOrchestrator generates a title alongside the itinerary; reuse it if present
+        trip_title = state.get("suggested_title")
+        if not trip_title:
+            initial_query = state["plan"].get("initial_query")
+            trip_title = self.generate_trip_title_with_llm(state["plan"], initial_query=initial_query)
+        return trip_title
+
     def save_current_trip(self, trip_title, current_state):
         if not trip_title:
-            initial_query = current_state["plan"].get("initial_query")
-            trip_title = self.generate_trip_title_with_llm(current_state["plan"], initial_query=initial_query)
+            trip_title = self.suggest_trip_title(current_state)
             current_state["conversation_history"].append({"role": "assistant", "content": f"No title provided. Auto-generating title: {trip_title}"})
 
         self.save_trip_data(trip_title, current_state)
@@ -204,26 +237,86 @@ class Orchestrator:
             return current_state
 
     def process_user_input(self, user_input, current_state):
-        state = current_state
-        ai_response = ""
+        state, response_chunks = self.stream_user_input(user_input, current_state)
+        for _ in response_chunks:
+            pass
+        return state
 
+    def stream_user_input(self, user_input, current_state):
+        """
+        Like process_user_input, but returns (state, chunks) where chunks yields the
+        assistant response as it is generated. The full response is appended to the
+        conversation history once chunks has been consumed.
+        """
+        state, ai_response = self._handle_user_input(user_input, current_state)
+        return state, self._record_response(state, ai_response)
+
+    def _record_response(self, state, ai_response):
+        if isinstance(ai_response, str):
+            ai_response = [ai_response]
+        chunks = []
+        for chunk in ai_response:
+            chunks.append(chunk)
+            yield chunk
+        full_response = "".join(chunks)
+        if full_response:
+            state["conversation_history"].append({"role": "assistant", "content": full_response})
+            self._record_itinerary(state)
+
+    def _record_itinerary(self, state):
+        # Parses the itinerary as soon as the response carrying it arrives
+        if isinstance(state, SessionState):
+            state.current_itinerary()
+
+    def _handle_user_input(self, user_input, current_state):
+        state = current_state
         state["conversation_history"].append({"role": "user", "content": user_input})
 
+        prompt = None
+        ai_response = ""
         if state["current_phase"] == "INITIAL":
             state["plan"]["initial_query"] = user_input # Store the initial query
             self.travel_planner_agent.parse_with_llm(user_input, state["plan"])
-            missing_info = self.travel_planner_agent.check_missing_info(state["plan"])
-
-            if not missing_info:
-                state["current_phase"] = "ITINERARY"
-                confirmation_message = "**Understood Parameters:**\n"
-                for key, value in state["plan"].items():
-                    if value:
-                        confirmation_message += f"- {key.replace('_', ' ').title()}: {value}\n"
-                confirmation_message += "\nParameters confirmed! Generating high-level itinerary..."
-                state["conversation_history"].append({"role": "assistant", "content": confirmation_message})
+            prompt, ai_response = self._plan_parameters_response(state)
+        elif state["current_phase"] == "ITINERARY":
+            prompt, ai_response = self._itinerary_command_response(user_input, state)
+        elif state["current_phase"] == "BUDGET":
+            state, ai_response = self._budget_command_response(user_input, state)
+
+        if prompt:
+            ai_response = stream_gemini(prompt)
+        return state, ai_response
+
+    def _understood_parameters(self, plan):
+        message = "**Understood Parameters:**\n"
+        for key, value in plan.items():
+            if value:
+                message += f"- {key.replace('_', ' ').title()}: {value}\n"
+        return message
+
+    def _plan_parameters_response(self, state):
+        """
+        Returns (prompt, response) for a freshly parsed plan: the itinerary prompt once
+        all parameters are known, otherwise a request for the missing ones.
+        """
+        missing_info = self.travel_planner_agent.check_missing_info(state["plan"])
+        if missing_info:
+            ai_response = self._understood_parameters(state["plan"])
+            ai_response += "\nTo generate a travel plan, I need a bit more information. Please provide the following:\n"
+            for item in missing_info:
+                ai_response += f"- {item.title()}\n"
+            return None, ai_response
+
+        state["current_phase"] = "ITINERARY"
+        confirmation_message = self._understood_parameters(state["plan"])
+        confirmation_message += "\nParameters confirmed! Generating high-level itinerary..."
+        state["conversation_history"].append({"role": "assistant", "content": confirmation_message})
+        state["conversation_history"].append({"role": "assistant", "content": """
+Type 'details [Day X]' or 'details [attraction name]' for more information, 'budget estimate' to see a cost breakdown, or 'find airbnb' for accommodation suggestions."""})
+        return self._itinerary_prompt(state["plan"]), ""
 
-                prompt = f"""Generate a {state['plan']['duration']}-day itinerary for a trip to {state['plan']['destination']} in {state['plan']['month']} for {state['plan']['traveler_type']} interested in {', '.join(state['plan']['interests'])}. The budget is around ${state['plan']['budget']}. For each day, include a specific date (e.g., July 17, 2025). Focus on the following format as described in PROMPT.md: ## X-Day [Destination] Itinerary ([Interests] Focus)
+    def _itinerary_prompt(self, plan):
+        return f"""Generate a {plan['duration']}-day itinerary for a trip to {plan['destination']} in {plan['month']} for {plan['traveler_type']} interested in {', '.join(plan['interests'])}. The budget is around ${plan['budget']}. For each day, include a specific date (e.g., July 17, 2025). Focus on the following format as described in PROMPT.md: ## X-Day [Destination] Itinerary ([Interests] Focus)
 
 For each activity, include: Activity Name (Description) @ Location $Cost (Travel Distance to Next Location). Leave Travel Distance empty for the last activity of the day or trip.
 
@@ -234,44 +327,29 @@ For each activity, include: Activity Name (Description) @ Location $Cost (Travel
 * ...
 
 Type 'details [Day X]' or 'details [attraction name]' for more information, or 'budget estimate' to see a cost breakdown."""
-                ai_response = call_gemini(prompt)
-                state["conversation_history"].append({"role": "assistant", "content": """
-Type 'details [Day X]' or 'details [attraction name]' for more information, 'budget estimate' to see a cost breakdown, or 'find airbnb' for accommodation suggestions."""})
-            else:
-                ai_response = "**Understood Parameters:**\n"
-                for key, value in state["plan"].items():
-                    if value:
-                        ai_response += f"- {key.replace('_', ' ').title()}: {value}\n"
-                
-                ai_response += "\nTo generate a travel plan, I need a bit more information. Please provide the following:\n"
-                for item in missing_info:
-                    ai_response += f"- {item.title()}\n"
 
-        elif state["current_phase"] == "ITINERARY":
-            if user_input.lower().startswith("details"):
-                detail_query = user_input.replace("details ", "").strip()
-                prompt = f"Provide practical details for '{detail_query}' from the itinerary for a trip to {state['plan']['destination']}. Include estimated time, brief description (text only), exact address/real-world location (if applicable), estimated cost (if applicable), suggestions for nearby attractions or food, and relevant Google Search queries or direct browsing links for booking. Focus on the format as described in PROMPT.md."
-                ai_response = call_gemini(prompt)
-
-            elif user_input.lower() == "budget estimate":
-                state["current_phase"] = "BUDGET"
-                prompt = f"Provide a rough budget breakdown and optimization tips for a {state['plan']['duration']}-day trip to {state['plan']['destination']} with a budget of ${state['plan']['budget']}. Break down costs for flights, accommodation, food and activities. Suggest ways to optimize the budget. Focus on the format as described in PROMPT.md."
-                ai_response = call_gemini(prompt)
-            elif user_input.lower() == "find airbnb":
-                ai_response = self.airbnb_agent.find_optimal_airbnb(state["plan"])
-            elif user_input.lower() == "generate csv":
-                ai_response = self.generate_csv_itinerary(json.dumps(state))
-            else:
-                ai_response = "Type 'details [Day X]', 'budget estimate', 'find airbnb', or 'generate csv'."
-        
-        elif state["current_phase"] == "BUDGET":
-            if user_input.lower() == "new plan":
-                state = self.get_default_state() # Reset state
-                ai_response = "Ready for a new travel plan."
-            else:
-                ai_response = "What else can I help you with, or would you like to start a 'new plan'?'"
-        
-        if ai_response:
-            state["conversation_history"].append({"role": "assistant", "content": ai_response})
-        
-        return state
+    def _details_prompt(self, detail_query, plan):
+        return f"Provide practical details for '{detail_query}' from the itinerary for a trip to {plan['destination']}. Include estimated time, brief description (text only), exact address/real-world location (if applicable), estimated cost (if applicable), suggestions for nearby attractions or food, and relevant Google Search queries or direct browsing links for booking. Focus on the format as described in PROMPT.md."
+
+    def _budget_prompt(self, plan):
+        return f"Provide a rough budget breakdown and optimization tips for a {plan['duration']}-day trip to {plan['destination']} with a budget of ${plan['budget']}. Break down costs for flights, accommodation, food and activities. Suggest ways to optimize the budget. Focus on the format as described in PROMPT.md."
+
+    def _itinerary_command_response(self, user_input, state):
+        """Returns (prompt, response); exactly one is set, prompt when the LLM must answer."""
+        if user_input.lower().startswith("details"):
+            detail_query = user_input.replace("details ", "").strip()
+            return self._details_prompt(detail_query, state["plan"]), ""
+        elif user_input.lower() == "budget estimate":
+            state["current_phase"] = "BUDGET"
+            return self._budget_prompt(state["plan"]), ""
+        elif user_input.lower() == "find airbnb":
+            return None, self.airbnb_agent.find_optimal_airbnb(state["plan"])
+        elif user_input.lower() == "generate csv":
+            return None, self.generate_csv_itinerary(state)
+        else:
+            return None, "Type 'details [Day X]', 'budget estimate', 'find airbnb', or 'generate csv'."
+
+    def _budget_command_response(self, user_input, state):
+        if user_input.lower() == "new plan":
+            return self.get_default_state(), "Ready for a new travel plan." # Reset state
+        return state, "What else can I help you with, or would you like to start a 'new plan'?'"
@@ -0,0 +1,157 @@
+import calendar
+import re
+from typing import Any, Dict, List, Optional
+
+PLAN_FIELDS = ("destination", "duration", "month", "traveler_type", "interests", "budget")
+
+DESTINATIONS = (
+    "Amsterdam", "Athens", "Bali", "Bangkok", "Barcelona", "Berlin", "Boston", "Budapest", "Buenos Aires",
+    "Cairo", "Cape Town", "Chicago", "Copenhagen", "Dubai", "Dublin", "Edinburgh", "Florence", "Hanoi",
+    "Havana", "Hong Kong", "Honolulu", "Istanbul", "Kyoto", "Las Vegas", "Lisbon", "London", "Los Angeles",
+    "Madrid", "Marrakech", "Mexico City", "Miami", "Milan", "Montreal", "Munich", "Naples", "New Orleans",
+    "New York", "New York City", "Nice", "Oslo", "Paris", "Prague", "Reykjavik", "Rio de Janeiro", "Rome",
+    "San Francisco", "Santorini", "Seoul", "Seville", "Singapore", "Stockholm", "Sydney", "Tokyo", "Toronto",
+    "Vancouver", "Venice", "Vienna", "Zurich",
+    "Australia", "Costa Rica", "Croatia", "Egypt", "France", "Germany", "Greece", "Iceland", "India", "Ireland",
+    "Italy", "Japan", "Mexico", "Morocco", "Peru", "Portugal", "Scotland", "Spain", "Switzerland", "Thailand",
+    "Vietnam",
+)
+
+TRAVELER_TYPES = {
+    "couple": ("couple", "partner", "wife", "husband", "girlfriend", "boyfriend", "honeymoon", "romantic"),
+    "family": ("family", "kids", "children", "child"),
+    "solo": ("solo", "alone", "myself", "on my own"),
+    "friends": ("friends", "group"),
+    "business": ("business", "work trip", "conference"),
+}
+
+INTERESTS = {
+    "history": ("history", "historic", "historical", "ancient", "ruins"),
+    "food": ("food", "foodie", "cuisine", "culinary", "restaurants", "eating"),
+    "art": ("art", "arts", "galleries", "paintings"),
+    "museums": ("museum", "museums"),
+    "architecture": ("architecture",),
+    "culture": ("culture", "cultural"),
+    "nature": ("nature", "hiking", "outdoors", "parks", "mountains"),
+    "beaches": ("beach", "beaches"),
+    "nightlife": ("nightlife", "bars", "clubs", "partying"),
+    "shopping": ("shopping",),
+    "wine": ("wine", "wineries", "vineyards"),
+    "adventure": ("adventure",),
+    "relaxation": ("relax", "relaxing", "relaxation", "spa"),
+    "music": ("music", "concerts"),
+}
+
+NUMBER_WORDS = {
+    "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "fourteen": 14,
+}
+MONTHS = [name for name in calendar.month_name if name]
+
+
+def _keyword_pattern(words) -> str:
+    # Longest first so "New York City" wins over "New York"
+    return r"\b(" + "|".join(re.escape(word) for word in sorted(words, key=len, reverse=True)) + r")\b"
+
+
+_NUMBER = r"(\d+|" + "|".join(NUMBER_WORDS) + r")"
+# Rates such as "$100 a day" are not the trip budget
+_AMOUNT = r"\b(?>(\d{1,3}(?:,\d{3})+|\d+(?:\.\d+)?)\s*(k\b)?)(?!\s*(?:a|an|per|/)\s*(?:day|night|person)\b)"
+_BUDGET_PATTERNS = [
+    re.compile(r"[$€£]\s?" + _AMOUNT, re.IGNORECASE),
+    re.compile(_AMOUNT + r"\s*(?:dollars|usd|euros?|eur|pounds|gbp)\b", re.IGNORECASE),
+    re.compile(_AMOUNT + r"\s+budget\b", re.IGNORECASE),
+    re.compile(r"\bbudget\s*(?:of|is|around|about|under|:)?\s*(?:~\s*)?" + _AMOUNT, re.IGNORECASE),
+]
+_DURATION_PATTERN = re.compile(r"\b(?:" + _NUMBER + r"|(a|an))[\s-]*(day|night|week)s?\b", re.IGNORECASE)
+_WEEKEND_PATTERN = re.compile(r"\b(long )?weekend\b", re.IGNORECASE)
+# "may" is also a verb, so only the capitalised month counts
+_MONTH_PATTERN = re.compile(r"\b(?i:" + "|".join(month for month in MONTHS if month != "May") + r")\b|\bMay\b")
+_DESTINATION_PATTERN = re.compile(_keyword_pattern(DESTINATIONS), re.IGNORECASE)
+# Destinations outside the list: a capitalised name after "to" or "visit". "in" is left out
+# because it also introduces interests and seasons ("interested in Art", "in Spring")
+_PLACE_AFTER_VERB = re.compile(r"\b(?:to|visit|visiting)\s+([A-Z][\w'-]+(?:\s+[A-Z][\w'-]+)*)")
+_TRAVELER_PATTERNS = {name: re.compile(_keyword_pattern(words), re.IGNORECASE) for name, words in TRAVELER_TYPES.items()}
+_INTEREST_PATTERN = re.compile(_keyword_pattern([word for words in INTERESTS.values() for word in words]), re.IGNORECASE)
+_INTEREST_BY_KEYWORD = {word: name for name, words in INTERESTS.items() for word in words}
+_DESTINATION_BY_NAME = {name.casefold(): name for name in DESTINATIONS}
+_NOT_PLACES = {
+    word.casefold()
+    for word in [*MONTHS, "Spring", "Summer", "Autumn", "Fall", "Winter", *_INTEREST_BY_KEYWORD,
+                 *(word for words in TRAVELER_TYPES.values() for word in words)]
+}
+
+
+def _number(text: str):
+    value = float(text.replace(",", ""))
+    return int(value) if value.is_integer() else value
+
+
+def extract_budget(text: str) -> Optional[float]:
+    for pattern in _BUDGET_PATTERNS:
+        match = pattern.search(text)
+        if match:
+            amount = _number(match.group(1))
+            return amount * 1000 if match.group(2) else amount
+    return None
+
+
+def extract_duration(text: str) -> Optional[int]:
+    """Trip length in days, e.g. from "7-day", "five nights" or "two weeks"."""
+    for match in _DURATION_PATTERN.finditer(text):
+        count, article, unit = match.groups()
+        if article and unit.lower() != "week":
+            continue  # "$100 a day" is a rate, not a trip length
+        days = 1 if article else (int(count) if count.isdigit() else NUMBER_WORDS[count.lower()])
+        return days * 7 if unit.lower() == "week" else days
+    match = _WEEKEND_PATTERN.search(text)
+    if match:
+        return 3 if match.group(1) else 2
+    return None
+
+
+def extract_month(text: str) -> Optional[str]:
+    match = _MONTH_PATTERN.search(text)
+    return match.group(0).capitalize() if match else None
+
+
+def extract_destination(text: str) -> Optional[str]:
+    match = _DESTINATION_PATTERN.search(text)
+    if match:
+        return _DESTINATION_BY_NAME[match.group(1).casefold()]
+    for match in _PLACE_AFTER_VERB.finditer(text):
+        if match.group(1).split()[0].casefold() not in _NOT_PLACES:
+            return match.group(1)
+    return None
+
+
+def extract_traveler_type(text: str) -> Optional[str]:
+    """The traveler type whose keyword appears first."""
+    found = [(match.start(), name) for name, pattern in _TRAVELER_PATTERNS.items() if (match := pattern.search(text))]
+    return min(found)[1] if found else None
+
+
+def extract_interests(text: str) -> List[str]:
+    """Interests in the order they are mentioned."""
+    interests = []
+    for match in _INTEREST_PATTERN.finditer(text):
+        interest = _INTEREST_BY_KEYWORD[match.group(1).lower()]
+        if interest not in interests:
+            interests.append(interest)
+    return interests
+
+
+def extract_plan(text: str) -> Dict[str, Any]:
+    """
+    Plan fields found in text by keyword and pattern rules, without an LLM call.
+    Fields the rules cannot find are left out.
+    """
+    extracted = {
+        "destination": extract_destination(text),
+        "duration": extract_duration(text),
+        "month": extract_month(text),
+        "traveler_type": extract_traveler_type(text),
+        "interests": extract_interests(text),
+        "budget": extract_budget(text),
+    }
+    return {field: value for field, value in extracted.items() if value}
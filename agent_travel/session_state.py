@@ -0,0 +1,98 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ConfigDict, Field, PrivateAttr
+
+from generate_csv_itinerary import ItineraryEntry, iter_itinerary_rows, rows_to_entries
+
+ITINERARY_MARKER = "Day 1:"
+
+
+def default_plan() -> Dict[str, Any]:
+    return {
+        "destination": None,
+        "duration": None,
+        "month": None,
+        "traveler_type": None,
+        "interests": [],
+        "budget": None,
+    }
+
+
+class SessionState(BaseModel):
+    """
+    One planning session: plan, phase, conversation history and the current
+    itinerary. Passed around by reference; supports state["key"] access so code
+    written against the old state dict keeps working.
+    """
+    # Saved trips may carry keys added by other versions of the app
+    model_config = ConfigDict(extra="allow")
+
+    current_phase: str = "INITIAL"
+    plan: Dict[str, Any] = Field(default_factory=default_plan)
+    conversation_history: List[Dict[str, str]] = Field(default_factory=list)
+    suggested_title: Optional[str] = None
+    itinerary: Optional[str] = Field(None, description="The first assistant message containing the itinerary")
+    itinerary_entries: Optional[List[ItineraryEntry]] = Field(None, description="The itinerary, parsed once when it arrives")
+    # Filled in by the first validation of the current itinerary; not saved with the trip
+    verified_locations: Optional[List[Optional[dict]]] = Field(None, exclude=True)
+    itinerary_validation: Optional[dict] = Field(None, exclude=True)
+
+    # Number of history messages already checked for the itinerary; history is append-only
+    _scanned: int = PrivateAttr(0)
+
+    @classmethod
+    def from_dict(cls, state: dict) -> "SessionState":
+        return cls.model_validate(state)
+
+    def to_dict(self) -> dict:
+        # The history list is shared rather than copied, so saving a long conversation stays cheap
+        return dict(self.model_dump(exclude={"conversation_history"}), conversation_history=self.conversation_history)
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in type(self).model_fields or key in (self.__pydantic_extra__ or {})
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def add_message(self, role: str, content: str):
+        self.conversation_history.append({"role": role, "content": content})
+
+    def current_itinerary(self) -> Optional[str]:
+        """
+        The itinerary text; only messages appended since the last call are scanned
+        for it, and a newly found itinerary is parsed straight away.
+        """
+        if self.itinerary is None:
+            history = self.conversation_history
+            for message in history[self._scanned:]:
+                if message.get("role") == "assistant" and ITINERARY_MARKER in message.get("content", ""):
+                    self.set_itinerary(message["content"])
+                    break
+            self._scanned = len(history)
+        return self.itinerary
+
+    def current_entries(self) -> List[ItineraryEntry]:
+        """Entries of the current itinerary; trips saved without them are parsed on first use."""
+        itinerary_text = self.current_itinerary()
+        if not itinerary_text:
+            return []
+        if self.itinerary_entries is None:
+            self.itinerary_entries = rows_to_entries(iter_itinerary_rows([itinerary_text]))
+        return self.itinerary_entries
+
+    def set_itinerary(self, itinerary_text: Optional[str]):
+        """Replaces the current itinerary, e.g. after the user edits it, and parses it."""
+        self.itinerary = itinerary_text
+        self._scanned = len(self.conversation_history)
+        self.itinerary_entries = rows_to_entries(iter_itinerary_rows([itinerary_text])) if itinerary_text else None
+        self.verified_locations = None
+        self.itinerary_validation = None
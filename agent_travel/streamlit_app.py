@@ -4,11 +4,14 @@ import re
 import os
 import datetime
 from orchestrator import Orchestrator
+from streamlit_cache import StreamlitCache
+
+TRIPS_PER_PAGE = 20
 
 # --- State Management ---
 @st.cache_resource
 def get_orchestrator():
-    return Orchestrator()
+    return Orchestrator(cache=StreamlitCache())
 
 orchestrator = get_orchestrator()
 if 'state' not in st.session_state:
@@ -36,10 +39,10 @@ if st.sidebar.button("Save Current Trip", use_container_width=True):
 
 st.sidebar.markdown("--- ")
 st.sidebar.header("Load Saved Trip")
-search_query = st.sidebar.text_input("Search Trip Titles:", key="search_trip_input")
+search_query = st.sidebar.text_input("Search Saved Trips:", key="search_trip_input")
+search_page = st.sidebar.number_input("Results Page:", min_value=1, value=1, step=1, key="search_trip_page")
 
-saved_trip_titles = orchestrator.get_all_trip_titles()
-filtered_trip_titles = [title for title in saved_trip_titles if search_query.lower() in title.lower()]
+filtered_trip_titles = orchestrator.search_trips(search_query, limit=TRIPS_PER_PAGE, offset=(search_page - 1) * TRIPS_PER_PAGE)
 
 if filtered_trip_titles:
     selected_trip_to_load = st.sidebar.selectbox("Select a trip to load:", options=filtered_trip_titles, key="selected_trip_to_load")
@@ -50,7 +53,7 @@ else:
     st.sidebar.info("No matching trips found.")
 
 # Display current state for debugging
-st.sidebar.expander("Current App State").json(state)
+st.sidebar.expander("Current App State").json(state.to_dict())
 
 # Display conversation history
 for entry in state["conversation_history"]:
@@ -59,26 +62,31 @@ for entry in state["conversation_history"]:
 
 
 if prompt := st.chat_input("Plan a 7-day trip to Rome in May for a couple interested in history and food, with a budget of $3000."):
-    # Process user input using the orchestrator
-    st.session_state.state = orchestrator.process_user_input(prompt, state)
+    with st.chat_message("user"):
+        st.markdown(prompt)
+    # Process user input using the orchestrator, rendering the response as it streams in
+    st.session_state.state, response_chunks = orchestrator.stream_user_input(prompt, state)
+    with st.chat_message("assistant"):
+        st.write_stream(response_chunks)
     # Rerun to display the latest messages
     st.rerun()
 
 # Download buttons
 col_dl1, col_dl2 = st.columns(2)
 with col_dl1:
-    pdf_data = orchestrator.generate_pdf_itinerary(json.dumps(state, default=str))
+    # Built only when the download is requested, and cached per itinerary by the orchestrator
     st.download_button(
         label="Download Itinerary as PDF",
-        data=pdf_data,
-        file_name=f"{str(state["plan"].get("destination", "travel_itinerary")).replace(" ", "_")}.pdf",
+        data=lambda: orchestrator.generate_pdf_itinerary(state),
+        file_name=f"{str(state['plan'].get('destination', 'travel_itinerary')).replace(' ', '_')}.pdf",
         mime="application/pdf",
         use_container_width=True
     )
 with col_dl2:
     if st.button("Validate and Download CSV", use_container_width=True):
-        csv_data = orchestrator.generate_csv_itinerary(json.dumps(state))
-        validation_results = orchestrator.validate_csv_itinerary(csv_data)
+        csv_data = orchestrator.generate_csv_itinerary(state)
+        # Validated from the entries parsed when the itinerary arrived; repeat clicks reuse the result
+        validation_results = orchestrator.validate_itinerary(state)
 
         if "errors" in validation_results and validation_results["errors"]:
             st.error("CSV Validation Failed!")
@@ -89,7 +97,7 @@ with col_dl2:
             st.download_button(
                 label="Download Itinerary as CSV",
                 data=csv_data,
-                file_name=f"{str(state["plan"].get("destination", "travel_itinerary")).replace(" ", "_")}.csv",
+                file_name=f"{str(state['plan'].get('destination', 'travel_itinerary')).replace(' ', '_')}.csv",
                 mime="text/csv",
                 use_container_width=True
             )
\ No newline at end of file
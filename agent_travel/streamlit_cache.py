@@ -0,0 +1,26 @@
+import streamlit as st
+
+from app_cache import Cache
+
+STREAMLIT_CACHE_ENTRIES = 256
+STREAMLIT_CACHE_TTL_SECONDS = 300
+
+
+@st.cache_data(max_entries=STREAMLIT_CACHE_ENTRIES, ttl=STREAMLIT_CACHE_TTL_SECONDS, show_spinner=False)
+def _cached(namespace, key, _build):
+    # The leading underscore keeps Streamlit from hashing the build callable
+    return _build()
+
+
+class StreamlitCache(Cache):
+    """
+    Adapter storing values in st.cache_data, so they are shared by every session
+    of the app and cleared by its "Clear cache" menu. st.cache_data cannot drop a
+    single namespace, so invalidate() clears everything.
+    """
+
+    def get_or_create(self, namespace, key, build):
+        return _cached(namespace, key, build)
+
+    def invalidate(self, namespace=None):
+        _cached.clear()
@@ -0,0 +1,124 @@
+import unittest
+import unittest.mock
+import asyncio
+import json
+import os
+import tempfile
+import threading
+import llm_client
+from api_server import PlannerAPI
+from geocode_cache import GeocodeCache
+from llm_client import LLMClient, StubModel
+from orchestrator import Orchestrator
+from trip_store import SQLiteTripStore
+
+
+async def _call(app, method, path, body=b"", query_string=b""):
+    scope = {"type": "http", "method": method, "path": path, "query_string": query_string, "headers": []}
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    await app(scope, receive, send)
+    headers = {name.decode(): value.decode() for name, value in sent[0]["headers"]}
+    payload = sent[1]["body"]
+    if headers["content-type"] == "application/json":
+        payload = json.loads(payload)
+    return sent[0]["status"], headers, payload
+
+
+def call(app, method, path, body=None, query_string=b""):
+    if isinstance(body, dict):
+        body = json.dumps(body).encode()
+    return asyncio.run(_call(app, method, path, body or b"", query_string))
+
+
+class TestPlannerAPI(unittest.TestCase):
+
+    def setUp(self):
+        llm_client.set_client(LLMClient(model=StubModel()))
+        self.temp_dir = tempfile.TemporaryDirectory()
+        trip_store = SQLiteTripStore(os.path.join(self.temp_dir.name, "trips.db"))
+        self.app = PlannerAPI(Orchestrator(trip_store=trip_store), workers=2)
+
+    def tearDown(self):
+        self.app.executor.shutdown(wait=True)
+        llm_client.set_client(None)
+        self.temp_dir.cleanup()
+
+    def test_plan_download_validate_save_and_load(self):
+        status, _, session = call(self.app, "POST", "/sessions")
+        self.assertEqual((status, session["phase"]), (201, "INITIAL"))
+        session_id = session["session_id"]
+
+        status, _, result = call(self.app, "POST", f"/sessions/{session_id}/messages",
+                                 {"message": "Plan a 3-day trip to Rome in July for a couple"})
+        self.assertEqual((status, result["phase"]), (200, "ITINERARY"))
+        self.assertEqual(result["plan"]["destination"], "Rome")
+        self.assertIn("**Day 1: July 20, 2025:**", result["replies"][-1])
+        # Interests and budget are not in the message, so only those came from the LLM
+        extraction = call(self.app, "GET", "/health")[2]["plan_extraction"]
+        self.assertEqual((extraction["messages"], extraction["llm_fallbacks"]), (1, 1))
+        self.assertEqual(extraction["fields_from_llm"], {"interests": 1, "budget": 1})
+
+        status, headers, csv_data = call(self.app, "GET", f"/sessions/{session_id}/csv")
+        self.assertEqual(status, 200)
+        self.assertTrue(headers["content-type"].startswith("text/csv"))
+        self.assertIn(b"Colosseum Tour", csv_data)
+
+        with unittest.mock.patch("location_rag_tool.get_geocode_cache", return_value=GeocodeCache()):
+            status, _, summary = call(self.app, "POST", f"/sessions/{session_id}/validate")
+        self.assertEqual(status, 200)
+        self.assertEqual(summary["1"]["total_cost"], 115.0)
+
+        status, _, saved = call(self.app, "POST", f"/sessions/{session_id}/save", {"title": "Roman Holiday"})
+        self.assertEqual((status, saved["title"]), (200, "Roman Holiday"))
+        status, _, trips = call(self.app, "GET", "/trips", query_string=b"q=rome")
+        self.assertEqual(trips["titles"], ["Roman Holiday"])
+
+        _, _, other = call(self.app, "POST", "/sessions")
+        status, _, loaded = call(self.app, "POST", f"/sessions/{other['session_id']}/load", {"title": "Roman Holiday"})
+        self.assertEqual((status, loaded["phase"]), (200, "ITINERARY"))
+        _, _, state = call(self.app, "GET", f"/sessions/{other['session_id']}")
+        self.assertEqual(state["state"]["plan"]["destination"], "Rome")
+
+    def test_validate_csv_body(self):
+        csv_data = (
+            b"Day,Date,Activity,Description,Location,Cost,Travel Distance to Next Location\n"
+            b"1,2025-07-20,Lunch,,,$40.00,\n"
+        )
+        with unittest.mock.patch("location_rag_tool.get_geocode_cache", return_value=GeocodeCache()):
+            status, _, summary = call(self.app, "POST", "/validate", csv_data)
+        self.assertEqual((status, summary["1"]["total_cost"]), (200, 40.0))
+
+    def test_client_errors(self):
+        self.assertEqual(call(self.app, "GET", "/nowhere")[0], 404)
+        self.assertEqual(call(self.app, "GET", "/sessions/missing")[0], 404)
+        self.assertEqual(call(self.app, "DELETE", "/sessions")[0], 405)
+        _, _, session = call(self.app, "POST", "/sessions")
+        path = f"/sessions/{session['session_id']}/messages"
+        self.assertEqual(call(self.app, "POST", path, b"{not json")[0], 400)
+        self.assertEqual(call(self.app, "POST", path, {"message": ""})[0], 400)
+        self.assertEqual(call(self.app, "POST", f"/sessions/{session['session_id']}/load", {"title": "Nope"})[0], 404)
+        self.assertEqual(call(self.app, "GET", "/trips", query_string=b"limit=x")[0], 400)
+
+    def test_backpressure_and_timeout(self):
+        self.app.max_pending = 1
+        self.app.timeout = 0.05
+        release = threading.Event()
+        with unittest.mock.patch.object(self.app.orchestrator, "search_trips", side_effect=lambda *args: release.wait(5) and []):
+            # The first call times out, but keeps its slot until the worker finishes
+            self.assertEqual(call(self.app, "GET", "/trips")[0], 504)
+            status, headers, _ = call(self.app, "GET", "/trips")
+            self.assertEqual((status, headers["retry-after"]), (503, "1"))
+            release.set()
+            self.app.executor.shutdown(wait=True)
+        self.assertEqual(call(self.app, "GET", "/health")[2]["pending"], 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+import unittest
+import unittest.mock
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from app_cache import InProcessCache
+from orchestrator import Orchestrator
+from trip_store import SQLiteTripStore
+
+ITINERARY = "**Day 1: July 20, 2025:**\n* Colosseum Tour @ Colosseum $75.00"
+
+
+def csv_in_worker(db_path):
+    """Runs in a worker process, with no Streamlit runtime."""
+    orchestrator = Orchestrator(trip_store=SQLiteTripStore(db_path))
+    state = orchestrator.load_saved_trip("Roman Holiday", orchestrator.get_default_state())
+    return orchestrator.generate_csv_itinerary(state)
+
+
+class TestInProcessCache(unittest.TestCase):
+
+    def test_builds_once_per_namespace_and_key(self):
+        cache = InProcessCache()
+        builds = []
+
+        def build(value):
+            builds.append(value)
+            return value
+
+        self.assertEqual(cache.get_or_create("pdf", "itinerary", lambda: build(b"pdf")), b"pdf")
+        self.assertEqual(cache.get_or_create("pdf", "itinerary", lambda: build(b"other")), b"pdf")
+        self.assertEqual(cache.get_or_create("csv", "itinerary", lambda: build("csv")), "csv")
+        self.assertEqual(builds, [b"pdf", "csv"])
+        self.assertEqual(cache.stats(), {"hits": 1, "misses": 2, "evictions": 0, "entries": 2})
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = InProcessCache(max_entries=2)
+        cache.get_or_create("pdf", "a", lambda: "A")
+        cache.get_or_create("pdf", "b", lambda: "B")
+        cache.get_or_create("pdf", "a", lambda: "A2")
+        cache.get_or_create("pdf", "c", lambda: "C")
+        self.assertEqual(cache.get_or_create("pdf", "a", lambda: "A3"), "A")
+        self.assertEqual(cache.get_or_create("pdf", "b", lambda: "B2"), "B2")
+        self.assertEqual(cache.stats()["evictions"], 2)
+
+    def test_expired_entries_are_rebuilt(self):
+        cache = InProcessCache(ttl_seconds=10)
+        with unittest.mock.patch("app_cache.time.monotonic", return_value=100.0):
+            cache.get_or_create("trip_titles", None, lambda: ["Rome"])
+        with unittest.mock.patch("app_cache.time.monotonic", return_value=105.0):
+            self.assertEqual(cache.get_or_create("trip_titles", None, lambda: ["Paris"]), ["Rome"])
+        with unittest.mock.patch("app_cache.time.monotonic", return_value=111.0):
+            self.assertEqual(cache.get_or_create("trip_titles", None, lambda: ["Paris"]), ["Paris"])
+
+    def test_invalidate_one_namespace(self):
+        cache = InProcessCache()
+        cache.get_or_create("trip_titles", None, lambda: ["Rome"])
+        cache.get_or_create("pdf", "a", lambda: b"A")
+        cache.invalidate("trip_titles")
+        self.assertEqual(cache.get_or_create("trip_titles", None, lambda: ["Paris"]), ["Paris"])
+        self.assertEqual(cache.get_or_create("pdf", "a", lambda: b"A2"), b"A")
+        cache.invalidate()
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class TestOrchestratorCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "trips.db")
+        self.orchestrator = Orchestrator(trip_store=SQLiteTripStore(self.db_path))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_trip_listings_are_cached_until_a_save(self):
+        self.orchestrator.save_trip_data("Roman Holiday", {"plan": {"destination": "Rome"}, "conversation_history": []})
+        with unittest.mock.patch.object(self.orchestrator.trip_store, "search",
+                                        wraps=self.orchestrator.trip_store.search) as search:
+            self.assertEqual(self.orchestrator.search_trips("rome"), ["Roman Holiday"])
+            self.assertEqual(self.orchestrator.search_trips("rome"), ["Roman Holiday"])
+            self.assertEqual(search.call_count, 1)
+            self.orchestrator.save_trip_data("Rome Again", {"plan": {"destination": "Rome"}, "conversation_history": []})
+            self.assertEqual(sorted(self.orchestrator.search_trips("rome")), ["Roman Holiday", "Rome Again"])
+            self.assertEqual(search.call_count, 2)
+        self.assertEqual(self.orchestrator.get_all_trip_titles(), ["Roman Holiday", "Rome Again"])
+
+    def test_runs_headless_in_a_process_pool(self):
+        state = self.orchestrator.get_default_state()
+        state.add_message("assistant", ITINERARY)
+        self.orchestrator.save_trip_data("Roman Holiday", state)
+        with ProcessPoolExecutor(max_workers=1) as executor:
+            csv_data = executor.submit(csv_in_worker, self.db_path).result()
+        self.assertIn("Colosseum Tour", csv_data)
+
+
+class TestStreamlitCache(unittest.TestCase):
+
+    def test_adapter_caches_and_clears(self):
+        from streamlit_cache import StreamlitCache
+        cache = StreamlitCache()
+        cache.invalidate()
+        builds = []
+        for _ in range(2):
+            self.assertEqual(cache.get_or_create("trip_search", ("rome", 20, 0), lambda: builds.append(1) or ["Rome"]), ["Rome"])
+        self.assertEqual(len(builds), 1)
+        cache.invalidate("trip_search")
+        cache.get_or_create("trip_search", ("rome", 20, 0), lambda: builds.append(1) or ["Rome"])
+        self.assertEqual(len(builds), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import unittest
+import os
+import tempfile
+import asyncio
+import json
+import threading
+import time
+import llm_client
+from llm_client import LLMClient
+from trip_store import SQLiteTripStore
+from async_orchestrator import AsyncOrchestrator
+from test_llm_client import StubResponse
+
+
+class SlowStubModel:
+    """Answers after a fixed delay and records the peak number of concurrent calls."""
+    def __init__(self, delay=0.1):
+        self.delay = delay
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delay)
+        with self._lock:
+            self.in_flight -= 1
+        if "Extract the following travel planning parameters" in prompt:
+            return StubResponse(json.dumps({
+                "destination": "Rome", "duration": 3, "month": "May", "traveler_type": "couple",
+                "interests": ["history"], "budget": 3000
+            }))
+        if "Generate a concise and descriptive title" in prompt:
+            return StubResponse('"Roman Holiday"')
+        return StubResponse(f"response to: {prompt[:40]}")
+
+
+class TestAsyncOrchestrator(unittest.TestCase):
+
+    def setUp(self):
+        self.model = SlowStubModel()
+        llm_client.set_client(LLMClient(model=self.model))
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trip_store = SQLiteTripStore(os.path.join(self.temp_dir.name, "trips.db"))
+        self.orchestrator = AsyncOrchestrator(trip_store=self.trip_store, max_concurrency=4)
+
+    def tearDown(self):
+        llm_client.set_client(None)
+        self.temp_dir.cleanup()
+
+    def test_day_details_fan_out_is_concurrent_and_bounded(self):
+        state = self.orchestrator.get_default_state()
+        state["plan"].update({"destination": "Rome", "duration": 8})
+
+        details = self.orchestrator.fetch_day_details(state)
+
+        self.assertEqual(list(details), [f"Day {day}" for day in range(1, 9)])
+        # 8 calls, at most four at a time
+        self.assertEqual(self.model.max_in_flight, 4)
+
+    def test_initial_input_generates_itinerary_and_title_together(self):
+        state = self.orchestrator.process_user_input(
+            "Plan a 3-day trip to Rome in May for a couple interested in history, budget $3000",
+            self.orchestrator.get_default_state()
+        )
+        self.assertEqual(state["current_phase"], "ITINERARY")
+        self.assertEqual(state["suggested_title"], "Roman Holiday")
+        self.assertTrue(state["conversation_history"][-1]["content"].startswith("response to: Generate a 3-day itinerary"))
+        self.assertEqual(self.model.max_in_flight, 2)
+
+    def test_concurrent_sessions_share_one_event_loop(self):
+        async def run_sessions():
+            states = []
+            for _ in range(4):
+                state = self.orchestrator.get_default_state()
+                state["current_phase"] = "ITINERARY"
+                state["plan"].update({"destination": "Rome", "duration": 3, "budget": 3000})
+                states.append(state)
+            return await asyncio.gather(*(
+                self.orchestrator.aprocess_user_input(f"details Day {i}", state) for i, state in enumerate(states)
+            ))
+
+        states = asyncio.run(run_sessions())
+
+        self.assertEqual(len(states), 4)
+        for state in states:
+            self.assertEqual(state["conversation_history"][-1]["role"], "assistant")
+        # The sessions' LLM calls overlapped instead of running one after another
+        self.assertGreater(self.model.max_in_flight, 1)
+        self.assertLessEqual(self.model.max_in_flight, 4)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import unittest
+import os
+import tempfile
+import pandas as pd
+from batch_budget import build_cost_report, load_activity_frame, report_to_json
+from trip_store import JsonTripStore, SQLiteTripStore
+
+
+def make_trip(destination, month, itinerary):
+    return {
+        "plan": {"destination": destination, "month": month},
+        "conversation_history": [{"role": "assistant", "content": itinerary}] if itinerary else [],
+    }
+
+
+TRIPS = {
+    "Roman Holiday": make_trip("Rome", "July", (
+        "**Day 1: July 20, 2025:**\n"
+        "* Colosseum Tour @ Colosseum $75.00 (2.5)\n"
+        "* Lunch @ Trattoria Monti $25.00\n"
+        "**Day 2: July 21, 2025:**\n"
+        "* Vatican Museums @ Vatican City $50.00\n"
+    )),
+    "Rome in Spring": make_trip("Rome", "April", (
+        "**Day 1: April 02, 2025:**\n"
+        "* Pantheon @ Pantheon $0.00\n"
+        "* Free Evening\n"
+    )),
+    "Paris Weekend": make_trip("Paris", "July", (
+        "**Day 1: July 05, 2025:**\n"
+        "* Louvre @ Louvre $22.00\n"
+    )),
+    "Undecided": make_trip("Tokyo", "May", None),
+}
+
+
+class TestBatchBudget(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.stores = [
+            SQLiteTripStore(os.path.join(self.temp_dir.name, "trips.db")),
+            JsonTripStore(os.path.join(self.temp_dir.name, "trips.json")),
+        ]
+        for store in self.stores:
+            store.put_many(TRIPS)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_activity_frame_covers_every_itinerary(self):
+        for store in self.stores:
+            activities = load_activity_frame(store)
+            self.assertEqual(len(activities), 6)
+            self.assertEqual(set(activities["trip"]), {"Roman Holiday", "Rome in Spring", "Paris Weekend"})
+
+    def test_per_trip_statistics(self):
+        trips = build_cost_report(self.stores[0])["trips"]
+        rome = trips.loc["Roman Holiday"]
+        self.assertEqual(rome["total_cost"], 150.0)
+        self.assertEqual(rome["days"], 2)
+        self.assertEqual(rome["cost_per_day"], 75.0)
+        self.assertEqual(rome["max_day_cost"], 100.0)
+        self.assertEqual(rome["month"], "2025-07")
+        spring = trips.loc["Rome in Spring"]
+        self.assertEqual((spring["activities"], spring["priced_activities"]), (2, 1))
+
+    def test_per_destination_and_month_statistics(self):
+        report = build_cost_report(self.stores[1])
+        destinations = report["destinations"]
+        self.assertEqual(destinations.loc["Rome", "trips"], 2)
+        self.assertEqual(destinations.loc["Rome", "total_cost"], 150.0)
+        self.assertEqual(destinations.loc["Rome", "mean_trip_cost"], 75.0)
+        self.assertEqual(destinations.loc["Paris", "max_trip_cost"], 22.0)
+        months = report["months"]
+        self.assertEqual(months.loc["2025-07", "trips"], 2)
+        self.assertEqual(months.loc["2025-07", "total_cost"], 172.0)
+        self.assertEqual(months.loc["2025-04", "trips"], 1)
+
+    def test_process_pool_gives_the_same_report(self):
+        serial = build_cost_report(self.stores[0])
+        pooled = build_cost_report(self.stores[0], workers=2)
+        for name in serial:
+            pd.testing.assert_frame_equal(serial[name], pooled[name])
+
+    def test_json_report(self):
+        report = report_to_json(build_cost_report(self.stores[0]))
+        self.assertEqual(sorted(row["trip"] for row in report["trips"]),
+                         ["Paris Weekend", "Roman Holiday", "Rome in Spring"])
+        self.assertEqual({row["destination"] for row in report["destinations"]}, {"Paris", "Rome"})
+
+if __name__ == '__main__':
+    unittest.main()
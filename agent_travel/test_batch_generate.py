@@ -0,0 +1,105 @@
+import unittest
+import unittest.mock
+import asyncio
+import json
+import os
+import tempfile
+import llm_client
+from async_orchestrator import AsyncOrchestrator
+from batch_generate import BatchGenerator, finished_ids
+from geocode_cache import GeocodeCache
+from llm_client import LLMClient, StubModel
+from trip_store import SQLiteTripStore
+
+QUERY = "Plan a 3-day trip to Rome in July for a couple interested in history and food, with a budget of $2000."
+
+
+class TestBatchGenerate(unittest.TestCase):
+
+    def setUp(self):
+        llm_client.set_client(LLMClient(model=StubModel()))
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.input_path = os.path.join(self.temp_dir.name, "trips.jsonl")
+        self.output_path = os.path.join(self.temp_dir.name, "results.jsonl")
+        self.store = SQLiteTripStore(os.path.join(self.temp_dir.name, "trips.db"))
+        patcher = unittest.mock.patch("location_rag_tool.get_geocode_cache", return_value=GeocodeCache())
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        llm_client.set_client(None)
+        self.temp_dir.cleanup()
+
+    def write_requests(self, lines):
+        with open(self.input_path, "w") as f:
+            for line in lines:
+                f.write((line if isinstance(line, str) else json.dumps(line)) + "\n")
+
+    def run_batch(self, **options):
+        generator = BatchGenerator(AsyncOrchestrator(trip_store=self.store), concurrency=4, **options)
+        return asyncio.run(generator.run(self.input_path, self.output_path))
+
+    def results(self):
+        with open(self.output_path) as f:
+            return {record["id"]: record for record in map(json.loads, f)}
+
+    def test_generates_itinerary_csv_and_validation(self):
+        self.write_requests([{"id": f"trip-{i}", "query": QUERY} for i in range(10)])
+        counts = self.run_batch()
+        self.assertEqual(counts["ok"], 10)
+        record = self.results()["trip-3"]
+        self.assertEqual(record["status"], "ok")
+        self.assertEqual(record["plan"]["destination"], "Rome")
+        self.assertIn("Day 1:", record["itinerary"])
+        self.assertIn("Colosseum", record["csv"])
+        self.assertIn("validation", record)
+
+    def test_plan_overrides_and_incomplete_plans(self):
+        self.write_requests([
+            {"id": "paris", "query": QUERY, "plan": {"destination": "Paris"}},
+            {"id": "no-budget", "query": QUERY, "plan": {"budget": None}},
+        ])
+        counts = self.run_batch(validate=False)
+        self.assertEqual((counts["ok"], counts["incomplete"]), (1, 1))
+        results = self.results()
+        self.assertEqual(results["paris"]["plan"]["destination"], "Paris")
+        self.assertNotIn("validation", results["paris"])
+        self.assertEqual(results["no-budget"]["missing"], ["budget"])
+
+    def test_bad_lines_are_recorded_and_the_run_continues(self):
+        self.write_requests(["{not json", {"id": "empty"}, {"query": QUERY}])
+        counts = self.run_batch(validate=False)
+        self.assertEqual((counts["ok"], counts["error"]), (1, 2))
+        results = self.results()
+        self.assertIn("Invalid JSON", results["line-1"]["error"])
+        self.assertEqual(results["empty"]["status"], "error")
+        self.assertEqual(results["line-3"]["status"], "ok")
+
+    def test_restart_skips_finished_trips_and_retries_errors(self):
+        self.write_requests([{"id": "done", "query": QUERY}, {"id": "failed", "query": QUERY}, {"id": "new", "query": QUERY}])
+        with open(self.output_path, "w") as f:
+            f.write(json.dumps({"id": "done", "status": "ok"}) + "\n")
+            f.write(json.dumps({"id": "failed", "status": "error"}) + "\n")
+            f.write('{"id": "new", "sta')  # cut short by an interrupted run
+        counts = self.run_batch(validate=False)
+        self.assertEqual((counts["skipped"], counts["ok"]), (1, 2))
+        self.assertEqual(finished_ids(self.output_path), {"done", "failed", "new"})
+        with open(self.output_path) as f:
+            self.assertEqual(len([json.loads(line) for line in f]), 4)
+
+    def test_default_trip_store_is_only_opened_to_save(self):
+        self.write_requests([{"id": "rome", "query": QUERY}])
+        with unittest.mock.patch("orchestrator.open_trip_store", side_effect=AssertionError("opened the trip store")):
+            counts = asyncio.run(BatchGenerator(concurrency=2, validate=False).run(self.input_path, self.output_path))
+        self.assertEqual(counts["ok"], 1)
+
+    def test_generated_trips_can_be_saved(self):
+        self.write_requests([{"id": "rome", "title": "Batch Rome", "query": QUERY}])
+        generator = BatchGenerator(AsyncOrchestrator(trip_store=self.store), concurrency=2, validate=False, save=True)
+        asyncio.run(generator.run(self.input_path, self.output_path))
+        self.assertEqual(self.results()["rome"]["title"], "Batch Rome")
+        self.assertEqual(self.store.titles(), ["Batch Rome"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,10 @@
 import unittest
+import io
 import pandas as pd
 import os
-from budget_agent import BudgetAgent, Trip
+from budget_agent import BudgetAgent, ColumnarBudgetAgent, Trip, infer_date_format
+from generate_csv_itinerary import parse_itinerary_content, generate_csv_from_itinerary_entries
+from orchestrator import ItineraryEntry
 
 class TestBudgetAgent(unittest.TestCase):
 
@@ -61,5 +64,165 @@ class TestBudgetAgent(unittest.TestCase):
         self.assertEqual(summary[1]['total_cost'], 35)
         self.assertEqual(summary[2]['total_cost'], 50)
 
+    def test_in_memory_sources_match_csv_file(self):
+        with open(self.valid_csv_path) as f:
+            csv_text = f.read()
+        entries = [
+            ItineraryEntry(day='1', date='2024-01-01', activity='Museum', cost=20),
+            ItineraryEntry(day='1', date='2024-01-01', activity='Lunch', cost=15),
+            ItineraryEntry(day='2', date='2024-01-02', activity='Train', cost=50),
+        ]
+        expected = BudgetAgent(self.valid_csv_path)
+        expected.load_data()
+        for source in [csv_text, io.StringIO(csv_text), pd.read_csv(self.valid_csv_path), entries]:
+            agent = BudgetAgent(source)
+            agent.load_data()
+            agent.validate_data()
+            self.assertEqual(agent.errors, [])
+            self.assertEqual([trip.cost for trip in agent.trips], [trip.cost for trip in expected.trips])
+            self.assertEqual(agent.get_summary()[1]['total_cost'], 35)
+
+    def test_dataframe_source_is_not_modified(self):
+        df = pd.read_csv(self.csv_path, dtype=object)
+        before = df.copy()
+        BudgetAgent(df).load_data()
+        pd.testing.assert_frame_equal(df, before)
+
+    def test_generated_csv_travel_column_is_accepted(self):
+        csv_text = "Day,Date,Activity,Description,Location,Cost,Travel Distance to Location\n1,2024-01-01,Museum,,Vatican,$20,1.5\n"
+        agent = BudgetAgent(csv_text)
+        agent.load_data()
+        self.assertEqual(agent.errors, [])
+        self.assertEqual(agent.trips[0].travel_distance_to_next_location, 1.5)
+
+    def test_out_of_order_rows_are_reported(self):
+        agent = BudgetAgent(self.csv_path)
+        agent.load_data()
+        agent.validate_data()
+        # Index 4 is the last loaded row (the 'invalid' cost row is dropped)
+        self.assertIn("Date out of chronological order at index 4: 2024-01-02", agent.errors)
+        self.assertNotIn("Day sequence is not in ascending order.", agent.errors)
+
+    def test_generated_itinerary_csv_validates(self):
+        csv_text = generate_csv_from_itinerary_entries(parse_itinerary_content(
+            "**Day 1: July 20, 2025:**\n"
+            "* Colosseum Tour (Guided) @ Colosseum $75.00 (2.5)\n"
+            "* Lunch @ Trattoria Monti $40.00\n"
+            "**Day 2: July 21, 2025:**\n"
+            "* Vatican Museums @ Vatican City $30.00\n"
+        ))
+        agent = BudgetAgent(csv_text)
+        agent.load_data()
+        agent.validate_data()
+        summary = agent.get_summary()
+        self.assertEqual(agent.errors, [])
+        self.assertEqual(summary[1]["total_cost"], 115.0)
+        self.assertEqual(summary[2]["date"], "July 21, 2025")
+
+    def test_invalid_dates_are_reported_against_the_inferred_format(self):
+        agent = BudgetAgent(
+            "Day,Date,Activity,Cost\n1,July 20 2025,A,$1\n1,\"July 20, 2025\",B,$1\n2,\"July 21, 2025\",C,$1\n"
+        )
+        agent.load_data()
+        agent.validate_data()
+        self.assertEqual(agent.errors, ["Invalid date format at index 0: July 20 2025"])
+
+
+class TestInferDateFormat(unittest.TestCase):
+
+    def test_first_format_parsing_every_date_wins(self):
+        self.assertEqual(infer_date_format(pd.Series(["2024-01-01", "2024-01-02"])), "%Y-%m-%d")
+        self.assertEqual(infer_date_format(pd.Series(["01/02/2024", "01/03/2024"])), "%m/%d/%Y")
+        self.assertEqual(infer_date_format(pd.Series(["13/02/2024", "01/03/2024"])), "%d/%m/%Y")
+        self.assertEqual(infer_date_format(pd.Series(["July 20, 2025"])), "%B %d, %Y")
+
+    def test_falls_back_to_the_format_parsing_most_dates(self):
+        self.assertEqual(infer_date_format(pd.Series(["2024-01-01", "2024-01-02", "01/03/2024"])), "%Y-%m-%d")
+
+
+class TestColumnarBudgetAgent(unittest.TestCase):
+    """The columnar agent must load, validate and summarise like BudgetAgent, plus its extra totals."""
+
+    invalid_csv = (
+        "Day,Date,Activity,Cost,Travel Distance to Next Location,Description\n"
+        "1,2024-01-01,Museum,$20,,\n1,2024-01-01,Lunch,$15,,\n2,2024-01-02,Train,$50,,\n"
+        "3,2024-01-03,Hotel,$150,,\n3,2024-01-03,Dinner,invalid,,\n4,2024-01-02,Sightseeing,$25,,\n"
+    )
+    valid_csv = "Day,Date,Activity,Cost\n1,2024-01-01,Museum,20\n1,2024-01-01,Lunch,15\n2,2024-01-02,Train,50\n"
+    report_csv = (
+        "Day,Date,Activity,Description,Location,Cost,Travel Distance to Next Location\n"
+        "1,2024-01-01,Airport Transfer,,,\"$1,050.00\",2.5\n"
+        "1,2024-01-01,Lunch at Trattoria,,Monti,$40,\n"
+        "2,2024-01-02,Colosseum Tour,,Colosseum,$75,\n"
+        "2,2024-01-02,Check-in at Hotel,,,$0,\n"
+        "3,2024-01-03,Free Afternoon,,,$10,\n"
+    )
+
+    def validate_both(self, source):
+        """BudgetAgent and ColumnarBudgetAgent after loading and validating the same source."""
+        # A file-like source is read once, so each agent gets its own copy
+        copy = (lambda: io.StringIO(source.getvalue())) if isinstance(source, io.StringIO) else (lambda: source)
+        agents = BudgetAgent(copy()), ColumnarBudgetAgent(copy())
+        for agent in agents:
+            agent.load_data()
+            agent.validate_data()
+        return agents
+
+    def test_summary_matches_row_agent(self):
+        generated_csv = generate_csv_from_itinerary_entries(parse_itinerary_content(
+            "**Day 1: July 20, 2025:**\n"
+            "* Colosseum Tour (Guided) @ Colosseum $75.00 (2.5)\n"
+            "**Day 2: July 21, 2025:**\n"
+            "* Vatican Museums @ Vatican City $30.00\n"
+        ))
+        entries = [
+            ItineraryEntry(day='1', date='2024-01-01', activity='Museum', cost=20),
+            ItineraryEntry(day='2', date='2024-01-02', activity='Train', cost=50),
+        ]
+        sources = [self.valid_csv, io.StringIO(self.valid_csv), pd.read_csv(io.StringIO(self.valid_csv)),
+                   entries, self.report_csv, generated_csv, 'Rome.csv']
+        for source in sources:
+            row_agent, columnar_agent = self.validate_both(source)
+            self.assertEqual(columnar_agent.errors, row_agent.errors)
+            self.assertEqual(columnar_agent.get_summary(), row_agent.get_summary())
+
+    def test_invalid_rows_are_dropped_and_reported_with_their_row_number(self):
+        row_agent, columnar_agent = self.validate_both(self.invalid_csv)
+        self.assertEqual(len(columnar_agent.df), len(row_agent.trips))
+        self.assertEqual(columnar_agent.errors[0], "Row 6: Cost: Invalid cost format (got 'invalid')")
+        # The validation errors after the load error are the same
+        self.assertEqual(columnar_agent.errors[1:], row_agent.errors[1:])
+        self.assertIn("Date sequence is not in chronological order.", columnar_agent.errors)
+
+    def test_invalid_dates_are_reported_like_row_agent(self):
+        row_agent, columnar_agent = self.validate_both(
+            "Day,Date,Activity,Cost\n1,July 20 2025,A,$1\n1,\"July 20, 2025\",B,$1\n2,\"July 21, 2025\",C,$1\n"
+        )
+        self.assertEqual(columnar_agent.errors, row_agent.errors)
+
+    def test_generated_csv_travel_column_is_accepted(self):
+        agent = ColumnarBudgetAgent(
+            "Day,Date,Activity,Description,Location,Cost,Travel Distance to Location\n1,2024-01-01,Museum,,Vatican,$20,1.5\n"
+        )
+        agent.load_data()
+        self.assertEqual(agent.errors, [])
+        self.assertEqual(agent.df[Trip.model_fields['travel_distance_to_next_location'].alias].tolist(), [1.5])
+
+    def test_dataframe_source_is_not_modified(self):
+        df = pd.read_csv(io.StringIO(self.invalid_csv), dtype=object)
+        before = df.copy()
+        ColumnarBudgetAgent(df).load_data()
+        pd.testing.assert_frame_equal(df, before)
+
+    def test_category_and_running_totals(self):
+        agent = ColumnarBudgetAgent(self.report_csv)
+        agent.load_data()
+        agent.validate_data()
+        report = agent.get_report()
+        self.assertEqual(report["days"][1]["total_cost"], 1090.0)
+        self.assertEqual(report["category_totals"],
+                         {"Food": 40.0, "Lodging": 0.0, "Other": 10.0, "Sightseeing": 75.0, "Transport": 1050.0})
+        self.assertEqual(report["running_totals"], {1: 1090.0, 2: 1165.0, 3: 1175.0})
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
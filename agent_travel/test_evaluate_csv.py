@@ -0,0 +1,44 @@
+import unittest
+import unittest.mock
+import evaluate_csv
+from evaluate_csv import evaluate_csv_itinerary
+
+HEADER = "Day,Date,Activity,Description,Location,Cost,Travel Distance to Next Location\n"
+
+
+class TestEvaluateCsv(unittest.TestCase):
+
+    def test_plain_costs_skip_model_validation(self):
+        csv_data = HEADER + (
+            'Day 1,"July 17, 2025",Explore City,Walking tour,,50,\n'
+            'Day 1,"July 17, 2025",Dinner,Local cuisine,Downtown,12.50,\n'
+            'Day 2,"July 18, 2025",Museum,Exhibits,Museum District,-3,\n'
+        )
+        with unittest.mock.patch.object(evaluate_csv, "ItineraryEntry", wraps=evaluate_csv.ItineraryEntry) as model:
+            results = evaluate_csv_itinerary(csv_data)
+        model.assert_not_called()
+        self.assertEqual(results, {"total_rows": 3, "valid_rows": 3, "invalid_rows": 0, "errors": []})
+
+    def test_other_costs_are_validated_by_the_model(self):
+        csv_data = HEADER + (
+            'Day 1,"July 17, 2025",Explore City,Walking tour,,$50,\n'
+            'Day 1,"July 17, 2025",Dinner,Local cuisine,Downtown,1e2,\n'
+            'Day 2,"July 18, 2025",Museum,Exhibits,Museum District,,\n'
+        )
+        results = evaluate_csv_itinerary(csv_data)
+        self.assertEqual((results["valid_rows"], results["invalid_rows"]), (1, 2))
+        self.assertTrue(results["errors"][0].startswith("Row 2 invalid: "))
+        self.assertTrue(results["errors"][1].startswith("Row 4 invalid: "))
+
+    def test_guardrails_apply_to_fast_path_rows(self):
+        csv_data = HEADER + (
+            'Day 1,"July 17, 2025",Explore City,Walking tour,,50,\n'
+            'Day 3,"July 18, 2025",Museum,Exhibits,Museum District,20,\n'
+            'Day 3,"July 19, 2025",Lunch,Quick bite,Cafe,15,\n'
+        )
+        errors = evaluate_csv_itinerary(csv_data)["errors"]
+        self.assertIn("Row 3: Day sequence error. Expected Day 2 or 1, got Day 3.", errors)
+        self.assertIn("Row 4: Date mismatch for same day. Expected July 18, 2025, got July 19, 2025.", errors)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+import unittest
+import csv
+import json
+import os
+import tempfile
+from gazetteer import Gazetteer, get_default_gazetteer
+
+
+def place(name, **overrides):
+    data = {"name": name, "verified_name": f"{name}, Rome, Italy", "lat": 41.9, "lng": 12.5,
+            "country": "Italy", "region": "Lazio", "confidence": 0.9, "source": "Test"}
+    data.update(overrides)
+    return data
+
+
+class CountingDict(dict):
+    """Counts item reads, i.e. how many names a lookup examined."""
+    reads = 0
+
+    def __getitem__(self, key):
+        self.reads += 1
+        return super().__getitem__(key)
+
+
+class TestGazetteer(unittest.TestCase):
+
+    def setUp(self):
+        self.gazetteer = Gazetteer([
+            place("Trastevere"),
+            place("Wine Bar in Trastevere"),
+            place("Trevi Fountain"),
+            place("Hotel", priority=10),
+            place("Campo de' Fiori Market"),
+        ])
+
+    def test_exact_match_is_case_and_whitespace_insensitive(self):
+        self.assertEqual(self.gazetteer.lookup("  trevi   FOUNTAIN ")["name"], "Trevi Fountain")
+
+    def test_substring_match_prefers_longest_name(self):
+        self.assertEqual(self.gazetteer.lookup("Cozy Wine Bar in Trastevere")["name"], "Wine Bar in Trastevere")
+        self.assertEqual(self.gazetteer.lookup("Dinner in Trastevere")["name"], "Trastevere")
+
+    def test_priority_overrides_length(self):
+        self.assertEqual(self.gazetteer.lookup("Hotel near Trevi Fountain")["name"], "Trevi Fountain")
+        self.assertEqual(self.gazetteer.lookup("Hotel (Your chosen hotel)")["name"], "Hotel")
+
+    def test_token_lookup_ignores_word_order(self):
+        self.assertEqual(self.gazetteer.lookup("Fountain of Trevi")["name"], "Trevi Fountain")
+
+    def test_apostrophes_are_normalized(self):
+        self.assertEqual(self.gazetteer.lookup("Campo de’ Fiori Market")["name"], "Campo de' Fiori Market")
+
+    def test_unknown_location(self):
+        self.assertIsNone(self.gazetteer.lookup("Nowhere in particular"))
+        self.assertIsNone(self.gazetteer.lookup(""))
+
+    def test_load_from_csv(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "places.csv")
+            with open(path, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=list(place("x")))
+                writer.writeheader()
+                writer.writerow(place("Pantheon", lat=41.8986))
+            gazetteer = Gazetteer.from_file(path)
+        self.assertEqual(gazetteer.lookup("Pantheon")["lat"], 41.8986)
+
+    def test_version_changes_with_the_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "places.json")
+            versions = []
+            for lat in (41.9, 41.9, 42.0):
+                with open(path, "w") as f:
+                    json.dump([place("Pantheon", lat=lat)], f)
+                versions.append(Gazetteer.from_file(path).version)
+        self.assertEqual(versions[0], versions[1])
+        self.assertNotEqual(versions[1], versions[2])
+
+    def test_default_gazetteer_covers_rome(self):
+        gazetteer = get_default_gazetteer()
+        self.assertEqual(gazetteer.lookup("Colosseum & Roman Forum")["verified_name"], "Colosseum, Rome, Italy")
+        self.assertEqual(gazetteer.lookup("Trattoria Monti")["verified_name"], "Trattoria Monti, Rome, Italy")
+
+    def test_lookup_cost_does_not_grow_with_gazetteer_size(self):
+        large = Gazetteer([place(f"Point of Interest {i:05d}") for i in range(20000)] + [place("Trevi Fountain")])
+        large._name_tokens = CountingDict(large._name_tokens)
+        self.assertEqual(large.lookup("Gelato near the Trevi Fountain")["name"], "Trevi Fountain")
+        self.assertEqual(large.lookup("Interest of Point 01234")["name"], "Point of Interest 01234")
+        # Only names posted under one of the query's tokens are examined, never all 20,001
+        self.assertEqual(large._name_tokens.reads, 1)
+
+if __name__ == '__main__':
+    unittest.main()
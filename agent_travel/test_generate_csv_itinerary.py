@@ -4,7 +4,11 @@ import sys
 import os
 import io
 from unittest.mock import patch, mock_open
-from generate_csv_itinerary import parse_itinerary_content, generate_csv_from_itinerary_entries, ItineraryEntry
+from generate_csv_itinerary import (
+    parse_itinerary_content, generate_csv_from_itinerary_entries, ItineraryEntry,
+    iter_itinerary_entries, iter_itinerary_rows, stream_csv_itinerary, write_csv, ItineraryRow
+)
+import generate_csv_itinerary
 
 class TestGenerateCsvItinerary(unittest.TestCase):
 
@@ -207,4 +211,91 @@ Day 1,"July 20, 2025",Roman Forum & Palatine Hill,Explore the ancient ruins,Roma
         parsed_entries = parse_itinerary_content(itinerary_content)
         self.assertEqual(len(parsed_entries), 1)
         self.assertEqual(parsed_entries[0].cost, 1234.56)
-        self.assertEqual(mock_stderr.getvalue(), "")
\ No newline at end of file
+        self.assertEqual(mock_stderr.getvalue(), "")
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_parse_line_outside_grammar_extracts_fields_individually(self, mock_stderr, mock_stdout):
+        itinerary_content = "**Day 1: July 20, 2025:**\n* Dinner (Pizza) then drinks (Late) @ Bar $20"
+        parsed_entries = parse_itinerary_content(itinerary_content)
+        self.assertEqual(len(parsed_entries), 1)
+        self.assertEqual(parsed_entries[0], ItineraryEntry(day='Day 1', date='July 20, 2025', activity='Dinner then drinks', description='Pizza; Late', location='Bar', cost=20.0, travel_distance_to_location=None))
+        self.assertIn("Activity line outside the expected format", mock_stderr.getvalue())
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_parse_description_after_location(self, mock_stderr, mock_stdout):
+        itinerary_content = "**Day 1: July 20, 2025:**\n* Colosseum Tour @ Colosseum (Guided tour) $75.00"
+        parsed_entries = parse_itinerary_content(itinerary_content)
+        self.assertEqual(len(parsed_entries), 1)
+        self.assertEqual(parsed_entries[0], ItineraryEntry(day='Day 1', date='July 20, 2025', activity='Colosseum Tour', description='Guided tour', location='Colosseum', cost=75.00, travel_distance_to_location=None))
+
+    @patch('sys.stdout', new_callable=io.StringIO)
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_parse_cost_range_keeps_lower_bound(self, mock_stderr, mock_stdout):
+        itinerary_content = "**Day 1: July 20, 2025:**\n* Cooking Class @ Trastevere $20-30\n* Wine Tasting @ Monti $40 - $55 (15 min)"
+        parsed_entries = parse_itinerary_content(itinerary_content)
+        self.assertEqual([entry.cost for entry in parsed_entries], [20.0, 40.0])
+        self.assertEqual([entry.location for entry in parsed_entries], ['Trastevere', 'Monti'])
+        self.assertEqual(parsed_entries[1].travel_distance_to_location, 15.0)
+        self.assertEqual(mock_stderr.getvalue(), "")
+
+class TestStreamingCsvItinerary(unittest.TestCase):
+
+    itinerary_content = (
+        "**Day 1: Jan 01, 2025:**\n"
+        "* Activity A (Desc A) @ Loc A $10.00 (1.0)\n"
+        "* Activity B (Desc B) @ Loc B $20.00\n"
+        "**Day 2: Jan 02, 2025:**\n"
+        "* Activity C @ Loc C $30.00 (2.0)\n"
+        "* Activity D"
+    )
+
+    def chunks(self, size):
+        return [self.itinerary_content[i:i + size] for i in range(0, len(self.itinerary_content), size)]
+
+    def test_chunked_input_matches_whole_text(self):
+        expected = parse_itinerary_content(self.itinerary_content)
+        for size in (1, 3, 7, 1000):
+            self.assertEqual(list(iter_itinerary_entries(self.chunks(size))), expected)
+
+    def test_rows_are_available_before_the_stream_ends(self):
+        consumed = []
+
+        def stream():
+            for chunk in self.chunks(5):
+                consumed.append(chunk)
+                yield chunk
+
+        lines = stream_csv_itinerary(stream())
+        self.assertEqual(next(lines), "Day,Date,Activity,Description,Location,Cost,Travel Distance to Location\n")
+        self.assertEqual(next(lines), 'Day 1,"Jan 01, 2025",Activity A,Desc A,Loc A,10.00,1.0\n')
+        self.assertLess(len("".join(consumed)), len(self.itinerary_content) // 2)
+        rest = "".join(lines)
+        self.assertEqual(rest.count("\n"), 3)
+
+    def test_write_csv_to_file_handle_matches_string_output(self):
+        entries = parse_itinerary_content(self.itinerary_content)
+        output = io.StringIO()
+        self.assertEqual(write_csv(iter(entries), output), 4)
+        self.assertEqual(output.getvalue(), generate_csv_from_itinerary_entries(entries))
+
+    def test_plain_rows_are_not_validated_one_by_one(self):
+        with patch.object(generate_csv_itinerary, "ItineraryEntry", wraps=ItineraryEntry) as model:
+            rows = list(iter_itinerary_rows([self.itinerary_content]))
+        model.assert_not_called()
+        self.assertTrue(all(isinstance(row, ItineraryRow) for row in rows))
+        self.assertEqual([row.to_entry() for row in rows], parse_itinerary_content(self.itinerary_content))
+
+    @patch('sys.stderr', new_callable=io.StringIO)
+    def test_rows_needing_validators_still_go_through_the_model(self, mock_stderr):
+        content = "**Day 1: July 20, 2025:**\n* Activity $12.5.0 (1 hour travel time)\n* Other $abc"
+        rows = list(iter_itinerary_rows([content]))
+        self.assertEqual(rows[0].cost, None)
+        self.assertIn("cost: Invalid cost format", rows[0].description)
+        self.assertIn("cost: Invalid cost format", rows[1].description)
+        content = "**Day 1: July 20, 2025:**\n* Activity (1 hour travel time)"
+        self.assertEqual(list(iter_itinerary_rows([content]))[0].travel_distance_to_location, 60.0)
+
+if __name__ == '__main__':
+    unittest.main()
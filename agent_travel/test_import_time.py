@@ -0,0 +1,48 @@
+import unittest
+import os
+import subprocess
+import sys
+
+# Budget for importing a module in a fresh interpreter, best of IMPORT_RUNS; importing
+# orchestrator used to take about two seconds, almost all of it in the modules below.
+IMPORT_BUDGET_SECONDS = 1.0
+IMPORT_RUNS = 3
+HEAVY_MODULES = ["pandas", "numpy", "reportlab", "google.generativeai", "streamlit"]
+
+
+def import_times(module):
+    """{module: cumulative import time in seconds} from `python -X importtime -c 'import module'`."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+    )
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    times = {}
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line:
+            _, cumulative, name = line.split("|")
+            if cumulative.strip().isdigit():
+                times[name.strip()] = int(cumulative) / 1e6
+    return times
+
+
+class TestImportTime(unittest.TestCase):
+
+    def assert_fast_import(self, module):
+        runs = [import_times(module) for _ in range(IMPORT_RUNS)]
+        loaded = [name for name in HEAVY_MODULES if name in runs[0]]
+        self.assertEqual(loaded, [], f"{module} imports {loaded} at import time")
+        self.assertLess(min(times[module] for times in runs), IMPORT_BUDGET_SECONDS)
+
+    def test_orchestrator_imports_quickly(self):
+        self.assert_fast_import("orchestrator")
+
+    def test_async_orchestrator_imports_quickly(self):
+        self.assert_fast_import("async_orchestrator")
+
+    def test_evaluate_csv_imports_quickly(self):
+        self.assert_fast_import("evaluate_csv")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,91 @@
+import unittest
+import os
+import tempfile
+import time
+from llm_client import LLMClient
+from tiered_cache import TieredCache
+
+
+class StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """Echoes the prompt back and counts how often it was called."""
+    def __init__(self):
+        self.calls = 0
+
+    def generate_content(self, prompt, stream=False):
+        self.calls += 1
+        text = f"response to: {prompt}"
+        if stream:
+            return [StubResponse(text[i:i + 8]) for i in range(0, len(text), 8)]
+        return StubResponse(text)
+
+
+class TestLLMClient(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "llm_cache.sqlite")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_identical_prompts_hit_memory_cache(self):
+        model = StubModel()
+        client = LLMClient(model=model)
+        self.assertEqual(client.generate("details Day 2"), "response to: details Day 2")
+        self.assertEqual(client.generate("details Day 2"), "response to: details Day 2")
+        self.assertEqual(model.calls, 1)
+
+        stats = client.stats()
+        self.assertEqual(stats["model_calls"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+    def test_disk_tier_survives_new_client(self):
+        first_model = StubModel()
+        LLMClient(model=first_model, cache=TieredCache(db_path=self.db_path)).generate("trip title")
+
+        second_model = StubModel()
+        client = LLMClient(model=second_model, cache=TieredCache(db_path=self.db_path))
+        self.assertEqual(client.generate("trip title"), "response to: trip title")
+        self.assertEqual(second_model.calls, 0)
+        self.assertEqual(client.stats()["disk_hits"], 1)
+
+    def test_stream_yields_chunks_and_caches_full_text(self):
+        model = StubModel()
+        client = LLMClient(model=model)
+        self.assertEqual(list(client.stream("a b")), ["response", " to: a b"])
+        self.assertEqual(client.generate("a b"), "response to: a b")
+        self.assertEqual(list(client.stream("a b")), ["response to: a b"])
+        self.assertEqual(model.calls, 1)
+
+    def test_cache_key_includes_model_name(self):
+        cache = TieredCache()
+        model = StubModel()
+        LLMClient(model=model, model_name="a", cache=cache).generate("prompt")
+        LLMClient(model=model, model_name="b", cache=cache).generate("prompt")
+        self.assertEqual(model.calls, 2)
+
+    def test_expired_entries_are_not_returned(self):
+        cache = TieredCache(db_path=self.db_path, ttl_seconds=0.01)
+        cache.set("key", "value")
+        time.sleep(0.02)
+        self.assertIsNone(cache.get("key"))
+
+    def test_size_based_eviction(self):
+        cache = TieredCache(db_path=self.db_path, max_memory_entries=2, max_disk_entries=3)
+        for i in range(5):
+            cache.set(f"key{i}", f"value{i}")
+        stats = cache.stats()
+        self.assertEqual(stats["memory_entries"], 2)
+        self.assertEqual(stats["disk_entries"], 3)
+        self.assertIsNone(cache.get("key0"))
+        self.assertEqual(cache.get("key4"), "value4")
+
+if __name__ == '__main__':
+    unittest.main()
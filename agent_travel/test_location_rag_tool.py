@@ -0,0 +1,262 @@
+import unittest
+import unittest.mock
+import json
+import os
+import tempfile
+import threading
+import time
+import math
+import numpy as np
+import pandas as pd
+from gazetteer import Gazetteer
+from geocode_cache import GeocodeCache
+from location_rag_tool import (
+    GEOCODE_RATE_LIMIT_BURST, GEOCODE_RATE_LIMIT_SECONDS, LocationRAG, TokenBucket, get_geocode_rate_limiter,
+    haversine_miles, consecutive_distances, distance_matrix,
+)
+
+
+def scalar_haversine_miles(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = math.sin((lat2 - lat1) / 2)**2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2)**2
+    return 6371 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a)) * 0.621371
+
+
+class TestDistances(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.lats = rng.uniform(-80, 80, 50)
+        self.lons = rng.uniform(-180, 180, 50)
+
+    def test_vectorized_matches_scalar_formula(self):
+        expected = [scalar_haversine_miles(self.lats[i], self.lons[i], self.lats[i + 1], self.lons[i + 1]) for i in range(49)]
+        np.testing.assert_allclose(haversine_miles(self.lats[:-1], self.lons[:-1], self.lats[1:], self.lons[1:]), expected)
+
+    def test_consecutive_distances_leave_last_leg_and_unknown_ends_empty(self):
+        lats, lons = self.lats[:4].copy(), self.lons[:4].copy()
+        lats[2] = lons[2] = np.nan
+        distances = consecutive_distances(lats, lons)
+        self.assertAlmostEqual(distances[0], scalar_haversine_miles(lats[0], lons[0], lats[1], lons[1]))
+        self.assertTrue(np.isnan(distances[1:]).all())
+
+    def test_distance_matrix_agrees_with_consecutive_legs(self):
+        matrix = distance_matrix(self.lats, self.lons)
+        self.assertEqual(matrix.shape, (50, 50))
+        np.testing.assert_allclose(matrix, matrix.T)
+        np.testing.assert_allclose(np.diag(matrix), 0, atol=1e-9)
+        np.testing.assert_allclose(np.diagonal(matrix, offset=1), consecutive_distances(self.lats, self.lons)[:-1])
+
+
+class TestProcessItineraryLocations(unittest.TestCase):
+
+    def test_distances_are_merged_into_dataframe(self):
+        rag = LocationRAG(cache=GeocodeCache())
+        rag.rate_limit_delay = 0
+        rag.simulated_latency = 0
+        df = pd.DataFrame({"Location": ["Colosseum", "Pantheon", "Nowhere in particular", "Trevi Fountain", ""]})
+        df = rag.process_itinerary_locations(df, include_matrix=True)
+
+        distances = df["Calculated_Travel_Distance_Miles"]
+        self.assertAlmostEqual(distances[0], round(scalar_haversine_miles(41.8902, 12.4922, 41.8986, 12.4769), 2))
+        self.assertTrue(distances[1:].isna().all())
+        matrix = df.attrs["distance_matrix"]
+        self.assertEqual(matrix.shape, (5, 5))
+        self.assertAlmostEqual(matrix[0, 3], scalar_haversine_miles(41.8902, 12.4922, 41.9009, 12.4833))
+        self.assertTrue(np.isnan(matrix[2]).all())
+
+class FakeGeocoder:
+    """Answers every location after a fixed latency and records the calls it received."""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, location_string):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.latency)
+        with self._lock:
+            self.in_flight -= 1
+            self.calls.append(location_string)
+        if "nowhere" in location_string.lower():
+            return None
+        return {"verified_name": location_string.strip().title(), "lat": 41.9, "lng": 12.5, "country": "Italy",
+                "region": "Lazio", "confidence": 0.9, "source": "Fake"}
+
+
+class FakeClock:
+    """Stands in for the time module: sleep() advances monotonic() instantly."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestBatchGeocoding(unittest.TestCase):
+
+    def make_rag(self, latency=0.05, rate_limit_delay=0, max_workers=8):
+        geocoder = FakeGeocoder(latency)
+        rag = LocationRAG(cache=GeocodeCache(), geocoder=geocoder, max_workers=max_workers)
+        rag.rate_limit_delay = rate_limit_delay
+        return rag, geocoder
+
+    def test_results_keep_input_order_and_duplicates_are_looked_up_once(self):
+        rag, geocoder = self.make_rag()
+        inputs = ["Colosseum", "Pantheon", " colosseum", "Nowhere", "COLOSSEUM", "Pantheon"]
+        results = rag.verify_locations(inputs)
+        self.assertEqual([r.original_input for r in results], inputs)
+        self.assertEqual([r.verified_name for r in results],
+                         ["Colosseum", "Pantheon", "Colosseum", "Unverified/Ambiguous", "Colosseum", "Pantheon"])
+        self.assertEqual(sorted(geocoder.calls), ["Colosseum", "Nowhere", "Pantheon"])
+
+    def test_batch_runs_lookups_concurrently(self):
+        locations = [f"Place {i}" for i in range(16)]
+        serial_rag, serial_geocoder = self.make_rag()
+        serial = [serial_rag.verify_location(location) for location in locations]
+
+        batch_rag, batch_geocoder = self.make_rag(max_workers=4)
+        batch = batch_rag.verify_locations(locations)
+
+        self.assertEqual([r.verified_name for r in batch], [r.verified_name for r in serial])
+        self.assertEqual(serial_geocoder.max_in_flight, 1)
+        self.assertGreater(batch_geocoder.max_in_flight, 1)
+        self.assertLessEqual(batch_geocoder.max_in_flight, 4)
+
+    def test_default_limiter_lets_a_batch_overlap_slow_lookups(self):
+        # A fresh bucket as the shared one starts, so earlier tests have not spent its burst
+        limiter = TokenBucket(interval=GEOCODE_RATE_LIMIT_SECONDS, capacity=GEOCODE_RATE_LIMIT_BURST)
+        geocoder = FakeGeocoder(latency=GEOCODE_RATE_LIMIT_SECONDS)
+        with unittest.mock.patch("location_rag_tool.get_geocode_rate_limiter", return_value=limiter):
+            rag = LocationRAG(cache=GeocodeCache(), geocoder=geocoder)
+        rag.verify_locations([f"Place {i}" for i in range(10)])
+        # Serial calls would never overlap; the whole burst is in flight at once
+        self.assertEqual(geocoder.max_in_flight, min(GEOCODE_RATE_LIMIT_BURST, rag.max_workers))
+
+    def test_rate_limit_is_honored(self):
+        rag, _ = self.make_rag(latency=0, rate_limit_delay=0.02, max_workers=1)
+        start = time.perf_counter()
+        rag.verify_locations([f"Place {i}" for i in range(6)])
+        # One token is available up front, the remaining five calls wait for refills
+        self.assertGreaterEqual(time.perf_counter() - start, 5 * 0.02 * 0.9)
+
+    def test_rate_limit_is_shared_by_every_instance(self):
+        limiter = get_geocode_rate_limiter()
+        first = LocationRAG(cache=GeocodeCache(), geocoder=FakeGeocoder(0))
+        second = LocationRAG(cache=GeocodeCache(), geocoder=FakeGeocoder(0))
+        self.assertIs(first.rate_limiter, limiter)
+        self.assertIs(second.rate_limiter, limiter)
+
+        with unittest.mock.patch.object(limiter, "interval", 0.02):
+            start = time.perf_counter()
+            threads = [threading.Thread(target=rag.verify_locations, args=([f"{name} {i}" for i in range(5)],))
+                       for rag, name in [(first, "First"), (second, "Second")]]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            # Ten calls from two instances draw on one burst, so at least the last two wait for refills
+            self.assertGreaterEqual(time.perf_counter() - start, (10 - GEOCODE_RATE_LIMIT_BURST) * 0.02 * 0.9)
+
+    def test_token_bucket_allows_bursts_up_to_capacity(self):
+        clock = FakeClock()
+        with unittest.mock.patch("location_rag_tool.time", clock):
+            bucket = TokenBucket(interval=0.05, capacity=3)
+            for _ in range(3):
+                bucket.acquire()
+            self.assertEqual(clock.now, 0)
+            bucket.acquire()
+            self.assertAlmostEqual(clock.now, 0.05)
+
+class TestGeocodeCache(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "geocode_cache.sqlite")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_rag(self, cache):
+        rag = LocationRAG(cache=cache)
+        rag.rate_limit_delay = 0
+        rag.simulated_latency = 0
+        rag._call_geocoding_api = unittest.mock.Mock(wraps=rag._call_geocoding_api)
+        return rag
+
+    def test_cache_is_shared_between_instances_and_persisted(self):
+        first = self.make_rag(GeocodeCache(db_path=self.db_path))
+        first.verify_location("Colosseum")
+        second = self.make_rag(GeocodeCache(db_path=self.db_path))
+        verified = second.verify_location("  colosseum ")
+        self.assertEqual(verified.verified_name, "Colosseum, Rome, Italy")
+        self.assertEqual(verified.original_input, "  colosseum ")
+        second._call_geocoding_api.assert_not_called()
+
+    def test_unverified_results_are_negatively_cached(self):
+        cache = GeocodeCache()
+        rag = self.make_rag(cache)
+        for _ in range(3):
+            self.assertEqual(rag.verify_location("Nowhere in particular").verified_name, "Unverified/Ambiguous")
+        self.assertEqual(rag._call_geocoding_api.call_count, 1)
+        stats = cache.stats()
+        self.assertEqual(stats["negative_hits"], 2)
+        self.assertAlmostEqual(stats["hit_rate"], 2 / 3)
+
+    def test_negative_hits_from_concurrent_lookups_are_all_counted(self):
+        cache = GeocodeCache()
+        cache.store("Nowhere", None)
+        threads = [threading.Thread(target=lambda: [cache.lookup("Nowhere") for _ in range(500)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(cache.stats()["negative_hits"], 8 * 500)
+
+    def test_negative_entries_expire_on_their_own_ttl(self):
+        cache = GeocodeCache(negative_ttl_seconds=0.01)
+        cache.store("Nowhere", None)
+        cache.store("Colosseum", {"verified_name": "Colosseum"})
+        time.sleep(0.02)
+        self.assertEqual(cache.lookup("Nowhere"), (False, None))
+        self.assertEqual(cache.lookup("Colosseum"), (True, {"verified_name": "Colosseum"}))
+
+    def test_warm_from_file(self):
+        warm_path = os.path.join(self.temp_dir.name, "warm.json")
+        with open(warm_path, "w") as f:
+            json.dump({"Secret Garden": {"verified_name": "Secret Garden, Rome, Italy", "lat": 41.9, "lng": 12.5,
+                                         "country": "Italy", "region": "Lazio", "confidence": 0.9, "source": "Warm-up"},
+                       "Unknown Spot": None}, f)
+        rag = self.make_rag(GeocodeCache(db_path=self.db_path))
+        self.assertEqual(GeocodeCache(db_path=self.db_path).warm_from_file(warm_path, version=rag.cache_version), 2)
+
+        self.assertEqual(rag.verify_location("Secret Garden").api_source, "Warm-up")
+        self.assertEqual(rag.verify_location("Unknown Spot").verified_name, "Unverified/Ambiguous")
+        rag._call_geocoding_api.assert_not_called()
+
+    def test_editing_the_gazetteer_invalidates_cached_results(self):
+        def gazetteer(lat):
+            return Gazetteer([{"name": "Secret Garden", "verified_name": "Secret Garden, Rome, Italy", "lat": lat, "lng": 12.5,
+                               "country": "Italy", "region": "Lazio", "confidence": 0.9, "source": "Gazetteer"}])
+
+        def make_rag(lat):
+            rag = LocationRAG(cache=GeocodeCache(db_path=self.db_path), gazetteer=gazetteer(lat))
+            rag.rate_limit_delay = 0
+            rag.simulated_latency = 0
+            return rag
+
+        self.assertEqual(make_rag(41.9).verify_location("Secret Garden").coordinates, (41.9, 12.5))
+        self.assertEqual(make_rag(41.9).cache_version, make_rag(41.9).cache_version)
+        self.assertEqual(make_rag(42.0).verify_location("Secret Garden").coordinates, (42.0, 12.5))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+import unittest.mock
+import os
+import tempfile
+import llm_client
+from geocode_cache import GeocodeCache
+from llm_client import LLMClient
+from trip_store import SQLiteTripStore
+from orchestrator import Orchestrator
+from test_llm_client import StubModel
+
+
+class TestOrchestrator(unittest.TestCase):
+
+    def setUp(self):
+        self.model = StubModel()
+        llm_client.set_client(LLMClient(model=self.model))
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trip_store = SQLiteTripStore(os.path.join(self.temp_dir.name, "trips.db"))
+        self.orchestrator = Orchestrator(trip_store=self.trip_store)
+        self.state = self.orchestrator.get_default_state()
+        self.state["current_phase"] = "ITINERARY"
+        self.state["plan"]["destination"] = "Rome"
+
+    def tearDown(self):
+        llm_client.set_client(None)
+        self.temp_dir.cleanup()
+
+    def test_stream_user_input_appends_full_response_after_streaming(self):
+        state, chunks = self.orchestrator.stream_user_input("details Day 2", self.state)
+        self.assertEqual(state["conversation_history"][-1], {"role": "user", "content": "details Day 2"})
+
+        streamed = list(chunks)
+        self.assertGreater(len(streamed), 1)
+        self.assertEqual(state["conversation_history"][-1], {"role": "assistant", "content": "".join(streamed)})
+        self.assertTrue("".join(streamed).startswith("response to: Provide practical details for 'Day 2'"))
+
+    def test_process_user_input_matches_streamed_result(self):
+        state = self.orchestrator.process_user_input("find airbnb", self.state)
+        self.assertEqual(state["conversation_history"][-1]["role"], "assistant")
+        self.assertIn("Airbnb locations in Rome", state["conversation_history"][-1]["content"])
+        self.assertEqual(self.model.calls, 0)
+
+    def test_validate_csv_itinerary_runs_in_memory(self):
+        csv_data = (
+            "Day,Date,Activity,Description,Location,Cost,Travel Distance to Location\n"
+            "1,2025-07-20,Colosseum Tour,Guided tour,Colosseum,$75.00,1.2\n"
+            "1,2025-07-20,Lunch,,Trattoria Monti,$40.00,\n"
+            "2,2025-07-21,Vatican Museums,,Vatican Museums,$30.00,\n"
+        )
+        with unittest.mock.patch("location_rag_tool.get_geocode_cache", return_value=GeocodeCache()), \
+                unittest.mock.patch("tempfile.NamedTemporaryFile", side_effect=AssertionError("wrote a temp file")):
+            summary = self.orchestrator.validate_csv_itinerary(csv_data)
+        self.assertNotIn("errors", summary)
+        self.assertEqual(summary[1]["total_cost"], 115.0)
+        self.assertEqual(summary[2]["activities"], ["Vatican Museums: $30.0"])
+
+    def test_artifacts_are_built_once_per_itinerary(self):
+        self.state["conversation_history"].append(
+            {"role": "assistant", "content": "**Day 1: July 20, 2025:**\n* Colosseum Tour @ Colosseum $75.00"}
+        )
+        with unittest.mock.patch.object(self.orchestrator, "_build_pdf", wraps=self.orchestrator._build_pdf) as build_pdf:
+            pdf = self.orchestrator.generate_pdf_itinerary(self.state)
+            self.assertTrue(pdf.startswith(b"%PDF"))
+            self.assertEqual(self.orchestrator.generate_pdf_itinerary(self.state.to_dict()), pdf)
+            # Conversation outside the itinerary does not invalidate the artifact
+            self.state["conversation_history"].append({"role": "user", "content": "thanks!"})
+            self.orchestrator.generate_pdf_itinerary(self.state)
+            self.assertEqual(build_pdf.call_count, 1)
+
+            self.state.set_itinerary("**Day 1: July 21, 2025:**\n* Pantheon @ Pantheon $0.00")
+            self.orchestrator.generate_pdf_itinerary(self.state)
+            self.assertEqual(build_pdf.call_count, 2)
+
+        csv_data = self.orchestrator.generate_csv_itinerary(self.state)
+        self.assertIn("Pantheon", csv_data)
+        self.assertIs(self.orchestrator.generate_csv_itinerary(self.state), csv_data)
+
+    def test_itinerary_is_parsed_once_on_arrival(self):
+        itinerary = ["**Day 1: July 20, 2025:**\n", "* Colosseum Tour @ Colosseum $75.00 (1.2)\n",
+                     "* Lunch @ Trattoria Monti $40.00\n", "**Day 2: July 21, 2025:**\n",
+                     "* Vatican Museums @ Vatican Museums $30.00"]
+        with unittest.mock.patch("orchestrator.stream_gemini", return_value=iter(itinerary)):
+            state = self.orchestrator.process_user_input("details Day 1", self.state)
+        self.assertEqual([entry.activity for entry in state.itinerary_entries],
+                         ["Colosseum Tour", "Lunch", "Vatican Museums"])
+
+        with unittest.mock.patch("generate_csv_itinerary.iter_itinerary_rows", side_effect=AssertionError("parsed again")), \
+                unittest.mock.patch("session_state.iter_itinerary_rows", side_effect=AssertionError("parsed again")), \
+                unittest.mock.patch("location_rag_tool.get_geocode_cache", return_value=GeocodeCache()):
+            csv_data = self.orchestrator.generate_csv_itinerary(state)
+            summary = self.orchestrator.validate_itinerary(state)
+            with unittest.mock.patch("location_rag_tool.process_itinerary", side_effect=AssertionError("validated again")):
+                self.assertIs(self.orchestrator.validate_itinerary(state), summary)
+            self.assertEqual(self.orchestrator.validate_csv_itinerary(csv_data), summary)
+        self.assertEqual(summary[1]["total_cost"], 115.0)
+        self.assertEqual(state.verified_locations[0]["verified_name"], "Colosseum, Rome, Italy")
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+from plan_extractor import extract_budget, extract_destination, extract_duration, extract_month, extract_plan
+
+
+class TestExtractPlan(unittest.TestCase):
+
+    def test_well_formed_request_fills_every_field(self):
+        plan = extract_plan("Plan a 7-day trip to Kyoto in April for a couple interested in history and food, budget $3,000.")
+        self.assertEqual(plan, {
+            "destination": "Kyoto", "duration": 7, "month": "April", "traveler_type": "couple",
+            "interests": ["history", "food"], "budget": 3000,
+        })
+
+    def test_missing_fields_are_left_out(self):
+        self.assertEqual(extract_plan("Somewhere warm with the kids"), {"traveler_type": "family"})
+
+    def test_budget(self):
+        self.assertEqual(extract_budget("about $2000 total"), 2000)
+        self.assertEqual(extract_budget("we have 4,500 euros"), 4500)
+        self.assertEqual(extract_budget("a 2k budget"), 2000)
+        self.assertEqual(extract_budget("budget: 1500.50"), 1500.5)
+        self.assertIsNone(extract_budget("hotels at $150/night, food $40 a day"))
+        self.assertIsNone(extract_budget("a 7-day trip"))
+
+    def test_duration(self):
+        self.assertEqual(extract_duration("a 5 day trip"), 5)
+        self.assertEqual(extract_duration("five nights"), 5)
+        self.assertEqual(extract_duration("two weeks"), 14)
+        self.assertEqual(extract_duration("a week"), 7)
+        self.assertEqual(extract_duration("a long weekend"), 3)
+        self.assertIsNone(extract_duration("$100 a day"))
+        self.assertEqual(extract_duration("I can spend $100 a day on a 5-day trip to Rome in June"), 5)
+
+    def test_month(self):
+        self.assertEqual(extract_month("in september"), "September")
+        self.assertEqual(extract_month("in May"), "May")
+        self.assertIsNone(extract_month("we may travel"))
+
+    def test_destination(self):
+        self.assertEqual(extract_destination("a week in new york city"), "New York City")
+        self.assertEqual(extract_destination("a trip to Ljubljana in October"), "Ljubljana")
+        self.assertIsNone(extract_destination("travel in October"))
+        self.assertIsNone(extract_destination("for a couple interested in Art, budget $1,500"))
+        self.assertIsNone(extract_destination("interested in Beaches"))
+        self.assertIsNone(extract_destination("a 5-day getaway in Spring"))
+        self.assertIsNone(extract_destination("a trip to Museums and Nightlife"))
+        self.assertNotIn("destination", extract_plan("A 5-day trip for a couple interested in Art, budget $1,500"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import unittest.mock
+import os
+import tempfile
+import session_state
+from session_state import SessionState
+from orchestrator import Orchestrator
+from trip_store import SQLiteTripStore
+
+ITINERARY = "**Day 1: July 20, 2025:**\n* Colosseum Tour @ Colosseum $75.00 (2.5)\n* Lunch @ Trattoria Monti $25.00"
+
+
+class TestSessionState(unittest.TestCase):
+
+    def test_dict_style_access(self):
+        state = SessionState()
+        state["current_phase"] = "ITINERARY"
+        state["plan"]["destination"] = "Rome"
+        self.assertEqual(state.current_phase, "ITINERARY")
+        self.assertEqual(state.get("plan")["destination"], "Rome")
+        self.assertIsNone(state.get("missing"))
+        self.assertIn("suggested_title", state)
+        with self.assertRaises(KeyError):
+            state["missing"]
+
+    def test_itinerary_is_found_once_and_kept(self):
+        state = SessionState()
+        state.add_message("user", "Plan a trip to Rome")
+        self.assertIsNone(state.current_itinerary())
+        state["conversation_history"].append({"role": "assistant", "content": ITINERARY})
+        state.add_message("assistant", "**Day 1: details** of the Colosseum")
+        self.assertEqual(state.current_itinerary(), ITINERARY)
+        self.assertEqual(state.itinerary, ITINERARY)
+
+    def test_only_new_messages_are_scanned(self):
+        state = SessionState()
+        for i in range(5):
+            state.add_message("assistant", f"message {i}")
+        state.current_itinerary()
+        with unittest.mock.patch.object(session_state, "ITINERARY_MARKER", "message"):
+            state.add_message("assistant", "message 5")
+            self.assertEqual(state.current_itinerary(), "message 5")
+
+    def test_itinerary_is_parsed_when_found(self):
+        state = SessionState()
+        state.add_message("assistant", ITINERARY)
+        with unittest.mock.patch.object(session_state, "iter_itinerary_rows", wraps=session_state.iter_itinerary_rows) as parse:
+            entries = state.current_entries()
+            self.assertIs(state.current_entries(), entries)
+            self.assertEqual(parse.call_count, 1)
+        self.assertEqual([entry.cost for entry in entries], [75.0, 25.0])
+        state.itinerary_validation = {"errors": ["stale"]}
+        state.set_itinerary("**Day 1: July 21, 2025:**\n* Pantheon @ Pantheon $0.00")
+        self.assertEqual([entry.activity for entry in state.current_entries()], ["Pantheon"])
+        self.assertIsNone(state.itinerary_validation)
+
+    def test_saved_trip_round_trip(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            orchestrator = Orchestrator(trip_store=SQLiteTripStore(os.path.join(temp_dir, "trips.db")))
+            state = orchestrator.get_default_state()
+            state.add_message("assistant", ITINERARY)
+            state["suggested_title"] = "Roman Holiday"
+            state.current_itinerary()
+            orchestrator.save_current_trip("", state)
+
+            loaded = orchestrator.load_saved_trip("Roman Holiday", orchestrator.get_default_state())
+            self.assertIsInstance(loaded, SessionState)
+            self.assertEqual(loaded.itinerary, ITINERARY)
+            # Saved before the "Trip saved" confirmation was appended
+            self.assertEqual(loaded.conversation_history, state.conversation_history[:-1])
+            self.assertEqual(loaded.suggested_title, "Roman Holiday")
+            self.assertEqual(loaded.itinerary_entries, state.itinerary_entries)
+
+    def test_unknown_keys_survive_loading(self):
+        state = SessionState.from_dict({"current_phase": "BUDGET", "plan": {}, "conversation_history": [], "notes": "x"})
+        self.assertEqual(state["notes"], "x")
+        self.assertEqual(state.to_dict()["notes"], "x")
+
+if __name__ == '__main__':
+    unittest.main()
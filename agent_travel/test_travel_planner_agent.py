@@ -0,0 +1,65 @@
+import unittest
+import json
+import llm_client
+from llm_client import LLMClient
+from session_state import default_plan
+from test_llm_client import StubResponse
+from travel_planner_agent import TravelPlannerAgent
+
+
+class ExtractionModel:
+    """Answers plan extraction prompts with a fixed plan and records them."""
+    def __init__(self):
+        self.prompts = []
+
+    def generate_content(self, prompt):
+        self.prompts.append(prompt)
+        return StubResponse(json.dumps({
+            "destination": "Paris", "duration": 4, "month": "June", "traveler_type": "solo",
+            "interests": ["art"], "budget": 1500
+        }))
+
+
+class TestTravelPlannerAgent(unittest.TestCase):
+
+    def setUp(self):
+        self.model = ExtractionModel()
+        llm_client.set_client(LLMClient(model=self.model))
+        self.agent = TravelPlannerAgent()
+
+    def tearDown(self):
+        llm_client.set_client(None)
+
+    def test_well_formed_request_skips_the_llm(self):
+        plan = default_plan()
+        self.agent.parse_with_llm("A 3-day trip to Rome in July for a couple into history, budget $2000", plan)
+        self.assertEqual(self.model.prompts, [])
+        self.assertEqual(plan["destination"], "Rome")
+        self.assertEqual(self.agent.check_missing_info(plan), [])
+
+    def test_llm_only_fills_the_missing_fields(self):
+        plan = default_plan()
+        self.agent.parse_with_llm("A 3-day trip to Rome in July for a couple", plan)
+        self.assertEqual(len(self.model.prompts), 1)
+        self.assertIn("'interests', 'budget'", self.model.prompts[0])
+        self.assertNotIn("'destination'", self.model.prompts[0])
+        self.assertEqual((plan["destination"], plan["interests"], plan["budget"]), ("Rome", ["art"], 1500))
+
+    def test_follow_up_answer_completes_the_plan_without_the_llm(self):
+        plan = default_plan()
+        plan.update({"destination": "Rome", "duration": 3, "month": "July", "traveler_type": "couple"})
+        self.agent.parse_with_llm("We love food, and our budget is 2500 dollars", plan)
+        self.assertEqual(self.model.prompts, [])
+        self.assertEqual((plan["interests"], plan["budget"]), (["food"], 2500))
+
+    def test_extraction_stats(self):
+        self.agent.parse_with_llm("A 3-day trip to Rome in July for a couple into history, budget $2000", default_plan())
+        self.agent.parse_with_llm("Somewhere sunny", default_plan())
+        stats = self.agent.extraction_stats()
+        self.assertEqual((stats["messages"], stats["llm_fallbacks"], stats["fallback_rate"]), (2, 1, 0.5))
+        self.assertEqual(stats["fields_from_rules"]["destination"], 1)
+        self.assertEqual(stats["fields_from_llm"]["budget"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
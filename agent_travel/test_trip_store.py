@@ -0,0 +1,231 @@
+import unittest
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest.mock
+from trip_store import JsonTripStore, SQLiteTripStore, migrate_json_to_sqlite, open_trip_store
+
+
+def make_state(destination):
+    return {
+        "current_phase": "ITINERARY",
+        "plan": {"destination": destination, "duration": 3, "interests": ["food"]},
+        "conversation_history": [{"role": "user", "content": f"Plan a trip to {destination}"}]
+    }
+
+
+class TestSQLiteTripStore(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "trips.db")
+        self.store = SQLiteTripStore(self.db_path)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_put_and_get_round_trip(self):
+        self.store.put("Rome Getaway", make_state("Rome"))
+        self.assertEqual(self.store.get("Rome Getaway"), make_state("Rome"))
+        self.assertIsNone(self.store.get("Missing Trip"))
+
+    def test_put_upserts_existing_title(self):
+        self.store.put("Getaway", make_state("Rome"))
+        self.store.put("Getaway", make_state("Paris"))
+        self.assertEqual(self.store.titles(), ["Getaway"])
+        self.assertEqual(self.store.get("Getaway")["plan"]["destination"], "Paris")
+
+    def test_titles_are_sorted(self):
+        for title in ["Paris", "Amsterdam", "Rome"]:
+            self.store.put(title, make_state(title))
+        self.assertEqual(self.store.titles(), ["Amsterdam", "Paris", "Rome"])
+
+    def test_concurrent_saves_do_not_clobber_each_other(self):
+        def save(prefix):
+            store = SQLiteTripStore(self.db_path)
+            for i in range(20):
+                store.put(f"{prefix} {i}", make_state(prefix))
+
+        threads = [threading.Thread(target=save, args=(prefix,)) for prefix in ["Rome", "Paris", "Tokyo"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(self.store.titles()), 60)
+
+    def test_uses_wal_journal_mode(self):
+        mode = self.store._connect().execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, "wal")
+
+
+class TestIncrementalSaves(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "trips.db")
+        self.store = SQLiteTripStore(self.db_path, snapshot_interval=4)
+        self.state = make_state("Rome")
+        self.store.put("Rome Getaway", self.state)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def snapshot(self):
+        row = self.store._connect().execute("SELECT state FROM trips WHERE title = 'Rome Getaway'").fetchone()
+        return json.loads(row[0])
+
+    def events(self):
+        rows = self.store._connect().execute("SELECT event FROM trip_events WHERE title = 'Rome Getaway' ORDER BY seq")
+        return [json.loads(event) for (event,) in rows]
+
+    def test_new_turns_are_logged_without_rewriting_the_snapshot(self):
+        self.state["conversation_history"].append({"role": "assistant", "content": "Here is your plan"})
+        self.state["plan"]["month"] = "July"
+        self.store.put("Rome Getaway", self.state)
+        self.assertEqual(self.snapshot(), make_state("Rome"))
+        self.assertEqual(self.events(), [{
+            "messages": [{"role": "assistant", "content": "Here is your plan"}],
+            "fields": {"plan": {"destination": "Rome", "duration": 3, "interests": ["food"], "month": "July"}},
+        }])
+        self.assertEqual(self.store.get("Rome Getaway"), self.state)
+        self.assertEqual(dict(self.store.items()), {"Rome Getaway": self.state})
+
+    def test_unchanged_state_logs_nothing(self):
+        self.store.put("Rome Getaway", self.state)
+        self.assertEqual(self.events(), [])
+
+    def test_log_is_compacted_into_a_snapshot(self):
+        for i in range(6):
+            self.state["conversation_history"].append({"role": "user", "content": f"message {i}"})
+            self.store.put("Rome Getaway", self.state)
+        # Three logged saves, the fourth written as a snapshot, then two more logged
+        self.assertEqual(len(self.snapshot()["conversation_history"]), 5)
+        self.assertEqual(len(self.events()), 2)
+        self.assertEqual(self.store.get("Rome Getaway"), self.state)
+
+    def test_rewritten_history_is_saved_as_a_snapshot(self):
+        self.state["conversation_history"].append({"role": "user", "content": "details Day 1"})
+        self.store.put("Rome Getaway", self.state)
+        other = make_state("Rome")
+        other["conversation_history"].append({"role": "user", "content": "find airbnb"})
+        self.store.put("Rome Getaway", other)
+        self.assertEqual(self.events(), [])
+        self.assertEqual(self.store.get("Rome Getaway"), other)
+
+    def test_logged_saves_are_searchable(self):
+        self.state["itinerary"] = "**Day 1: July 20, 2025:**\n* Colosseum Tour @ Colosseum $75.00"
+        self.store.put("Rome Getaway", self.state)
+        self.assertEqual(self.store.search("colosseum"), ["Rome Getaway"])
+
+    def test_database_without_log_is_upgraded(self):
+        db_path = os.path.join(self.temp_dir.name, "old.db")
+        conn = sqlite3.connect(db_path)
+        conn.execute("CREATE TABLE trips (title TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)")
+        conn.execute("INSERT INTO trips VALUES ('Old Trip', ?, 0)", (json.dumps(make_state("Paris")),))
+        conn.commit()
+        conn.close()
+
+        store = SQLiteTripStore(db_path)
+        self.assertEqual(store.get("Old Trip"), make_state("Paris"))
+        state = make_state("Paris")
+        state["conversation_history"].append({"role": "user", "content": "find airbnb"})
+        store.put("Old Trip", state)
+        store.put("Old Trip", state)
+        self.assertEqual(store.get("Old Trip"), state)
+
+
+class TestTripSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.stores = [
+            SQLiteTripStore(os.path.join(self.temp_dir.name, "trips.db")),
+            JsonTripStore(os.path.join(self.temp_dir.name, "trips.json")),
+        ]
+        rome = make_state("Rome")
+        rome["conversation_history"].append({
+            "role": "assistant",
+            "content": "**Day 1: July 20, 2025:**\n* Colosseum Tour @ Colosseum $75.00"
+        })
+        paris = make_state("Paris")
+        paris["plan"]["interests"] = ["museums", "pastries"]
+        for store in self.stores:
+            store.put("Roman Holiday", rome)
+            store.put("Paris Weekend", paris)
+            store.put("Rome and Paris Food Tour", make_state("Italy"))
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_matches_title_destination_interests_and_itinerary(self):
+        for store in self.stores:
+            self.assertEqual(store.search("colosseum"), ["Roman Holiday"])
+            self.assertEqual(store.search("pastries"), ["Paris Weekend"])
+            self.assertEqual(store.search("italy"), ["Rome and Paris Food Tour"])
+
+    def test_terms_are_prefixes_and_all_must_match(self):
+        for store in self.stores:
+            self.assertEqual(store.search("colos rom"), ["Roman Holiday"])
+            self.assertEqual(store.search("colosseum paris"), [])
+
+    def test_title_matches_rank_first(self):
+        for store in self.stores:
+            self.assertEqual(store.search("paris")[0], "Paris Weekend")
+
+    def test_pagination(self):
+        for store in self.stores:
+            self.assertEqual(store.search("", limit=2), ["Paris Weekend", "Roman Holiday"])
+            self.assertEqual(len(store.search("", limit=2, offset=2)), 1)
+
+    def test_scanning_search_reads_the_json_file_once(self):
+        store = self.stores[1]
+        with unittest.mock.patch.object(store, "_read_all", wraps=store._read_all) as read_all:
+            self.assertEqual(store.search("colosseum"), ["Roman Holiday"])
+        self.assertEqual(read_all.call_count, 1)
+
+    def test_index_is_updated_on_save(self):
+        for store in self.stores:
+            store.put("Roman Holiday", make_state("Tokyo"))
+            self.assertEqual(store.search("colosseum"), [])
+            self.assertEqual(store.search("tokyo"), ["Roman Holiday"])
+
+    def test_existing_database_is_reindexed(self):
+        db_path = os.path.join(self.temp_dir.name, "trips.db")
+        SQLiteTripStore(db_path)._connect().execute("DELETE FROM trips_fts").connection.commit()
+        self.assertEqual(SQLiteTripStore(db_path).search("colosseum"), ["Roman Holiday"])
+
+
+class TestMigration(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.temp_dir.name, "user_trips.json")
+        self.db_path = os.path.join(self.temp_dir.name, "user_trips.db")
+        with open(self.json_path, "w") as f:
+            json.dump({"Rome Getaway": make_state("Rome"), "Paris Weekend": make_state("Paris")}, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_migrate_json_to_sqlite(self):
+        self.assertEqual(migrate_json_to_sqlite(self.json_path, self.db_path), 2)
+        store = open_trip_store(self.db_path)
+        self.assertIsInstance(store, SQLiteTripStore)
+        self.assertEqual(store.titles(), ["Paris Weekend", "Rome Getaway"])
+        self.assertEqual(store.get("Rome Getaway"), JsonTripStore(self.json_path).get("Rome Getaway"))
+
+    def test_migrate_command(self):
+        result = subprocess.run(
+            [sys.executable, "trip_store.py", "migrate", self.json_path, self.db_path],
+            capture_output=True, text=True, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("Imported 2 trips", result.stdout)
+        self.assertEqual(SQLiteTripStore(self.db_path).titles(), ["Paris Weekend", "Rome Getaway"])
+
+if __name__ == '__main__':
+    unittest.main()
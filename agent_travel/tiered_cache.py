@@ -0,0 +1,131 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
+
+
+class TieredCache:
+    """
+    A string cache with an in-memory LRU tier in front of an optional SQLite tier.
+    Entries expire after ttl_seconds (None disables expiry); each tier evicts its
+    least recently used entries once it grows past its size limit.
+    """
+
+    def __init__(self, db_path: Optional[str] = None, table: str = "cache",
+                 max_memory_entries: int = 256, max_disk_entries: int = 10000,
+                 ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.table = table
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self.ttl_seconds = ttl_seconds
+        self._memory = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.RLock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._conn = None
+        if db_path:
+            self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL, last_access REAL NOT NULL)"
+            )
+            self._conn.execute(f"CREATE INDEX IF NOT EXISTS {table}_last_access ON {table}(last_access)")
+
+    @staticmethod
+    def make_key(*parts: str) -> str:
+        """Content-addressed key: a SHA-256 digest over all parts."""
+        return hashlib.sha256("\x1f".join(parts).encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            item = self._memory.get(key)
+            if item is not None:
+                value, expires_at = item
+                if expires_at is None or expires_at > now:
+                    self._memory.move_to_end(key)
+                    self._stats["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                row = self._conn.execute(
+                    f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    value, expires_at = row
+                    if expires_at is None or expires_at > now:
+                        self._conn.execute(f"UPDATE {self.table} SET last_access = ? WHERE key = ?", (now, key))
+                        self._remember(key, value, expires_at)
+                        self._stats["disk_hits"] += 1
+                        return value
+                    self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+            self._stats["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str, ttl_seconds: Optional[float] = None):
+        self.set_many([(key, value)], ttl_seconds=ttl_seconds)
+
+    def set_many(self, items: Iterable[Tuple[str, str]], ttl_seconds: Optional[float] = None):
+        """Stores several entries with one disk transaction."""
+        now = time.time()
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = now + ttl if ttl is not None else None
+        rows = [(key, value, expires_at, now) for key, value in items]
+        with self._lock:
+            for key, value, _, _ in rows:
+                self._remember(key, value, expires_at)
+            self._stats["writes"] += len(rows)
+            if self._conn is not None:
+                self._conn.execute("BEGIN")
+                try:
+                    self._conn.executemany(
+                        f"INSERT INTO {self.table} (key, value, expires_at, last_access) VALUES (?, ?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET value = excluded.value, "
+                        "expires_at = excluded.expires_at, last_access = excluded.last_access",
+                        rows
+                    )
+                    self._evict_disk(now)
+                    self._conn.execute("COMMIT")
+                except Exception:
+                    self._conn.execute("ROLLBACK")
+                    raise
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute(f"DELETE FROM {self.table}")
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._stats)
+            stats["memory_entries"] = len(self._memory)
+            if self._conn is not None:
+                stats["disk_entries"] = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+            self._stats["evictions"] += 1
+
+    def _evict_disk(self, now):
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+        overflow = self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0] - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN "
+                f"(SELECT key FROM {self.table} ORDER BY last_access LIMIT ?)", (overflow,)
+            )
+            self._stats["evictions"] += overflow
@@ -2,25 +2,62 @@ import json
 import re
 import os
 import datetime
-from gemini_utils import call_gemini
+import threading
+from collections import Counter
+from gemini_utils import call_gemini, acall_gemini
+from plan_extractor import PLAN_FIELDS, extract_plan
 
 class TravelPlannerAgent:
-    def __init__(self):
-        pass
+    """
+    Extracts the trip plan from user messages. Rule-based extraction runs first;
+    the LLM is only asked for the fields the rules could not fill.
+    """
 
-    
+    def __init__(self):
+        self._stats_lock = threading.Lock()
+        self._messages = 0
+        self._llm_fallbacks = 0
+        self._rule_fields = Counter()
+        self._llm_fields = Counter()
 
-    def parse_with_llm(self, user_input, current_plan):
-        prompt = f"""
+    def _extraction_prompt(self, user_input, fields=PLAN_FIELDS):
+        keys = ", ".join(f"'{field}'" for field in fields)
+        return f"""
         Extract the following travel planning parameters from the user's input. 
         Return the information as a JSON object with the keys: 
-        'destination', 'duration', 'month', 'traveler_type', 'interests', 'budget'.
+        {keys}.
         If a value is not present, set it to null.
 
         User Input: '{user_input}'
         """
-        response_text = call_gemini(prompt)
-        
+
+    def _apply_rules(self, user_input, current_plan):
+        """Fills the plan from extract_plan(). Returns the fields still missing, which need the LLM."""
+        extracted = extract_plan(user_input)
+        current_plan.update(extracted)
+        missing = [field for field in PLAN_FIELDS if not current_plan.get(field)]
+        with self._stats_lock:
+            self._messages += 1
+            self._rule_fields.update(extracted.keys())
+            if missing:
+                self._llm_fallbacks += 1
+                self._llm_fields.update(missing)
+        if missing:
+            print(f"Rule-based extraction missed {', '.join(missing)}; asking the LLM") # Debug print
+        return missing
+
+    def extraction_stats(self):
+        """How often rule-based extraction sufficed and which fields fell back to the LLM."""
+        with self._stats_lock:
+            return {
+                "messages": self._messages,
+                "llm_fallbacks": self._llm_fallbacks,
+                "fallback_rate": self._llm_fallbacks / self._messages if self._messages else 0.0,
+                "fields_from_rules": dict(self._rule_fields),
+                "fields_from_llm": dict(self._llm_fields),
+            }
+
+    def _apply_extraction(self, response_text, current_plan, fields=PLAN_FIELDS):
         try:
             json_match = re.search(r"```json\n([\s\S]*?)\n```", response_text)
             if json_match:
@@ -30,12 +67,24 @@ class TravelPlannerAgent:
                 extracted_data = json.loads(response_text) # Try parsing directly if no code block
 
             for key, value in extracted_data.items():
-                if value is not None:
+                if value is not None and key in fields:
                     current_plan[key] = value
         except (json.JSONDecodeError, KeyError) as e:
             print(f"Error parsing LLM response: {e}")
             pass
 
+    def parse_with_llm(self, user_input, current_plan):
+        missing = self._apply_rules(user_input, current_plan)
+        if missing:
+            response_text = call_gemini(self._extraction_prompt(user_input, missing))
+            self._apply_extraction(response_text, current_plan, missing)
+
+    async def aparse_with_llm(self, user_input, current_plan):
+        missing = self._apply_rules(user_input, current_plan)
+        if missing:
+            response_text = await acall_gemini(self._extraction_prompt(user_input, missing))
+            self._apply_extraction(response_text, current_plan, missing)
+
     def check_missing_info(self, plan):
         missing = []
         if not plan["destination"]:
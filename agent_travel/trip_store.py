@@ -0,0 +1,369 @@
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Relative weight of a match in each searchable field when ranking search results.
+SEARCH_FIELD_WEIGHTS = {"title": 10.0, "destination": 5.0, "interests": 3.0, "itinerary": 1.0}
+# Logged saves of a trip between two compacted snapshots of its state.
+SNAPSHOT_INTERVAL = 50
+
+
+def searchable_fields(trip_title: str, state: dict) -> Dict[str, str]:
+    """The text of a saved trip that search matches against."""
+    plan = state.get("plan") or {}
+    interests = plan.get("interests") or []
+    if isinstance(interests, str):
+        interests = [interests]
+    itinerary = state.get("itinerary") or ""
+    if not itinerary:
+        for message in state.get("conversation_history", []):
+            if message.get("role") == "assistant" and "Day 1:" in message.get("content", ""):
+                itinerary = message["content"]
+                break
+    return {
+        "title": trip_title,
+        "destination": str(plan.get("destination") or ""),
+        "interests": " ".join(str(interest) for interest in interests),
+        "itinerary": itinerary,
+    }
+
+
+def search_terms(query: str) -> List[str]:
+    return re.findall(r"\w+", query.lower())
+
+
+class TripStore(ABC):
+    """Storage backend for saved trips: one state dict per trip title."""
+
+    @abstractmethod
+    def get(self, trip_title: str) -> Optional[dict]:
+        pass
+
+    @abstractmethod
+    def put(self, trip_title: str, state: dict):
+        pass
+
+    @abstractmethod
+    def titles(self) -> List[str]:
+        pass
+
+    def put_many(self, trips: Dict[str, dict]):
+        for trip_title, state in trips.items():
+            self.put(trip_title, state)
+
+    def items(self) -> Iterator[Tuple[str, dict]]:
+        """Every (title, state) pair; backends override this to read them in one pass."""
+        for trip_title in self.titles():
+            state = self.get(trip_title)
+            if state is not None:
+                yield trip_title, state
+
+    def search(self, query: str, limit: int = 20, offset: int = 0) -> List[str]:
+        """
+        Titles of trips whose title, destination, interests or itinerary contain every
+        term in query (as a word prefix), best matches first. This fallback scans
+        every trip; indexed backends override it.
+        """
+        terms = search_terms(query)
+        if not terms:
+            return sorted(self.titles())[offset:offset + limit]
+
+        scored = []
+        for trip_title, state in self.items():
+            fields = searchable_fields(trip_title, state)
+            words = {name: search_terms(text) for name, text in fields.items()}
+            score = 0
+            for term in terms:
+                term_score = sum(
+                    SEARCH_FIELD_WEIGHTS[name] * sum(1 for word in field_words if word.startswith(term))
+                    for name, field_words in words.items()
+                )
+                if not term_score:
+                    break
+                score += term_score
+            else:
+                scored.append((-score, trip_title))
+        return [trip_title for _, trip_title in sorted(scored)[offset:offset + limit]]
+
+
+class JsonTripStore(TripStore):
+    """
+    The original single-file store. Every save rewrites the whole file, so it is
+    only suitable for small, single-user setups.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _read_all(self) -> dict:
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return {}
+        with open(self.path, "r") as f:
+            try:
+                return json.load(f)
+            except json.JSONDecodeError:
+                return {}
+
+    def get(self, trip_title):
+        return self._read_all().get(trip_title)
+
+    def put(self, trip_title, state):
+        self.put_many({trip_title: state})
+
+    def put_many(self, trips):
+        with self._lock:
+            all_trips = self._read_all()
+            all_trips.update(trips)
+            with open(self.path, "w") as f:
+                json.dump(all_trips, f, indent=4, default=str)
+
+    def titles(self):
+        return list(self._read_all().keys())
+
+    def items(self):
+        return iter(self._read_all().items())
+
+
+class SQLiteTripStore(TripStore):
+    """
+    One row per trip keyed by title, holding a compacted snapshot of its state,
+    plus an append-only log of the saves made since that snapshot. A save logs
+    only the messages added and the top-level fields changed since the previous
+    save, so its cost does not grow with the conversation; every
+    SNAPSHOT_INTERVAL saves the log is folded back into the snapshot. The
+    database runs in WAL mode so readers never block on a concurrent save.
+    """
+
+    def __init__(self, path: str, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self.path = path
+        self.snapshot_interval = snapshot_interval
+        self._local = threading.local()
+        with self._connect() as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trips ("
+                "title TEXT PRIMARY KEY, state TEXT NOT NULL, updated_at REAL NOT NULL)"
+            )
+            # Saves logged since each trip's snapshot, and the latest save's head to diff the next one against.
+            # Kept out of the trips table, whose rows SQLite rewrites whole on any update.
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trip_events ("
+                "title TEXT NOT NULL, seq INTEGER NOT NULL, event TEXT NOT NULL, PRIMARY KEY (title, seq))"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS trip_heads ("
+                "title TEXT PRIMARY KEY, head TEXT NOT NULL, snapshot_seq INTEGER NOT NULL, head_seq INTEGER NOT NULL)"
+            )
+            # Full-text index over searchable_fields(); its rowids mirror trips.rowid.
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS trips_fts USING fts5("
+                "title, destination, interests, itinerary, "
+                "tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+            )
+        if self._count("trips_fts") < self._count("trips"):
+            self.reindex()
+
+    def _count(self, table):
+        return self._connect().execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+    def _connect(self) -> sqlite3.Connection:
+        # One connection per thread; sqlite3 connections must not be shared across threads.
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def get(self, trip_title):
+        conn = self._connect()
+        row = conn.execute("SELECT state FROM trips WHERE title = ?", (trip_title,)).fetchone()
+        if not row:
+            return None
+        events = conn.execute("SELECT event FROM trip_events WHERE title = ? ORDER BY seq", (trip_title,))
+        return _replay(json.loads(row[0]), (event for (event,) in events))
+
+    def put(self, trip_title, state):
+        """Saves a trip, logging only what changed since its previous save when possible."""
+        now = time.time()
+        fields, head = _state_head(state)
+        conn = self._connect()
+        with conn:
+            # Take the write lock before reading the head, so concurrent saves of one trip are serialized
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute(
+                "SELECT head, snapshot_seq, head_seq FROM trip_heads WHERE title = ?", (trip_title,)
+            ).fetchone()
+            event = _diff_state(json.loads(row[0]) if row else None, fields, head, state)
+            if event == {"messages": [], "fields": {}}:
+                return
+            seq = row[2] + 1 if row else 1
+            if event is None or seq - row[1] >= self.snapshot_interval:
+                self._write_snapshot(conn, trip_title, state, head, seq, now)
+            else:
+                conn.execute("INSERT INTO trip_events (title, seq, event) VALUES (?, ?, ?)",
+                             (trip_title, seq, json.dumps(event, default=str)))
+                conn.execute("UPDATE trip_heads SET head = ?, head_seq = ? WHERE title = ?",
+                             (json.dumps(head, default=str), seq, trip_title))
+                if not _changes_search_fields(event):
+                    return
+            self._index_trip(conn, trip_title, state)
+
+    def put_many(self, trips):
+        now = time.time()
+        with self._connect() as conn:
+            for trip_title, state in trips.items():
+                self._write_snapshot(conn, trip_title, state, _state_head(state)[1], 0, now)
+                self._index_trip(conn, trip_title, state)
+
+    def _write_snapshot(self, conn, trip_title, state, head, seq, now):
+        """Stores the whole state as the trip's snapshot at seq and drops its logged saves."""
+        conn.execute(
+            "INSERT INTO trips (title, state, updated_at) VALUES (?, ?, ?) "
+            "ON CONFLICT(title) DO UPDATE SET state = excluded.state, updated_at = excluded.updated_at",
+            (trip_title, json.dumps(state, default=str), now)
+        )
+        conn.execute(
+            "INSERT OR REPLACE INTO trip_heads (title, head, snapshot_seq, head_seq) VALUES (?, ?, ?, ?)",
+            (trip_title, json.dumps(head, default=str), seq, seq)
+        )
+        conn.execute("DELETE FROM trip_events WHERE title = ?", (trip_title,))
+
+    def _index_trip(self, conn, trip_title, state):
+        rowid = conn.execute("SELECT rowid FROM trips WHERE title = ?", (trip_title,)).fetchone()[0]
+        fields = searchable_fields(trip_title, state)
+        conn.execute("DELETE FROM trips_fts WHERE rowid = ?", (rowid,))
+        conn.execute(
+            "INSERT INTO trips_fts (rowid, title, destination, interests, itinerary) VALUES (?, ?, ?, ?, ?)",
+            (rowid, fields["title"], fields["destination"], fields["interests"], fields["itinerary"])
+        )
+
+    def reindex(self):
+        """Rebuilds the full-text index from the trips table, e.g. for databases created before it existed."""
+        trips = list(self.items())
+        with self._connect() as conn:
+            conn.execute("DELETE FROM trips_fts")
+            for trip_title, state in trips:
+                self._index_trip(conn, trip_title, state)
+
+    def titles(self):
+        # Served from the primary-key index without touching the state column.
+        return [row[0] for row in self._connect().execute("SELECT title FROM trips ORDER BY title")]
+
+    def items(self):
+        # Two queries in total rather than one lookup per title; the log is short by construction
+        conn = self._connect()
+        events = {}
+        for trip_title, event in conn.execute("SELECT title, event FROM trip_events ORDER BY title, seq"):
+            events.setdefault(trip_title, []).append(event)
+        for trip_title, state in conn.execute("SELECT title, state FROM trips ORDER BY title"):
+            yield trip_title, _replay(json.loads(state), events.get(trip_title, ()))
+
+    def search(self, query, limit=20, offset=0):
+        terms = search_terms(query)
+        if not terms:
+            rows = self._connect().execute(
+                "SELECT title FROM trips ORDER BY title LIMIT ? OFFSET ?", (limit, offset)
+            )
+            return [row[0] for row in rows]
+
+        match = " ".join(f'"{term}"*' for term in terms)
+        weights = ", ".join(str(weight) for weight in SEARCH_FIELD_WEIGHTS.values())
+        rows = self._connect().execute(
+            f"SELECT title FROM trips_fts WHERE trips_fts MATCH ? "
+            f"ORDER BY bm25(trips_fts, {weights}), title LIMIT ? OFFSET ?",
+            (match, limit, offset)
+        )
+        return [row[0] for row in rows]
+
+
+def _state_head(state) -> Tuple[dict, dict]:
+    """
+    The top-level fields of a state other than its conversation history, and the
+    head recorded for it: those fields plus the message count and last message.
+    """
+    history = state.get("conversation_history") or []
+    fields = {key: value for key, value in state.items() if key != "conversation_history"}
+    # Round-tripped so the head compares equal to what a later save reads back
+    fields = json.loads(json.dumps(fields, default=str))
+    head = {
+        "fields": fields,
+        "message_count": len(history),
+        "last_message": history[-1] if history else None,
+    }
+    return fields, head
+
+
+def _diff_state(previous_head: Optional[dict], fields: dict, head: dict, state) -> Optional[dict]:
+    """
+    The event taking a trip from previous_head to state: the messages appended and
+    the fields that changed. None when state does not extend the previous save
+    (a new trip, a rewritten history or a removed field) and needs a snapshot.
+    """
+    if previous_head is None:
+        return None
+    history = state.get("conversation_history") or []
+    count = previous_head["message_count"]
+    if len(history) < count or (count and history[count - 1] != previous_head["last_message"]):
+        return None
+    previous_fields = previous_head["fields"]
+    if previous_fields.keys() - fields.keys():
+        return None
+    return {
+        "messages": history[count:],
+        "fields": {key: value for key, value in fields.items() if previous_fields.get(key) != value},
+    }
+
+
+def _changes_search_fields(event: dict) -> bool:
+    # The indexed itinerary is the first one in the history, so only a new one can change it
+    return bool(event["fields"].keys() & {"plan", "itinerary"}) or any(
+        message.get("role") == "assistant" and "Day 1:" in message.get("content", "")
+        for message in event["messages"]
+    )
+
+
+def _replay(state: dict, events: Iterable[str]) -> dict:
+    """Applies logged saves, oldest first, to a snapshot."""
+    for event in events:
+        event = json.loads(event)
+        state.setdefault("conversation_history", []).extend(event["messages"])
+        state.update(event["fields"])
+    return state
+
+
+def open_trip_store(path: str) -> TripStore:
+    """Picks the backend from the file extension: .json for JsonTripStore, anything else is SQLite."""
+    if path.endswith(".json"):
+        return JsonTripStore(path)
+    return SQLiteTripStore(path)
+
+
+def migrate_json_to_sqlite(json_path: str, sqlite_path: str) -> int:
+    """Imports every trip from a user_trips.json file into a SQLite store. Returns the number imported."""
+    trips = JsonTripStore(json_path)._read_all()
+    SQLiteTripStore(sqlite_path).put_many(trips)
+    return len(trips)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the saved trip store.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="Import a user_trips.json file into a SQLite store.")
+    migrate_parser.add_argument("json_path")
+    migrate_parser.add_argument("sqlite_path")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.json_path):
+        print(f"Error: File not found: {args.json_path}", file=sys.stderr)
+        sys.exit(1)
+    count = migrate_json_to_sqlite(args.json_path, args.sqlite_path)
+    print(f"Imported {count} trips from {args.json_path} into {args.sqlite_path}")